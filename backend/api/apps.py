@@ -12,6 +12,14 @@ class ApiConfig(AppConfig):
     
     def ready(self):
         """Inicializa serviços e inicia o WatcherService quando o Django estiver pronto."""
+        # Respostas pré-renderizadas pelo cache (antes de qualquer escritor publicar)
+        from api.cached_responses import register_cache_renderers
+        register_cache_renderers()
+        
+        # Índice de robôs do RobotIdentityResolver refeito quando RoboDockerizado muda
+        from services.robot_identity import connect_model_signals
+        connect_model_signals()
+        
         # Evitar executar durante migrations ou outros comandos de gerenciamento
         if 'migrate' in sys.argv or 'makemigrations' in sys.argv or 'test' in sys.argv:
             return
@@ -0,0 +1,51 @@
+"""
+Respostas da API servidas do CacheService.
+
+Os serializers das listagens mais consultadas são aplicados pelo escritor do
+cache (PollingService) uma vez por atualização; as views devolvem os bytes
+prontos, sem serializer nem renderer por requisição. polling_max_age() é a
+idade a partir da qual as views consideram uma entrada vencida.
+"""
+from typing import Optional
+
+from django.http import HttpResponse
+
+from api.etag import make_etag, not_modified, with_etag
+from api.serializers.models import ConnectionStatusSerializer, CronjobSerializer, JobSerializer, RPASerializer
+from services.cache_service import CacheKeys, CacheService
+
+
+def polling_max_age() -> float:
+    """Idade máxima de uma entrada alimentada pelo polling da VM (dois ciclos do intervalo efetivo)."""
+    polling = CacheService.get_data(CacheKeys.POLLING_STATUS)
+    if polling and 'vm' in polling:
+        return polling['vm']['interval'] * 2
+    try:
+        from config.ssh_config import get_backend_config
+        return get_backend_config().get('polling_interval_vm', 10) * 2
+    except Exception:
+        return 20
+
+
+def _connection_status(data):
+    serializer = ConnectionStatusSerializer(data=data)
+    return serializer.validated_data if serializer.is_valid() else data
+
+
+def register_cache_renderers():
+    """Registra os renderers das chaves servidas como bytes pelas views."""
+    CacheService.register_renderer(CacheKeys.RPAS_PROCESSED, lambda data: RPASerializer(data, many=True).data)
+    CacheService.register_renderer(CacheKeys.JOBS, lambda data: JobSerializer(data, many=True).data)
+    CacheService.register_renderer(CacheKeys.CRONJOBS_KUBERNETES, lambda data: CronjobSerializer(data, many=True).data)
+    CacheService.register_renderer(CacheKeys.CONNECTION_STATUS, _connection_status)
+
+
+def rendered_response(request, entry, *etag_parts) -> Optional[HttpResponse]:
+    """Resposta com o corpo pré-renderizado da entrada (ou 304); None se a entrada não tiver bytes."""
+    if not entry or entry.get('rendered') is None:
+        return None
+    etag = make_etag(entry['hash'], *etag_parts)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return with_etag(HttpResponse(entry['rendered'], content_type='application/json'), etag)
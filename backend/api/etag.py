@@ -0,0 +1,42 @@
+"""
+ETag / If-None-Match para as views de listagem servidas do cache.
+
+O ETag é derivado dos hashes de conteúdo das entradas do CacheService (e dos
+parâmetros da requisição que alteram a resposta). Quando o cliente já tem a
+versão atual, a view responde 304 sem serializar nem renderizar a lista.
+"""
+import hashlib
+from typing import Optional
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts) -> Optional[str]:
+    """ETag a partir de hashes/parâmetros; None se algum hash estiver indisponível."""
+    if any(part is None for part in parts):
+        return None
+    digest = hashlib.blake2b('|'.join(str(part) for part in parts).encode('utf-8'), digest_size=16)
+    return quote_etag(digest.hexdigest())
+
+
+def not_modified(request, etag: Optional[str]) -> Optional[Response]:
+    """Resposta 304 se o If-None-Match da requisição já contém o ETag atual."""
+    if not etag:
+        return None
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if '*' in etags or etag in etags:
+        return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    return None
+
+
+def with_etag(response, etag: Optional[str]):
+    """Adiciona o ETag; no-cache faz o navegador revalidar (If-None-Match) a cada consulta."""
+    if etag:
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+    return response
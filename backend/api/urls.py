@@ -17,6 +17,8 @@ urlpatterns = [
     path('connection/ssh/', connection.ssh_status, name='ssh-status'),
     path('connection/mysql/', connection.mysql_status, name='mysql-status'),
     path('connection/reload/', connection.reload_services, name='connection-reload'),
+    path('connection/polling/', connection.polling_status, name='polling-status'),
+    path('connection/scheduler/', connection.scheduler_status, name='scheduler-status'),
     path('config/', config.get_config, name='config-get'),
     path('config/save/', config.save_config, name='config-save'),
     path('resources/vm/', resources.vm_resources, name='vm-resources'),
@@ -2,12 +2,15 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from services.cache_service import CacheKeys, CacheService
+from services.scheduler import get_scheduler
 from services.service_manager import (
     get_ssh_service,
     get_database_service,
     reset_services
 )
 from api.serializers.models import ConnectionStatusSerializer
+from api.etag import make_etag, not_modified, with_etag
+from api.cached_responses import rendered_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,7 +21,16 @@ def connection_status(request):
     request_id = getattr(request, '_request_id', 'UNKNOWN')
     logger.info(f"[{request_id}] GET /api/connection/status/ - Consultando status do cache")
     
-    cached_status = CacheService.get_data(CacheKeys.CONNECTION_STATUS)
+    entry = CacheService.get_entry(CacheKeys.CONNECTION_STATUS)
+    response = rendered_response(request, entry)
+    if response:
+        return response
+    
+    cached_status = entry['data'] if entry else None
+    etag = make_etag(entry['hash']) if cached_status else None
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     if not cached_status:
         logger.warning(f"[{request_id}] Status de conexão não encontrado no cache")
         cached_status = {
@@ -32,9 +44,26 @@ def connection_status(request):
     
     serializer = ConnectionStatusSerializer(data=cached_status)
     if serializer.is_valid():
-        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+        return with_etag(Response(serializer.validated_data, status=status.HTTP_200_OK), etag)
     
-    return Response(cached_status, status=status.HTTP_200_OK)
+    return with_etag(Response(cached_status, status=status.HTTP_200_OK), etag)
+
+@api_view(['GET'])
+def polling_status(request):
+    """Retorna o intervalo efetivo (e os limites) de cada laço de polling."""
+    entry = CacheService.get_entry(CacheKeys.POLLING_STATUS)
+    if not entry:
+        return Response({}, status=status.HTTP_200_OK)
+    etag = make_etag(entry['hash'])
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return with_etag(Response(entry['data'], status=status.HTTP_200_OK), etag)
+
+@api_view(['GET'])
+def scheduler_status(request):
+    """Retorna tempos, falhas, pulos e estouros de prazo de cada tarefa em background."""
+    return Response(get_scheduler().stats(), status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 def reload_services(request):
@@ -94,7 +123,9 @@ def ssh_status(request):
         data = {
             'ssh_connected': ssh_connected,
             'ssh_error': ssh_error,
-            'message': 'Conexão SSH verificada' if ssh_connected else 'Falha na conexão SSH'
+            'message': 'Conexão SSH verificada' if ssh_connected else 'Falha na conexão SSH',
+            'pool': ssh_service.get_pool_stats(),
+            'compression': ssh_service.get_compression_stats(),
         }
         
         logger.info(f"Teste SSH: {ssh_connected}, Erro: {ssh_error}")
@@ -2,13 +2,16 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from services.cache_service import CacheKeys, CacheService
+from api.etag import make_etag, not_modified, with_etag
+from api.cached_responses import polling_max_age, rendered_response
+from services.cluster_snapshot import as_record_list
+from services.robot_identity import cronjob_robot_name, get_robot_resolver
 from services.service_manager import get_kubernetes_service
 from api.serializers.models import CronjobSerializer, CreateCronjobSerializer, UpdateCronjobSerializer
 from api.models import RoboDockerizado
 from django.utils import timezone
 import yaml
 import logging
-import re
 
 logger = logging.getLogger(__name__)
 
@@ -35,9 +38,7 @@ class CronjobViewSet(viewsets.ViewSet):
                 # Buscar execuções se for dependente
                 execucoes_pendentes = 0
                 if cj.dependente_de_execucoes:
-                    nome_rpa = cj.nome.replace('rpa-cronjob-', '').replace('-cronjob', '')
-                    nome_rpa = re.sub(r'-\d+$', '', nome_rpa)
-                    execucoes_pendentes = self._buscar_execucoes_por_nome(nome_rpa, execucoes_por_robo)
+                    execucoes_pendentes = get_robot_resolver().count_executions(cronjob_robot_name(cj.nome), execucoes_por_robo)
                 
                 cj_data['execucoes_pendentes'] = execucoes_pendentes
                 cronjobs_list.append(cj_data)
@@ -52,14 +53,24 @@ class CronjobViewSet(viewsets.ViewSet):
     def kubernetes(self, request):
         """Lista cronjobs ATIVOS no Kubernetes (para Dashboard)."""
         try:
+            # Lista pronta publicada pelo polling (bytes já renderizados)
+            response = rendered_response(request, CacheService.get_entry(CacheKeys.CRONJOBS_KUBERNETES))
+            if response:
+                return response
+            
             # Buscar cronjobs do Kubernetes (cache ou direto)
-            k8s_cronjobs = CacheService.get_data(CacheKeys.CRONJOBS, []) or []
-            if not k8s_cronjobs:
-                k8s_cronjobs = self.k8s_service.get_cronjobs()
-                CacheService.update(CacheKeys.CRONJOBS, k8s_cronjobs)
+            entry = CacheService.get_or_load_entry(CacheKeys.CRONJOBS, self.k8s_service.get_cronjobs, polling_max_age())
+            k8s_cronjobs = entry['data'] or []
             
             # Buscar execuções do cache
-            execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
+            exec_entry = CacheService.get_entry(CacheKeys.EXECUTIONS)
+            execucoes_por_robo = (exec_entry['data'] if exec_entry else None) or {}
+            
+            # A resposta depende só dos cronjobs e das execuções em cache
+            etag = make_etag(entry['hash'], exec_entry['hash'] if exec_entry else '')
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
             
             cronjobs_list = []
             for cj in k8s_cronjobs:
@@ -69,15 +80,14 @@ class CronjobViewSet(viewsets.ViewSet):
                 
                 # Buscar execuções
                 execucoes_pendentes = 0
-                nome_rpa = nome.replace('rpa-cronjob-', '').replace('-cronjob', '')
-                nome_rpa = re.sub(r'-\d+$', '', nome_rpa)
-                execucoes_pendentes = self._buscar_execucoes_por_nome(nome_rpa, execucoes_por_robo)
+                execucoes_pendentes = get_robot_resolver().count_executions(cronjob_robot_name(nome), execucoes_por_robo)
                 
-                cj['execucoes_pendentes'] = execucoes_pendentes
-                cronjobs_list.append(cj)
+                cj_data = cj.to_dict()
+                cj_data['execucoes_pendentes'] = execucoes_pendentes
+                cronjobs_list.append(cj_data)
             
             serializer = CronjobSerializer(cronjobs_list, many=True)
-            return Response(serializer.data)
+            return with_etag(Response(serializer.data), etag)
         except Exception as e:
             logger.error(f"Erro ao listar cronjobs do Kubernetes: {e}", exc_info=True)
             return Response({'error': f'Erro ao listar cronjobs do Kubernetes: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -92,9 +102,7 @@ class CronjobViewSet(viewsets.ViewSet):
             exec_cache = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
             execucoes_pendentes = 0
             if cj.dependente_de_execucoes:
-                nome_rpa = pk.replace('rpa-cronjob-', '').replace('-cronjob', '')
-                nome_rpa = re.sub(r'-\d+$', '', nome_rpa)
-                execucoes_pendentes = self._buscar_execucoes_por_nome(nome_rpa, exec_cache)
+                execucoes_pendentes = get_robot_resolver().count_executions(cronjob_robot_name(pk), exec_cache)
             
             cj_data['execucoes_pendentes'] = execucoes_pendentes
             
@@ -210,6 +218,7 @@ spec:
             
             # Invalidar cache
             CacheService.update(CacheKeys.CRONJOBS, None)
+            CacheService.update(CacheKeys.CRONJOBS_KUBERNETES, None)
             CacheService.update(CacheKeys.CRONJOBS_PROCESSED, None)
             
             return Response({'message': 'Cronjob criado com sucesso'}, status=status.HTTP_201_CREATED)
@@ -236,6 +245,7 @@ spec:
                 
                 # Invalidar cache
                 CacheService.update(CacheKeys.CRONJOBS, None)
+                CacheService.update(CacheKeys.CRONJOBS_KUBERNETES, None)
                 CacheService.update(CacheKeys.CRONJOBS_PROCESSED, None)
                 
                 return Response({'message': 'Cronjob deletado com sucesso'}, status=status.HTTP_200_OK)
@@ -269,16 +279,15 @@ spec:
             if not jobs_cache:
                 jobs_cache = self.k8s_service.get_jobs()
             
-            # Filtrar jobs deste cronjob (jobs criados por cronjobs têm o nome do cronjob como prefixo)
-            for job in jobs_cache:
+            # Jobs deste cronjob (jobs criados por cronjobs têm o nome do cronjob como prefixo,
+            # formato: cronjob-name-1234567)
+            for job in as_record_list(jobs_cache).with_name_prefix(pk + '-'):
                 job_name = job.get('name', '')
-                # Jobs criados por cronjobs geralmente têm formato: cronjob-name-1234567
-                if job_name.startswith(pk + '-'):
-                    # Deletar job
-                    job_success = self.k8s_service.delete_job(job_name)
-                    if job_success:
-                        jobs_deletados += 1
-                        logger.info(f"Job {job_name} deletado (Cronjob {pk} em standby)")
+                # Deletar job
+                job_success = self.k8s_service.delete_job(job_name)
+                if job_success:
+                    jobs_deletados += 1
+                    logger.info(f"Job {job_name} deletado (Cronjob {pk} em standby)")
             
             logger.info(f"{jobs_deletados} job(s) deletado(s) ao suspender Cronjob {pk}")
         except Exception as e:
@@ -326,15 +335,3 @@ spec:
             return Response({'message': 'Cronjob reativado com sucesso'}, status=status.HTTP_200_OK)
         else:
             return Response({'error': 'Erro ao reativar cronjob'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-    def _buscar_execucoes_por_nome(self, nome_rpa: str, exec_cache):
-        if not isinstance(exec_cache, dict):
-            return 0
-        execucoes = exec_cache.get(nome_rpa, [])
-        if execucoes:
-            return len(execucoes)
-        nome_normalizado = nome_rpa.replace('-', '').replace('_', '').lower()
-        for nome_db, execs in exec_cache.items():
-            if nome_normalizado == nome_db.replace('-', '').replace('_', '').lower():
-                return len(execs)
-        return 0
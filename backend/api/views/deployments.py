@@ -1,7 +1,9 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from services.cache_service import CacheKeys, CacheService
+from services.cache_service import CacheKeys, CacheService, content_hash
+from api.etag import make_etag, not_modified, with_etag
+from services.robot_identity import get_robot_resolver
 from services.service_manager import get_kubernetes_service
 from api.serializers.models import DeploymentSerializer, CreateDeploymentSerializer
 from api.models import RoboDockerizado
@@ -35,13 +37,19 @@ class DeploymentViewSet(viewsets.ViewSet):
                 # Buscar execuções se for dependente
                 execucoes_pendentes = 0
                 if dep.dependente_de_execucoes:
-                    execucoes_pendentes = self._buscar_execucoes_por_nome(dep.nome, execucoes_por_robo)
+                    execucoes_pendentes = get_robot_resolver().count_executions(dep.nome, execucoes_por_robo)
                 
                 dep_data['execucoes_pendentes'] = execucoes_pendentes
                 deployments_list.append(dep_data)
             
+            # Lista montada do banco: o ETag vem do conteúdo e poupa serialização e tráfego
+            etag = make_etag(content_hash(deployments_list))
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+            
             serializer = DeploymentSerializer(deployments_list, many=True)
-            return Response(serializer.data)
+            return with_etag(Response(serializer.data), etag)
         except Exception as e:
             logger.error(f"Erro ao listar deployments: {e}", exc_info=True)
             return Response({'error': f'Erro ao listar deployments: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -56,7 +64,7 @@ class DeploymentViewSet(viewsets.ViewSet):
             exec_cache = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
             execucoes_pendentes = 0
             if dep.dependente_de_execucoes:
-                execucoes_pendentes = self._buscar_execucoes_por_nome(pk, exec_cache)
+                execucoes_pendentes = get_robot_resolver().count_executions(pk, exec_cache)
             
             dep_data['execucoes_pendentes'] = execucoes_pendentes
             
@@ -284,15 +292,3 @@ spec:
         except Exception as e:
             logger.error(f"Erro ao ativar deployment: {e}")
             return Response({'error': f'Erro ao ativar deployment: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-    def _buscar_execucoes_por_nome(self, nome_rpa: str, exec_cache):
-        if not isinstance(exec_cache, dict):
-            return 0
-        execucoes = exec_cache.get(nome_rpa, [])
-        if execucoes:
-            return len(execucoes)
-        nome_normalizado = nome_rpa.replace('-', '').replace('_', '').lower()
-        for nome_db, execs in exec_cache.items():
-            if nome_normalizado == nome_db.replace('-', '').replace('_', '').lower():
-                return len(execs)
-        return 0
@@ -1,6 +1,7 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from services.cache_service import CacheKeys, CacheService
+from services.robot_identity import get_robot_resolver
 from api.serializers.models import ExecutionSerializer
 import logging
 
@@ -20,7 +21,7 @@ class ExecutionViewSet(viewsets.ViewSet):
         execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
         execucoes = []
         if rpa_name:
-            execucoes = self._buscar_execucoes_cache(rpa_name, execucoes_por_robo)
+            execucoes = get_robot_resolver().executions_for(rpa_name, execucoes_por_robo)
         else:
             for execs in execucoes_por_robo.values():
                 execucoes.extend(execs)
@@ -32,7 +33,7 @@ class ExecutionViewSet(viewsets.ViewSet):
         """Obtém execuções pendentes de um RPA específico."""
         try:
             execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
-            execucoes = self._buscar_execucoes_cache(pk, execucoes_por_robo)
+            execucoes = get_robot_resolver().executions_for(pk, execucoes_por_robo)
             serializer = ExecutionSerializer(execucoes, many=True)
             return Response(serializer.data)
         except Exception as e:
@@ -41,14 +42,3 @@ class ExecutionViewSet(viewsets.ViewSet):
                 {'error': f'Erro ao obter execuções: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-
-    def _buscar_execucoes_cache(self, nome_rpa, exec_cache):
-        execucoes = exec_cache.get(nome_rpa, [])
-        if execucoes:
-            return execucoes
-        nome_normalizado = nome_rpa.replace('-', '').replace('_', '').lower()
-        for nome_db, execs in exec_cache.items():
-            if nome_normalizado == nome_db.replace('-', '').replace('_', '').lower():
-                return execs
-        return []
-
@@ -2,9 +2,14 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from services.cache_service import CacheKeys, CacheService
+from api.etag import make_etag, not_modified, with_etag
+from api.cached_responses import polling_max_age, rendered_response
+from services.cluster_snapshot import as_record_list, load_running_pods
+from services.robot_identity import get_robot_resolver, job_robot_name, normalize_name, pod_robot_name
 from services.service_manager import get_kubernetes_service
 from api.serializers.models import JobSerializer, PodSerializer, PodLogsSerializer
 import logging
+from collections.abc import Mapping
 import re
 
 logger = logging.getLogger(__name__)
@@ -20,15 +25,23 @@ class JobViewSet(viewsets.ViewSet):
     def list(self, request):
         """Lista todos os jobs."""
         label_selector = request.query_params.get('label_selector', None)
-        jobs = CacheService.get_data(CacheKeys.JOBS, []) or []
-        if not jobs:
-            jobs = self.k8s_service.get_jobs()
-            CacheService.update(CacheKeys.JOBS, jobs)
+        entry = CacheService.get_or_load_entry(CacheKeys.JOBS, self.k8s_service.get_jobs, polling_max_age())
+        if not label_selector:
+            response = rendered_response(request, entry)
+            if response:
+                return response
+        
+        etag = make_etag(entry['hash'], label_selector)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        
+        jobs = entry['data'] or []
         if label_selector:
             jobs = self._filter_by_label(jobs, label_selector)
         
         serializer = JobSerializer(jobs, many=True)
-        return Response(serializer.data)
+        return with_etag(Response(serializer.data), etag)
     
     def retrieve(self, request, pk=None):
         """Obtém detalhes de um job específico."""
@@ -89,18 +102,17 @@ class JobViewSet(viewsets.ViewSet):
         rpa_name = request.query_params.get('rpa_name', None)
         logger.info(f"[{request_id}] GET /api/jobs/status/ - rpa_name={rpa_name}")
         
-        jobs = CacheService.get_data(CacheKeys.JOBS, []) or []
-        if not jobs:
-            logger.warning(f"[{request_id}] Cache de jobs vazio, buscando do Kubernetes")
-            try:
-                jobs = self.k8s_service.get_jobs()
-                CacheService.update(CacheKeys.JOBS, jobs)
-                logger.info(f"[{request_id}] {len(jobs)} jobs obtidos do Kubernetes")
-            except Exception as e:
-                logger.error(f"[{request_id}] Erro ao buscar jobs: {e}", exc_info=True)
-                jobs = []
-        else:
+        # Jobs, pods e execuções da mesma geração do polling (contagens consistentes entre si)
+        snapshot = CacheService.snapshot(CacheKeys.JOBS, CacheKeys.PODS, CacheKeys.EXECUTIONS)
+        try:
+            jobs = snapshot.data(CacheKeys.JOBS)
+            if jobs is None:
+                jobs = CacheService.get_or_load(CacheKeys.JOBS, self.k8s_service.get_jobs, polling_max_age())
+            jobs = jobs or []
             logger.debug(f"[{request_id}] {len(jobs)} jobs obtidos do cache")
+        except Exception as e:
+            logger.error(f"[{request_id}] Erro ao buscar jobs: {e}", exc_info=True)
+            jobs = []
         
         if rpa_name:
             label_selector = f"nome_robo={rpa_name.lower()}"
@@ -123,25 +135,8 @@ class JobViewSet(viewsets.ViewSet):
             
             # Se não encontrou nos labels, tentar extrair do nome do job
             if not nome_robo and job_name:
-                normalized_name = job_name.lower()
-                
-                # 1. Remover prefixos conhecidos (ordem importa: strings mais longas primeiro)
-                for prefix in ['rpa-cronjob-', 'rpa-job-', 'cronjob-', 'job-', 'rpa-']:
-                    if normalized_name.startswith(prefix):
-                        normalized_name = normalized_name[len(prefix):]
-                        break
-                
-                # 2. Remover sufixos de hash/timestamp
-                # Remove timestamps numéricos ou hashes hexadecimais no final
-                # Ex: -1734567890 (cronjob) ou -w5mwl-tt5tw (job k8s) ou -abc12 (pod)
-                
-                # Remover padrão de hash duplo do K8s (ex: -w5mwl-tt5tw)
-                normalized_name = re.sub(r'-[a-z0-9]{4,10}-[a-z0-9]{4,10}$', '', normalized_name)
-                
-                # Remover padrão de timestamp ou hash simples (ex: -123456 ou -abcde)
-                normalized_name = re.sub(r'-[a-z0-9]+$', '', normalized_name)
-                
-                nome_robo = normalized_name
+                # Sem prefixos conhecidos e sufixos de hash/timestamp (ex: -1734567890, -w5mwl-tt5tw)
+                nome_robo = job_robot_name(job_name.lower())
             
             # Se ainda não encontrou, marcar como unknown
             if not nome_robo or nome_robo == 'unknown':
@@ -195,16 +190,18 @@ class JobViewSet(viewsets.ViewSet):
         
         # Buscar PODS de deployments (não aparecem como jobs)
         try:
-            pods = CacheService.get_data(CacheKeys.PODS, []) or []
-            if not pods:
-                pods = self.k8s_service.get_pods()
-                CacheService.update(CacheKeys.PODS, pods)
+            pods = snapshot.data(CacheKeys.PODS)
+            if pods is None:
+                pods = CacheService.get_or_load(
+                    CacheKeys.PODS, lambda: load_running_pods(self.k8s_service), polling_max_age()
+                )
+            pods = pods or []
             
             logger.debug(f"[{request_id}] Processando {len(pods)} pods para detectar deployments")
             
             # Processar pods que não estão associados a jobs (deployments)
             for pod in pods:
-                if not pod or not isinstance(pod, dict):
+                if not pod or not isinstance(pod, Mapping):
                     continue
                 
                 pod_name = pod.get('name', '')
@@ -227,19 +224,8 @@ class JobViewSet(viewsets.ViewSet):
                 
                 # Se não encontrou, tentar extrair do nome do pod
                 if not nome_robo and pod_name:
-                    normalized_name = pod_name.lower()
-                    
-                    # Remover prefixos
-                    for prefix in ['rpa-deployment-', 'deployment-', 'rpa-']:
-                        if normalized_name.startswith(prefix):
-                            normalized_name = normalized_name[len(prefix):]
-                            break
-                    
-                    # Remover sufixos de hash do pod (ex: -abc123-xyz45)
-                    normalized_name = re.sub(r'-[a-z0-9]{4,10}-[a-z0-9]{4,10}$', '', normalized_name)
-                    normalized_name = re.sub(r'-[a-z0-9]{5,}$', '', normalized_name)
-                    
-                    nome_robo = normalized_name
+                    # Sem prefixos e sufixos de hash do pod (ex: -abc123-xyz45)
+                    nome_robo = pod_robot_name(pod_name.lower())
                 
                 if not nome_robo or nome_robo == 'unknown':
                     continue
@@ -268,27 +254,25 @@ class JobViewSet(viewsets.ViewSet):
             logger.warning(f"[{request_id}] Erro ao buscar pods (continuando sem informações de  pods de deployment): {e}")
         
         # Buscar execuções pendentes do banco MySQL para todos os jobs identificados
-        execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
+        execucoes_por_robo = snapshot.data(CacheKeys.EXECUTIONS, {}) or {}
         
-        # Buscar apelidos do banco de dados
-        from api.models import RoboDockerizado
-        robos_db = RoboDockerizado.objects.filter(ativo=True).values('nome', 'apelido', 'tipo')
+        # Apelidos do banco de dados: índice por nome normalizado do resolver
+        resolver = get_robot_resolver()
         
-        # Criar mapa de apelidos: {nome_normalizado: (apelido, tipo)}
-        apelidos_map = {}
-        for robo in robos_db:
-            nome_norm = robo['nome'].replace(' ', '').replace('-', '').replace('_', '').lower()
-            apelido = robo['apelido'] or robo['nome']  # Usar apelido se existe, senão nome
-            apelidos_map[nome_norm] = (apelido, robo['tipo'])
-            logger.debug(f"[{request_id}] Mapeamento: '{robo['nome']}' (norm: '{nome_norm}') -> apelido: '{apelido}'")
+        def apelido_do_robo(nome: str):
+            """(apelido, tipo) do robô ativo cadastrado com o mesmo nome normalizado, ou None."""
+            robo = resolver.robot(nome, enabled=True)
+            if robo is None:
+                return None
+            return robo['apelido'] or robo['nome'], robo['tipo']  # Usar apelido se existe, senão nome
         
-        logger.info(f"[{request_id}] {len(apelidos_map)} robôs cadastrados no banco, {len(status_by_rpa)} detectados rodando")
+        logger.info(f"[{request_id}] {len(status_by_rpa)} robôs detectados rodando")
         
         # Set de nomes normalizados já processados (para evitar duplicatas)
         processed_normalized_names = set()
         for nome in status_by_rpa.keys():
             if nome != 'Unknown':
-                processed_normalized_names.add(nome.replace(' ', '').replace('-', '').replace('_', '').lower())
+                processed_normalized_names.add(normalize_name(nome))
 
         # 1. Atualizar execuções e apelidos para jobs já identificados
         for nome_robo in list(status_by_rpa.keys()):  # Usar list() para permitir modificação do dict durante iteração
@@ -298,8 +282,8 @@ class JobViewSet(viewsets.ViewSet):
                 continue
             
             # Buscar apelido do banco
-            nome_robo_norm = nome_robo.replace(' ', '').replace('-', '').replace('_', '').lower()
-            apelido_info = apelidos_map.get(nome_robo_norm)
+            nome_robo_norm = normalize_name(nome_robo)
+            apelido_info = apelido_do_robo(nome_robo)
             
             if apelido_info:
                 apelido, tipo_db = apelido_info
@@ -316,27 +300,18 @@ class JobViewSet(viewsets.ViewSet):
                 status_by_rpa[nome_robo]['apelido'] = nome_formatado
                 logger.warning(f"[{request_id}] Robô '{nome_robo}' não encontrado no banco (nome_norm: '{nome_robo_norm}'), usando nome formatado: '{nome_formatado}'")
             
-            # Tentar encontrar correspondência exata ou normalizada
-            execucoes = execucoes_por_robo.get(nome_robo, [])
-            if not execucoes:
-                # Busca flexível
-                for nome_db, execs in execucoes_por_robo.items():
-                    nome_db_norm = nome_db.replace(' ', '').replace('-', '').replace('_', '').lower()
-                    if nome_robo_norm == nome_db_norm:
-                        execucoes = execs
-                        break
-            
-            status_by_rpa[nome_robo]['execucoes_pendentes'] = len(execucoes)
+            # Correspondência exata ou por nome normalizado
+            status_by_rpa[nome_robo]['execucoes_pendentes'] = resolver.count_executions(nome_robo, execucoes_por_robo)
 
         # 2. Adicionar RPAs que têm execuções pendentes mas não têm jobs rodando (status parado)
         for nome_db, execs in execucoes_por_robo.items():
             if not execs:
                 continue
                 
-            nome_db_norm = nome_db.replace(' ', '').replace('-', '').replace('_', '').lower()
+            nome_db_norm = normalize_name(nome_db)
             if nome_db_norm not in processed_normalized_names:
                 # Buscar apelido do banco
-                apelido_info = apelidos_map.get(nome_db_norm)
+                apelido_info = apelido_do_robo(nome_db)
                 
                 if apelido_info:
                     apelido, tipo_db = apelido_info
@@ -390,17 +365,8 @@ class JobViewSet(viewsets.ViewSet):
         return Response(status_by_rpa)
 
     def _filter_by_label(self, jobs, label_selector: str):
-        if not label_selector or '=' not in label_selector:
-            return jobs
-        key, value = [part.strip() for part in label_selector.split('=', 1)]
-        if not key:
-            return jobs
-        filtered = []
-        for job in jobs:
-            labels = job.get('labels', {}) if isinstance(job, dict) else {}
-            if labels.get(key) == value:
-                filtered.append(job)
-        return filtered
+        # Índice por label da RecordList publicada pelo polling (sem varrer a lista)
+        return as_record_list(jobs).select(label_selector)
     
     @action(detail=False, methods=['get'])
     def unknown(self, request):
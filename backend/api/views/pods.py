@@ -2,6 +2,8 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from services.cache_service import CacheKeys, CacheService
+from api.cached_responses import polling_max_age
+from services.cluster_snapshot import as_record_list, load_running_pods
 from services.service_manager import get_kubernetes_service
 from api.serializers.models import PodSerializer, PodLogsSerializer
 import logging
@@ -24,10 +26,7 @@ class PodViewSet(viewsets.ViewSet):
         if rpa_name:
             label_selector = f"nome_robo={rpa_name.lower()}"
         
-        pods = CacheService.get_data(CacheKeys.PODS, []) or []
-        if not pods:
-            pods = self.k8s_service.get_pods()
-            CacheService.update(CacheKeys.PODS, pods)
+        pods = CacheService.get_or_load(CacheKeys.PODS, lambda: load_running_pods(self.k8s_service), polling_max_age()) or []
         if label_selector:
             pods = self._filter_by_label(pods, label_selector)
         
@@ -36,11 +35,8 @@ class PodViewSet(viewsets.ViewSet):
     
     def retrieve(self, request, pk=None):
         """Obtém detalhes de um pod específico."""
-        pods = CacheService.get_data(CacheKeys.PODS, []) or []
-        if not pods:
-            pods = self.k8s_service.get_pods()
-            CacheService.update(CacheKeys.PODS, pods)
-        pod = next((p for p in pods if p['name'] == pk), None)
+        pods = CacheService.get_or_load(CacheKeys.PODS, lambda: load_running_pods(self.k8s_service), polling_max_age()) or []
+        pod = as_record_list(pods).by_name(pk, request.query_params.get('namespace'))
         
         if not pod:
             return Response({'error': 'Pod não encontrado'}, status=status.HTTP_404_NOT_FOUND)
@@ -72,15 +68,6 @@ class PodViewSet(viewsets.ViewSet):
         return Response(serializer.data)
 
     def _filter_by_label(self, pods, label_selector: str):
-        if not label_selector or '=' not in label_selector:
-            return pods
-        key, value = [part.strip() for part in label_selector.split('=', 1)]
-        if not key:
-            return pods
-        filtered = []
-        for pod in pods:
-            labels = pod.get('labels', {}) if isinstance(pod, dict) else {}
-            if labels.get(key) == value:
-                filtered.append(pod)
-        return filtered
+        # Índice por label da RecordList publicada pelo polling (sem varrer a lista)
+        return as_record_list(pods).select(label_selector)
 
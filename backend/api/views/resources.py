@@ -5,6 +5,7 @@ from services.cache_service import CacheKeys, CacheService
 from services.service_manager import get_ssh_service
 from services.vm_resource_service import fetch_vm_resources
 from services.pod_resource_service import fetch_pod_resources
+from api.cached_responses import polling_max_age
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,23 +20,13 @@ def vm_resources(request):
     logger.info(f"[{request_id}] GET /api/resources/vm/ - Iniciando")
     
     try:
-        cache_entry = CacheService.get_entry(CacheKeys.VM_RESOURCES)
-        if cache_entry and cache_entry.get('data'):
-            elapsed = time.time() - start_time
-            logger.info(f"[{request_id}] Recursos da VM retornados do cache em {elapsed:.3f}s")
-            return Response(cache_entry['data'], status=status.HTTP_200_OK)
-        
-        logger.warning(f"[{request_id}] Cache vazio, buscando recursos da VM via SSH")
-        ssh_service = get_ssh_service()
-        
-        fetch_start = time.time()
-        resources = fetch_vm_resources(ssh_service)
-        fetch_elapsed = time.time() - fetch_start
-        logger.info(f"[{request_id}] fetch_vm_resources concluído em {fetch_elapsed:.3f}s")
-        
-        CacheService.update(CacheKeys.VM_RESOURCES, resources)
+        # Cache vazio: uma única busca via SSH atende as requisições concorrentes;
+        # cache vencido: servido enquanto a atualização roda em background
+        resources = CacheService.get_or_load(
+            CacheKeys.VM_RESOURCES, lambda: fetch_vm_resources(get_ssh_service()), max_stale=polling_max_age()
+        )
         elapsed = time.time() - start_time
-        logger.info(f"[{request_id}] Recursos da VM obtidos e cacheados em {elapsed:.3f}s")
+        logger.info(f"[{request_id}] Recursos da VM obtidos em {elapsed:.3f}s")
         
         if elapsed > 2.0:
             logger.warning(f"[{request_id}] ATENÇÃO: Endpoint vm_resources demorou {elapsed:.3f}s (acima de 2s)")
@@ -66,6 +57,17 @@ def pod_resources(request):
     logger.info(f"[{request_id}] GET /api/resources/pods/ - Iniciando")
     
     try:
+        # Snapshot recente do coletor remoto (atualizado pelo polling) evita ida à VM
+        cache_entry = CacheService.get_entry(CacheKeys.POD_RESOURCES)
+        if cache_entry and time.time() - cache_entry['updated_at'] <= polling_max_age():
+            pods_metrics = cache_entry['data'] or []
+            logger.info(f"[{request_id}] Recursos dos pods retornados do cache em {time.time() - start_time:.3f}s")
+            return Response({
+                'pods': pods_metrics,
+                'count': len(pods_metrics),
+                'timestamp': cache_entry['updated_at']
+            }, status=status.HTTP_200_OK)
+        
         ssh_service = get_ssh_service()
         
         fetch_start = time.time()
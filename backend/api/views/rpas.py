@@ -1,14 +1,18 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from services.cache_service import CacheKeys, CacheService
+from services.cache_service import CacheKeys, CacheService, content_hash
+from api.etag import make_etag, not_modified, with_etag
+from api.cached_responses import rendered_response
+from services.cluster_snapshot import as_record_list
+from services.robot_identity import get_robot_resolver
 from services.service_manager import get_kubernetes_service
 from api.serializers.models import (
     RPASerializer, CreateRPASerializer, UpdateRPASerializer
 )
 from api.models import RoboDockerizado
 from django.utils import timezone
-from typing import Dict, List
+from collections.abc import Mapping
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,19 +44,28 @@ class RPAViewSet(viewsets.ViewSet):
     def list(self, request):
         """Lista todos os RPAs (ativos e standby) do banco de dados."""
         # Tentar obter do cache primeiro (processado em background pelo PollingService)
-        rpas_cache = CacheService.get_data(CacheKeys.RPAS_PROCESSED)
-        if rpas_cache:
-            # Cache disponível - retornar instantaneamente
-            serializer = RPASerializer(rpas_cache, many=True)
-            return Response(serializer.data)
+        entry = CacheService.get_entry(CacheKeys.RPAS_PROCESSED)
+        if entry and entry['data']:
+            # Cache disponível - retornar instantaneamente (ou 304 se o cliente já tem esta versão)
+            response = rendered_response(request, entry)
+            if response:
+                return response
+            etag = make_etag(entry['hash'])
+            cached = not_modified(request, etag)
+            if cached:
+                return cached
+            serializer = RPASerializer(entry['data'], many=True)
+            return with_etag(Response(serializer.data), etag)
         
         # Fallback: processar agora se cache não estiver disponível (primeira requisição)
         logger.debug("Cache de RPAs não disponível, processando agora...")
         rpas_queryset = RoboDockerizado.objects.filter(tipo='rpa')
         
-        # Buscar dados do cache
-        execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
-        jobs_por_rpa = self._contar_jobs_por_rpa()
+        # Buscar dados do cache (execuções e jobs lidos juntos)
+        snapshot = CacheService.snapshot(CacheKeys.EXECUTIONS, CacheKeys.JOBS)
+        execucoes_por_robo = snapshot.data(CacheKeys.EXECUTIONS, {}) or {}
+        jobs_por_rpa = self._contar_jobs_por_rpa(snapshot.data(CacheKeys.JOBS, []) or [])
+        resolver = get_robot_resolver()
         
         # Processar RPAs do banco
         rpas = []
@@ -60,7 +73,7 @@ class RPAViewSet(viewsets.ViewSet):
             rpa_data = rpa_obj.to_dict()
             
             # Obter execuções pendentes (do cache)
-            execucoes_pendentes = self._buscar_execucoes_cache(rpa_obj.nome, execucoes_por_robo)
+            execucoes_pendentes = resolver.count_executions(rpa_obj.nome, execucoes_por_robo)
             
             # Obter jobs ativos (do cache)
             jobs_ativos = jobs_por_rpa.get(rpa_obj.nome.lower(), 0)
@@ -80,8 +93,12 @@ class RPAViewSet(viewsets.ViewSet):
         # Armazenar no cache para próximas requisições
         CacheService.update(CacheKeys.RPAS_PROCESSED, rpas)
         
+        etag = make_etag(content_hash(rpas))
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
         serializer = RPASerializer(rpas, many=True)
-        return Response(serializer.data)
+        return with_etag(Response(serializer.data), etag)
     
     def retrieve(self, request, pk=None):
         """Obtém detalhes de um RPA específico do banco de dados."""
@@ -89,10 +106,11 @@ class RPAViewSet(viewsets.ViewSet):
             rpa_obj = RoboDockerizado.objects.get(nome=pk, tipo='rpa')
             rpa_data = rpa_obj.to_dict()
             
-            # Obter informações adicionais
-            execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
-            execucoes_pendentes = self._buscar_execucoes_cache(pk, execucoes_por_robo)
-            jobs_por_rpa = self._contar_jobs_por_rpa()
+            # Obter informações adicionais (execuções e jobs lidos juntos)
+            snapshot = CacheService.snapshot(CacheKeys.EXECUTIONS, CacheKeys.JOBS)
+            execucoes_por_robo = snapshot.data(CacheKeys.EXECUTIONS, {}) or {}
+            execucoes_pendentes = get_robot_resolver().count_executions(pk, execucoes_por_robo)
+            jobs_por_rpa = self._contar_jobs_por_rpa(snapshot.data(CacheKeys.JOBS, []) or [])
             jobs_ativos = jobs_por_rpa.get(pk.lower(), 0)
             
             # Garantir que tags tenha "Exec"
@@ -250,19 +268,14 @@ class RPAViewSet(viewsets.ViewSet):
                 if not jobs_cache:
                     jobs_cache = self.k8s_service.get_jobs()
                 
-                # Filtrar jobs deste RPA
-                for job in jobs_cache:
+                # Jobs deste RPA (índice por nome normalizado do robô)
+                for job in as_record_list(jobs_cache).with_robot(pk):
                     job_name = job.get('name', '')
-                    labels = job.get('labels', {})
-                    nome_robo = labels.get('nome_robo') or labels.get('nome-robo') or ''
-                    
-                    # Verificar se é deste RPA (comparar nomes normalizados)
-                    if nome_robo.lower().replace('-', '').replace('_', '') == pk.lower().replace('-', '').replace('_', ''):
-                        # Deletar job
-                        success = self.k8s_service.delete_job(job_name)
-                        if success:
-                            jobs_deletados += 1
-                            logger.info(f"Job {job_name} deletado (RPA {pk} em standby)")
+                    # Deletar job
+                    success = self.k8s_service.delete_job(job_name)
+                    if success:
+                        jobs_deletados += 1
+                        logger.info(f"Job {job_name} deletado (RPA {pk} em standby)")
                 
                 logger.info(f"{jobs_deletados} job(s) deletado(s) ao mover RPA {pk} para standby")
             except Exception as e:
@@ -312,11 +325,10 @@ class RPAViewSet(viewsets.ViewSet):
             logger.error(f"Erro ao ativar RPA: {e}")
             return Response({'error': f'Erro ao ativar RPA: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _contar_jobs_por_rpa(self):
-        jobs_cache = CacheService.get_data(CacheKeys.JOBS, []) or []
+    def _contar_jobs_por_rpa(self, jobs_cache):
         jobs_por_rpa = {}
         for job in jobs_cache:
-            labels = job.get('labels', {}) if isinstance(job, dict) else {}
+            labels = job.get('labels', {}) if isinstance(job, Mapping) else {}
             nome_robo = (labels.get('nome_robo') or labels.get('nome-robo') or labels.get('app') or '').lower()
             if not nome_robo:
                 continue
@@ -325,32 +337,16 @@ class RPAViewSet(viewsets.ViewSet):
                 jobs_por_rpa[nome_robo] = jobs_por_rpa.get(nome_robo, 0) + active
         return jobs_por_rpa
 
-    def _buscar_execucoes_cache(self, nome_rpa: str, exec_cache: Dict[str, List[Dict]]):
-        execucoes = exec_cache.get(nome_rpa, [])
-        if execucoes:
-            return len(execucoes)
-        nome_normalizado = nome_rpa.replace('-', '').replace('_', '').lower()
-        for nome_db, execs in exec_cache.items():
-            if nome_normalizado == nome_db.replace('-', '').replace('_', '').lower():
-                return len(execs)
-        return 0
-
     def _remover_execucoes_do_cache(self, nome_rpa: str):
         """Remove execuções de um RPA específico do cache."""
         try:
-            execucoes_cache = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
+            # Cópia alterável: o snapshot publicado no cache é somente leitura
+            execucoes_cache = CacheService.get_mutable(CacheKeys.EXECUTIONS, {}) or {}
             if not isinstance(execucoes_cache, dict):
                 return
             
-            # Normalizar nome para comparação
-            nome_normalizado = nome_rpa.replace('-', '').replace('_', '').lower()
-            
-            # Encontrar e remover todas as chaves que correspondem a este RPA
-            chaves_para_remover = []
-            for nome_cache in execucoes_cache.keys():
-                nome_cache_normalizado = nome_cache.replace('-', '').replace('_', '').lower()
-                if nome_normalizado == nome_cache_normalizado or nome_rpa.lower() == nome_cache.lower():
-                    chaves_para_remover.append(nome_cache)
+            # Todas as chaves que correspondem a este RPA (mesmo nome normalizado)
+            chaves_para_remover = get_robot_resolver().execution_keys(nome_rpa, execucoes_cache)
             
             # Remover as chaves encontradas
             if chaves_para_remover:
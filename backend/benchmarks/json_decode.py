@@ -0,0 +1,169 @@
+"""
+Benchmark da decodificação do `kubectl get pods -o json` com 5 mil pods.
+
+Compara o caminho antigo (bytes -> str -> json.loads) com services.json_codec
+(bytes direto, orjson se instalado, e leitura incremental de .items[]) e mede
+também o mapeamento para a lista de pods do backend (parse_pods).
+
+Uso (a partir de backend/):
+    python -m benchmarks.json_decode [--pods 5000] [--repeat 5]
+"""
+import argparse
+import gc
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import json_codec  # noqa: E402
+from services.kubernetes_service import KubernetesService  # noqa: E402
+
+CHUNK_SIZE = 65536
+
+
+def make_pod(i: int) -> dict:
+    """Pod com o formato e o tamanho típicos de um job de RPA."""
+    robot = f"robo_{i % 40:02d}"
+    job = f"rpa-job-{robot.replace('_', '-')}-{i:05d}"
+    return {
+        'apiVersion': 'v1',
+        'kind': 'Pod',
+        'metadata': {
+            'name': f"{job}-x{i % 97:02d}q",
+            'namespace': 'default',
+            'uid': f"{i:08d}-0000-4000-8000-{i:012d}",
+            'resourceVersion': str(100000 + i),
+            'creationTimestamp': '2025-01-01T12:00:00Z',
+            'generateName': f"{job}-",
+            'labels': {
+                'nome_robo': robot,
+                'instancia': '1',
+                'job-name': job,
+                'controller-uid': f"{i:08d}-1111-4000-8000-{i:012d}",
+                'batch.kubernetes.io/job-name': job,
+            },
+            'ownerReferences': [{'apiVersion': 'batch/v1', 'kind': 'Job', 'name': job,
+                                 'uid': f"{i:08d}-1111-4000-8000-{i:012d}", 'controller': True}],
+            'managedFields': [{
+                'manager': 'kube-controller-manager', 'operation': 'Update', 'apiVersion': 'v1',
+                'time': '2025-01-01T12:00:00Z', 'fieldsType': 'FieldsV1',
+                'fieldsV1': {'f:metadata': {'f:labels': {f'f:{k}': {} for k in ('nome_robo', 'instancia', 'job-name')}},
+                             'f:spec': {'f:containers': {'k:{"name":"rpa"}': {'f:image': {}, 'f:env': {}}}}},
+            }],
+        },
+        'spec': {
+            'restartPolicy': 'Never',
+            'nodeName': f"node-{i % 3}",
+            'imagePullSecrets': [{'name': 'docker-hub-secret'}],
+            'containers': [{
+                'name': 'rpa',
+                'image': f"rpaglobal/{robot}:latest",
+                'imagePullPolicy': 'Always',
+                'env': [{'name': 'NOME_ROBO', 'value': robot}],
+                'resources': {'limits': {'memory': '1953Mi'}, 'requests': {'memory': '1953Mi'}},
+                'volumeMounts': [{'name': 'kube-api-access', 'mountPath': '/var/run/secrets/kubernetes.io/serviceaccount',
+                                  'readOnly': True}],
+            }],
+            'volumes': [{'name': 'kube-api-access', 'projected': {'sources': [{'serviceAccountToken': {'path': 'token'}}]}}],
+        },
+        'status': {
+            'phase': 'Succeeded' if i % 5 else 'Running',
+            'startTime': '2025-01-01T12:00:01Z',
+            'conditions': [{'type': t, 'status': 'True', 'lastTransitionTime': '2025-01-01T12:00:01Z'}
+                           for t in ('Initialized', 'Ready', 'ContainersReady', 'PodScheduled')],
+            'containerStatuses': [{
+                'name': 'rpa', 'ready': False, 'restartCount': 0, 'image': f"rpaglobal/{robot}:latest",
+                'state': {'terminated': {'exitCode': 0, 'reason': 'Completed', 'startedAt': '2025-01-01T12:00:02Z',
+                                         'finishedAt': '2025-01-01T12:05:00Z'}},
+            }],
+        },
+    }
+
+
+def make_fixture(count: int) -> bytes:
+    document = {'apiVersion': 'v1', 'kind': 'List', 'metadata': {'resourceVersion': ''},
+                'items': [make_pod(i) for i in range(count)]}
+    # Mesmo formato indentado do kubectl -o json
+    return json.dumps(document, indent=4).encode('utf-8')
+
+
+def chunked(payload: bytes, link_bytes_per_sec: float = 0):
+    """
+    Entrega o payload em chunks como o stdout do SSH. Com link_bytes_per_sec os
+    chunks chegam numa thread produtora limitada à banda do link, como o
+    Transport do paramiko recebendo em background enquanto o consumidor processa.
+    """
+    chunks = [payload[start:start + CHUNK_SIZE] for start in range(0, len(payload), CHUNK_SIZE)]
+    if not link_bytes_per_sec:
+        yield from chunks
+        return
+
+    received = queue.Queue()
+
+    def produce():
+        started = time.perf_counter()
+        sent = 0
+        for chunk in chunks:
+            sent += len(chunk)
+            delay = started + sent / link_bytes_per_sec - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            received.put(chunk)
+        received.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        chunk = received.get()
+        if chunk is None:
+            return
+        yield chunk
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pods', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--link-mbps', type=float, default=200.0,
+                        help='banda simulada do SSH nos casos "via link" (Mbit/s)')
+    args = parser.parse_args()
+    link = args.link_mbps * 1000 * 1000 / 8
+
+    payload = make_fixture(args.pods)
+    k8s = KubernetesService(ssh_service=object())
+    print(f"Fixture: {args.pods} pods, {len(payload) / 1024 / 1024:.1f} MiB; backend do json_codec: {json_codec.BACKEND}")
+
+    cases = [
+        ('str + json.loads (anterior)', lambda: json.loads(payload.decode('utf-8'))),
+        ('json_codec.loads (bytes)', lambda: json_codec.loads(payload)),
+        ('json_codec.load_items (stream)', lambda: json_codec.load_items(chunked(payload))),
+        ('anterior + parse_pods', lambda: k8s.parse_pods(json.loads(payload.decode('utf-8')))),
+        ('json_codec.loads + parse_pods', lambda: k8s.parse_pods(json_codec.loads(payload))),
+        # Transferência + decodificação: o stream decodifica enquanto os chunks chegam
+        ('via link: read_all + json.loads', lambda: json.loads(b''.join(chunked(payload, link)).decode('utf-8'))),
+        ('via link: read_all + codec.loads', lambda: json_codec.loads(b''.join(chunked(payload, link)))),
+        ('via link: codec.load_items', lambda: json_codec.load_items(chunked(payload, link))),
+    ]
+    baselines = {}
+    for name, func in cases:
+        elapsed = best_of(args.repeat, func)
+        # Cada grupo (em memória / via link) é comparado com o seu primeiro caso
+        baseline = baselines.setdefault(name.startswith('via link'), elapsed)
+        print(f"  {name:<34} {elapsed * 1000:8.1f} ms  ({baseline / elapsed:4.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,10 @@ def get_ssh_config():
         'use_key': config.getboolean('SSH', 'use_key', fallback=False),
         'key_path': config.get('SSH', 'key_path', fallback=''),
         'password': config.get('SSH', 'password', fallback=''),
+        'pool_size': config.getint('SSH', 'pool_size', fallback=2),
+        'max_channels': config.getint('SSH', 'max_channels', fallback=8),
+        # none | ssh (compressão do transporte SSH) | gzip (saídas grandes via gzip -1 no remoto)
+        'compression': config.get('SSH', 'compression', fallback='none').strip().lower(),
     }
 
 def get_mysql_config():
@@ -74,9 +78,46 @@ def get_backend_config():
         return {
             'polling_interval_vm': config.getint('BACKEND', 'polling_interval_vm', fallback=10),
             'polling_interval_db': config.getint('BACKEND', 'polling_interval_db', fallback=10),
+            # Limites do intervalo adaptativo (acelera com mudanças, recua com dados estáveis)
+            'polling_interval_vm_min': config.getint('BACKEND', 'polling_interval_vm_min', fallback=2),
+            'polling_interval_vm_max': config.getint('BACKEND', 'polling_interval_vm_max', fallback=60),
+            'polling_interval_db_min': config.getint('BACKEND', 'polling_interval_db_min', fallback=2),
+            'polling_interval_db_max': config.getint('BACKEND', 'polling_interval_db_max', fallback=60),
+            # Cronjobs/deployments processados: refeitos quando mudam e, no máximo, neste intervalo
+            'polling_interval_definitions': config.getint('BACKEND', 'polling_interval_definitions', fallback=60),
+            # Sem requisições por client_idle_after (s), recursos da VM/pods e deployments só a cada idle_heartbeat_interval
+            'client_idle_after': config.getint('BACKEND', 'client_idle_after', fallback=300),
+            'idle_heartbeat_interval': config.getint('BACKEND', 'idle_heartbeat_interval', fallback=300),
+            # Opt-in: instala (SFTP) e executa o coletor na VM; ver shared/config.ini.example
+            'remote_collector': config.getboolean('BACKEND', 'remote_collector', fallback=False),
+            'remote_collector_gzip': config.getboolean('BACKEND', 'remote_collector_gzip', fallback=True),
+            'remote_collector_path': config.get('BACKEND', 'remote_collector_path', fallback='.dockerwatcher/collector.py'),
+            # Opt-in: um watch por tipo ocupa um canal SSH permanente (4 vagas de max_channels)
+            'kubernetes_watch': config.getboolean('BACKEND', 'kubernetes_watch', fallback=False),
+            # Opt-in até ser validada contra a versão do kubectl da VM
+            'kubectl_projection': config.getboolean('BACKEND', 'kubectl_projection', fallback=False),
+            # kubectl (um processo por chamada) | api (HTTP via kubectl proxy tunelado pelo SSH)
+            'kubernetes_backend': config.get('BACKEND', 'kubernetes_backend', fallback='kubectl').strip().lower(),
+            'kubernetes_api_host': config.get('BACKEND', 'kubernetes_api_host', fallback='127.0.0.1'),
+            'kubernetes_api_port': config.getint('BACKEND', 'kubernetes_api_port', fallback=8001),
         }
     return {
         'polling_interval_vm': 10,
         'polling_interval_db': 10,
+        'polling_interval_vm_min': 2,
+        'polling_interval_vm_max': 60,
+        'polling_interval_db_min': 2,
+        'polling_interval_db_max': 60,
+        'polling_interval_definitions': 60,
+        'client_idle_after': 300,
+        'idle_heartbeat_interval': 300,
+        'remote_collector': False,
+        'remote_collector_gzip': True,
+        'remote_collector_path': '.dockerwatcher/collector.py',
+        'kubernetes_watch': False,
+        'kubectl_projection': False,
+        'kubernetes_backend': 'kubectl',
+        'kubernetes_api_host': '127.0.0.1',
+        'kubernetes_api_port': 8001,
     }
 
@@ -5,6 +5,8 @@ import time
 import logging
 import uuid
 
+from services.client_activity import ClientActivity
+
 logger = logging.getLogger(__name__)
 
 class RequestLoggingMiddleware:
@@ -67,3 +69,18 @@ class RequestLoggingMiddleware:
             )
             raise
 
+
+
+class ClientActivityMiddleware:
+    """
+    Registra a atividade dos clientes da API (ver services.client_activity):
+    sem requisições, o polling dos dados exibidos só pela UI entra em heartbeat.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith('/api/'):
+            ClientActivity.touch()
+        return self.get_response(request)
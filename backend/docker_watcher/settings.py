@@ -35,6 +35,7 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'docker_watcher.middleware.RequestLoggingMiddleware',  # Middleware customizado para rastreamento
+    'docker_watcher.middleware.ClientActivityMiddleware',  # Demanda dos clientes para o polling
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -0,0 +1,46 @@
+"""
+Intervalo de polling adaptativo.
+
+Cada laço do PollingService ajusta o próprio intervalo pelo que observou no
+ciclo: quando os dados mudaram (ou há execuções pendentes) o intervalo cai pela
+metade até o mínimo; quando ficaram estáveis, dobra até o máximo. Assim a
+madrugada sem execuções não paga kubectl a cada 10s, e uma rajada de execuções
+é acompanhada de perto pela UI e pelo watcher.
+"""
+import threading
+from typing import Dict
+
+
+class AdaptiveInterval:
+    """Intervalo (s) entre `minimum` e `maximum`, partindo de `base`."""
+
+    FACTOR = 2.0
+
+    def __init__(self, base: float, minimum: float, maximum: float):
+        self.minimum = max(0.5, float(minimum))
+        self.maximum = max(self.minimum, float(maximum))
+        self.base = min(self.maximum, max(self.minimum, float(base)))
+        self._current = self.base
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> float:
+        """Intervalo efetivo atual."""
+        return self._current
+
+    def observe(self, changed: bool) -> float:
+        """Registra o resultado de um ciclo e retorna o próximo intervalo."""
+        with self._lock:
+            if changed:
+                self._current = max(self.minimum, self._current / self.FACTOR)
+            else:
+                self._current = min(self.maximum, self._current * self.FACTOR)
+            return self._current
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'interval': self._current,
+            'base': self.base,
+            'min': self.minimum,
+            'max': self.maximum,
+        }
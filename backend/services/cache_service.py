@@ -1,60 +1,426 @@
+"""
+Cache em memória dos snapshots coletados em background.
+
+As entradas são snapshots imutáveis compartilhados por referência: o escritor
+congela o payload ao publicar (dicts e listas viram FrozenDict/FrozenList;
+registros do cluster e ClusterSnapshot já são imutáveis) e troca a entrada
+inteira, nunca alterando uma entrada publicada. Leituras devolvem a própria
+entrada, sem cópia e sem lock. Quem precisa alterar os dados usa get_mutable().
+
+Cada entrada tem um hash do conteúdo e uma versão que só avança quando o
+conteúdo muda, usados pelas views para responder com ETag / 304. Chaves com
+renderer registrado guardam também a resposta JSON já renderizada (bytes),
+produzida uma vez por atualização e servida direto pelas views.
+
+get_or_load() carrega chaves ausentes com uma única chamada ao loader por vez
+(requisições concorrentes aguardam a mesma carga) e, com a entrada vencida,
+devolve o último dado válido enquanto a atualização roda em background.
+
+publish() grava várias chaves relacionadas como uma geração e snapshot() as lê
+juntas, sem misturar dados de ciclos de coleta diferentes.
+
+Mudanças de versão são notificadas: wait_for_change()/wait_for_changes()
+bloqueiam até uma chave mudar (condition variable no lock dos escritores) e
+subscribe() registra callbacks chamados a cada nova versão publicada.
+"""
 import copy
+import hashlib
+import itertools
+import logging
 import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from services import json_codec
+from services.k8s_records import to_plain
+
+logger = logging.getLogger(__name__)
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} é somente leitura (use CacheService.get_mutable para alterar)")
+
+
+class FrozenDict(dict):
+    """dict somente leitura publicado no cache; cópias devolvem o próprio objeto."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class FrozenList(list):
+    """list somente leitura publicada no cache; cópias devolvem o próprio objeto."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Cópia profunda somente leitura de dicts/listas/tuplas; valores já congelados passam direto."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList([freeze(item) for item in value])
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Cópia profunda alterável (dicts e listas comuns) de um valor publicado no cache."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(thaw(item) for item in value)
+    # Registros do cluster (imutáveis) viram dicts
+    plain = to_plain(value)
+    return plain if plain is not value else copy.deepcopy(value)
+
+
+def _digest(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def content_hash(data: Any) -> Optional[str]:
+    """Hash do conteúdo serializado em JSON; None se o payload não for serializável."""
+    try:
+        payload = json_codec.dumps(data)
+    except (TypeError, ValueError):
+        return None
+    return _digest(payload)
+
+
+class _Load:
+    """Carga em andamento de uma chave, compartilhada pelas requisições que a aguardam."""
+
+    __slots__ = ('done', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
 
 
 class CacheKeys:
     """Chaves centralizadas do cache de dados compartilhados."""
 
     VM_RESOURCES = "vm_resources"
+    CLUSTER_SNAPSHOT = "cluster_snapshot"  # ClusterSnapshot do último ciclo (pods, jobs, cronjobs, deployments)
     JOBS = "jobs"
     PODS = "pods"
+    POD_RESOURCES = "pod_resources"  # Métricas dos pods vindas do coletor remoto
     CRONJOBS = "cronjobs"
     DEPLOYMENTS = "deployments"
     EXECUTIONS = "executions"
     CONNECTION_STATUS = "connection_status"
+    POLLING_STATUS = "polling_status"  # Intervalos efetivos dos laços de polling
     RPAS_PROCESSED = "rpas_processed"  # Lista de RPAs já processada e pronta para exibição
     CRONJOBS_PROCESSED = "cronjobs_processed"  # Lista de cronjobs já processada e pronta para exibição
+    CRONJOBS_KUBERNETES = "cronjobs_kubernetes"  # Cronjobs do cluster com execuções pendentes (Dashboard)
     DEPLOYMENTS_PROCESSED = "deployments_processed"  # Lista de deployments já processada e pronta para exibição
 
 
+class CacheSnapshot:
+    """Entradas de várias chaves lidas juntas (CacheService.snapshot)."""
+
+    __slots__ = ('_entries', 'generation')
+
+    def __init__(self, entries: Dict[str, Optional[FrozenDict]]):
+        self._entries = entries
+        # Publicação mais recente refletida no snapshot
+        self.generation = max((entry["generation"] for entry in entries.values() if entry is not None), default=0)
+
+    def entry(self, key: str) -> Optional[FrozenDict]:
+        return self._entries.get(key)
+
+    def data(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry["data"] is None:
+            return default
+        return entry["data"]
+
+    def version(self, key: str) -> Optional[int]:
+        entry = self._entries.get(key)
+        return entry["version"] if entry is not None else None
+
+
 class CacheService:
     """
     Cache thread-safe para armazenar snapshots coletados em background.
 
-    Cada entrada contém:
-        - data: payload arbitrário
+    Cada entrada (FrozenDict) contém:
+        - data: payload congelado (ver freeze)
         - updated_at: timestamp epoch em segundos
         - error: última mensagem de erro (se houver)
         - meta: informações adicionais opcionais
+        - hash: hash do conteúdo de data (None se não serializável, ex. ClusterSnapshot)
+        - version: número crescente, mantido enquanto o hash não muda
+        - generation: número da publicação (publish) que gravou a entrada
+        - rendered: corpo JSON da resposta da API (bytes), se a chave tiver renderer
+
+    O lock serializa apenas os escritores; leitores pegam a referência da
+    entrada atual (atribuição/leitura de dict é atômica) e a compartilham.
     """
 
-    _lock = threading.RLock()
-    _cache: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+    _changed = threading.Condition(_lock)
+    _subscribers: Dict[str, List[Callable[[str, FrozenDict], None]]] = {}
+    _cache: Dict[str, FrozenDict] = {}
+    _versions = itertools.count(1)
+    _renderers: Dict[str, Callable[[Any], Any]] = {}
+    _loads_lock = threading.Lock()
+    _loads: Dict[str, _Load] = {}
+
+    @classmethod
+    def register_renderer(cls, key: str, renderer: Callable[[Any], Any]):
+        """
+        Registra a função que converte o payload da chave no corpo da resposta da API.
+
+        A cada update o resultado é serializado em bytes (json_codec.dumps) e
+        guardado na entrada; o hash passa a ser o do corpo renderizado.
+        """
+        cls._renderers[key] = renderer
 
     @classmethod
     def update(cls, key: str, data: Any, error: Optional[str] = None, meta: Optional[Dict[str, Any]] = None):
-        entry = {
-            "data": data,
-            "updated_at": time.time(),
-            "error": error,
-            "meta": meta or {},
-        }
+        cls.publish({key: data}, error=error, meta=meta)
+
+    @classmethod
+    def publish(cls, items: Dict[str, Any], error: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Publica várias chaves como uma única geração (trocadas juntas, sob um lock).
+
+        Leitores de snapshot() nunca veem parte das chaves de uma publicação e
+        parte de outra. Retorna o número da geração.
+        """
+        # Congelado e hasheado fora do lock: o custo fica com o escritor, uma vez por publicação
+        prepared = []
+        for key, data in items.items():
+            data = freeze(data)
+            previous = cls._cache.get(key)
+            if previous is not None and previous["data"] is data:
+                # Mesmo objeto já publicado (snapshot reaproveitado): sem renderizar nem hashear de novo
+                prepared.append((key, data, previous["rendered"], previous["hash"]))
+                continue
+            rendered = cls._render(key, data)
+            digest = _digest(rendered) if rendered is not None else content_hash(data)
+            prepared.append((key, data, rendered, digest))
+        meta = freeze(meta or {})
+
+        notifications = []
         with cls._lock:
-            cls._cache[key] = entry
+            generation = next(cls._versions)
+            now = time.time()
+            for key, data, rendered, digest in prepared:
+                previous = cls._cache.get(key)
+                if digest is not None and previous is not None and previous["hash"] == digest:
+                    version = previous["version"]
+                else:
+                    version = generation
+                entry = cls._cache[key] = FrozenDict({
+                    "data": data,
+                    "updated_at": now,
+                    "error": error,
+                    "meta": meta,
+                    "hash": digest,
+                    "version": version,
+                    "generation": generation,
+                    "rendered": rendered,
+                })
+                if previous is None or previous["version"] != version:
+                    notifications.append((key, entry, list(cls._subscribers.get(key, ()))))
+            if notifications:
+                cls._changed.notify_all()
+        for key, entry, subscribers in notifications:
+            cls._notify(key, entry, subscribers)
+        return generation
 
     @classmethod
-    def get_entry(cls, key: str) -> Optional[Dict[str, Any]]:
+    def snapshot(cls, *keys: str) -> "CacheSnapshot":
+        """Entradas atuais de várias chaves lidas numa única aquisição do lock (mesma geração publicada)."""
         with cls._lock:
-            entry = cls._cache.get(key)
-            return copy.deepcopy(entry) if entry is not None else None
+            entries = {key: cls._cache.get(key) for key in keys}
+        return CacheSnapshot(entries)
+
+    @classmethod
+    def _notify(cls, key: str, entry: FrozenDict, subscribers: List[Callable[[str, FrozenDict], None]]):
+        # Fora do lock: um callback pode ler ou publicar outras chaves
+        for callback in subscribers:
+            try:
+                callback(key, entry)
+            except Exception as e:
+                logger.warning(f"Erro no assinante de '{key}' do cache: {e}")
+
+    @classmethod
+    def subscribe(cls, key: str, callback: Callable[[str, FrozenDict], None]) -> Callable[[], None]:
+        """
+        Registra callback(key, entry), chamado na thread do escritor a cada nova versão da chave.
+
+        O callback deve ser rápido (ex. sinalizar um Event); trabalho pesado vai
+        para a thread do consumidor. Retorna a função que cancela a assinatura.
+        """
+        with cls._lock:
+            cls._subscribers.setdefault(key, []).append(callback)
+
+        def unsubscribe():
+            with cls._lock:
+                callbacks = cls._subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+
+        return unsubscribe
+
+    @classmethod
+    def version(cls, key: str) -> Optional[int]:
+        """Versão atual da chave (None se nunca publicada)."""
+        entry = cls._cache.get(key)
+        return entry["version"] if entry is not None else None
+
+    @classmethod
+    def wait_for_change(cls, key: str, since_version: Optional[int] = None,
+                        timeout: Optional[float] = None) -> Optional[FrozenDict]:
+        """
+        Aguarda a chave ter versão diferente de since_version.
+
+        Returns:
+            A entrada nova, ou None se o timeout expirar sem mudança
+        """
+        return cls.wait_for_changes({key: since_version}, timeout).get(key)
+
+    @classmethod
+    def wait_for_changes(cls, since: Dict[str, Optional[int]],
+                         timeout: Optional[float] = None) -> Dict[str, FrozenDict]:
+        """
+        Aguarda alguma das chaves mudar em relação às versões informadas ({key: versão}).
+
+        Returns:
+            {key: entrada} das chaves que mudaram; vazio se o timeout expirar
+        """
+        def changed():
+            result = {}
+            for key, since_version in since.items():
+                entry = cls._cache.get(key)
+                if entry is not None and entry["version"] != since_version:
+                    result[key] = entry
+            return result
+
+        with cls._changed:
+            return cls._changed.wait_for(changed, timeout) or {}
+
+    @classmethod
+    def _render(cls, key: str, data: Any) -> Optional[bytes]:
+        renderer = cls._renderers.get(key)
+        if renderer is None or data is None:
+            return None
+        try:
+            return json_codec.dumps(renderer(data))
+        except Exception as e:
+            logger.warning(f"Erro ao renderizar resposta do cache '{key}': {e}")
+            return None
+
+    @classmethod
+    def get_entry(cls, key: str) -> Optional[FrozenDict]:
+        """Entrada atual (somente leitura, compartilhada) ou None."""
+        return cls._cache.get(key)
 
     @classmethod
     def get_data(cls, key: str, default: Any = None) -> Any:
-        entry = cls.get_entry(key)
-        if entry is None:
+        """Payload atual (somente leitura, compartilhado) ou default."""
+        entry = cls._cache.get(key)
+        if entry is None or entry["data"] is None:
             return default
-        return copy.deepcopy(entry.get("data")) if entry.get("data") is not None else default
+        return entry["data"]
 
+    @classmethod
+    def get_mutable(cls, key: str, default: Any = None) -> Any:
+        """Cópia alterável do payload atual, para quem precisa modificá-lo antes de republicar."""
+        data = cls.get_data(key)
+        return thaw(data) if data is not None else default
 
+    @classmethod
+    def get_or_load(cls, key: str, loader: Callable[[], Any], max_stale: Optional[float] = None) -> Any:
+        """
+        Payload da chave, carregando com loader() quando ausente (ou invalidado com None).
+
+        Args:
+            key: chave do cache
+            loader: função sem argumentos que busca o dado (ex. k8s_service.get_jobs)
+            max_stale: idade (s) a partir da qual a entrada é atualizada em background;
+                o dado antigo continua sendo servido enquanto isso. None: nunca vence.
+
+        Raises:
+            A exceção do loader, se a chave estava ausente e a carga falhou
+        """
+        entry = cls.get_or_load_entry(key, loader, max_stale)
+        return entry["data"] if entry is not None else None
+
+    @classmethod
+    def get_or_load_entry(cls, key: str, loader: Callable[[], Any],
+                          max_stale: Optional[float] = None) -> Optional[FrozenDict]:
+        """Como get_or_load, devolvendo a entrada inteira (hash, rendered, updated_at)."""
+        entry = cls._cache.get(key)
+        if entry is not None and entry["data"] is not None:
+            if max_stale is not None and time.time() - entry["updated_at"] > max_stale:
+                cls._load(key, loader, wait=False)
+            return entry
+        cls._load(key, loader, wait=True)
+        return cls._cache.get(key)
+
+    @classmethod
+    def _load(cls, key: str, loader: Callable[[], Any], wait: bool):
+        """Executa (ou aguarda) a carga única da chave; sem wait ela roda em background."""
+        with cls._loads_lock:
+            load = cls._loads.get(key)
+            owner = load is None
+            if owner:
+                load = cls._loads[key] = _Load()
+
+        if owner:
+            if wait:
+                cls._run_load(key, loader, load)
+            else:
+                threading.Thread(
+                    target=cls._run_load, args=(key, loader, load), name=f"cache-load-{key}", daemon=True
+                ).start()
+
+        if wait:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+
+    @classmethod
+    def _run_load(cls, key: str, loader: Callable[[], Any], load: _Load):
+        try:
+            cls.update(key, loader())
+        except Exception as e:
+            load.error = e
+            logger.warning(f"Erro ao carregar '{key}' para o cache: {e}")
+        finally:
+            with cls._loads_lock:
+                cls._loads.pop(key, None)
+            load.done.set()
@@ -0,0 +1,73 @@
+"""
+Atividade dos clientes (dashboard Electron) na API.
+
+O ClientActivityMiddleware registra cada requisição em /api/. Sem requisições
+por `idle_after` segundos o backend considera que não há dashboard aberto, e o
+PollingService reduz os coletores usados só pela UI (recursos da VM, métricas
+dos pods, deployments processados) a um heartbeat. A primeira requisição depois
+disso notifica os ouvintes de on_resume(), que antecipam esses coletores.
+"""
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ClientActivity:
+    """Registro (por processo) da última requisição dos clientes."""
+
+    IDLE_AFTER = 300.0
+
+    _lock = threading.Lock()
+    _idle_after: float = IDLE_AFTER
+    _last_request: Optional[float] = None
+    _listeners: List[Callable[[], None]] = []
+
+    @classmethod
+    def configure(cls, idle_after: float):
+        cls._idle_after = max(1.0, float(idle_after))
+
+    @classmethod
+    def _idle_at(cls, now: float) -> bool:
+        return cls._last_request is None or now - cls._last_request >= cls._idle_after
+
+    @classmethod
+    def touch(cls) -> bool:
+        """Registra uma requisição; retorna True se ela encerrou um período ocioso."""
+        now = time.time()
+        with cls._lock:
+            resumed = cls._idle_at(now)
+            cls._last_request = now
+            listeners = list(cls._listeners) if resumed else []
+        if resumed:
+            logger.info("Cliente ativo na API: retomando coletores da UI")
+        for listener in listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.warning(f"Erro ao notificar retomada dos clientes: {e}")
+        return resumed
+
+    @classmethod
+    def is_idle(cls) -> bool:
+        """True se nenhum cliente fez requisições nos últimos `idle_after` segundos."""
+        return cls._idle_at(time.time())
+
+    @classmethod
+    def on_resume(cls, listener: Callable[[], None]) -> Callable[[], None]:
+        """Registra listener() chamado quando um cliente volta após período ocioso; retorna o cancelamento."""
+        with cls._lock:
+            cls._listeners.append(listener)
+
+        def remove():
+            with cls._lock:
+                if listener in cls._listeners:
+                    cls._listeners.remove(listener)
+
+        return remove
+
+    @classmethod
+    def last_request(cls) -> Optional[float]:
+        return cls._last_request
@@ -0,0 +1,300 @@
+"""
+Snapshot consolidado do cluster Kubernetes.
+
+Uma única chamada `kubectl get pods,jobs,cronjobs,deployments -o json` por ciclo
+de polling alimenta todos os consumidores (jobs, pods, watcher, recursos dos pods),
+em vez de cada um executar o seu próprio `kubectl get`.
+
+As listas do snapshot são RecordLists: além de publicadas no cache sem cópia,
+trazem índices por nome, labels (nome_robo, app, job-name) e fase, para que as
+views façam buscas diretas em vez de percorrer milhares de registros.
+"""
+import bisect
+import copy
+import hashlib
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.cache_service import CacheKeys, CacheService, FrozenList
+from services.k8s_records import CronjobInfo, DeploymentInfo, JobInfo, PodInfo
+from services.robot_identity import normalize_name
+
+# Recursos buscados na chamada consolidada e o `kind` de cada item no JSON
+SNAPSHOT_RESOURCES = "pods,jobs,cronjobs,deployments"
+SNAPSHOT_KINDS = ("Pod", "Job", "CronJob", "Deployment")
+
+# Sem intervalo de polling conhecido, snapshots mais velhos que isso são ignorados
+DEFAULT_MAX_AGE = 30.0
+
+
+def list_fingerprint(data: Dict) -> Optional[str]:
+    """
+    Impressão digital de uma List do kubectl/API: o hash da saída bruta (campo
+    'fingerprint', quando quem leu a saída o calculou) ou dos resourceVersions
+    dos itens. None se não houver como identificar a versão dos itens.
+    """
+    fingerprint = data.get('fingerprint')
+    if fingerprint:
+        return fingerprint
+    digest = hashlib.blake2b(digest_size=16)
+    for item in data.get('items', []):
+        metadata = item.get('metadata', {})
+        resource_version = metadata.get('resourceVersion')
+        if not resource_version:
+            return None
+        digest.update(f"{item.get('kind')}/{metadata.get('namespace')}/{metadata.get('name')}@{resource_version};"
+                      .encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Labels indexados já na construção do snapshot; os demais são indexados na primeira busca
+INDEXED_LABELS = ('nome_robo', 'app', 'job-name')
+# Labels que identificam o robô nas buscas por robô (standby)
+ROBOT_LABELS = ('nome_robo', 'nome-robo')
+
+
+# Nome do robô normalizado para comparação (ver services.robot_identity)
+robot_key = normalize_name
+
+
+class RecordList(FrozenList):
+    """
+    Lista imutável de registros do cluster com índices secundários.
+
+    Os índices são dicts montados uma vez por lista (os registros não mudam);
+    os de INDEXED_LABELS e nome na construção, os demais sob demanda.
+    """
+
+    __slots__ = ('_by_name', '_by_label', '_by_field', '_by_robot', '_sorted_names')
+
+    def __init__(self, records: Iterable = ()):
+        super().__init__(records)
+        # {nome: registros} - o mesmo nome pode existir em namespaces diferentes
+        self._by_name: Optional[Dict[str, Tuple]] = None
+        self._by_label: Dict[str, Dict[str, Tuple]] = {}
+        self._by_field: Dict[str, Dict[str, Tuple]] = {}
+        self._by_robot: Optional[Dict[str, Tuple]] = None
+        self._sorted_names: Optional[List[str]] = None
+
+    def build_indexes(self, labels: Iterable[str] = INDEXED_LABELS) -> 'RecordList':
+        self._name_index()
+        for key in labels:
+            self._label_index(key)
+        return self
+
+    def _name_index(self) -> Dict[str, Tuple]:
+        if self._by_name is None:
+            groups: Dict[str, List] = {}
+            for record in self:
+                groups.setdefault(record.get('name', ''), []).append(record)
+            self._by_name = {name: tuple(items) for name, items in groups.items()}
+        return self._by_name
+
+    def by_name(self, name: str, namespace: Optional[str] = None):
+        """
+        Registro com o nome informado no namespace (ou None). Sem namespace,
+        o primeiro registro com o nome, em qualquer namespace.
+        """
+        for record in self._name_index().get(name, ()):
+            if namespace is None or record.get('namespace') == namespace:
+                return record
+        return None
+
+    def _label_index(self, key: str) -> Dict[str, Tuple]:
+        index = self._by_label.get(key)
+        if index is None:
+            groups: Dict[str, List] = {}
+            for record in self:
+                value = (record.get('labels') or {}).get(key)
+                if value is not None:
+                    groups.setdefault(value, []).append(record)
+            index = self._by_label[key] = {value: tuple(items) for value, items in groups.items()}
+        return index
+
+    def with_label(self, key: str, value: str) -> Tuple:
+        """Registros cujo label key é igual a value (mesmo filtro de `-l key=value`)."""
+        return self._label_index(key).get(value, ())
+
+    def with_field(self, field: str, value) -> Tuple:
+        """Registros com o campo igual a value (ex. with_field('phase', 'Running'))."""
+        index = self._by_field.get(field)
+        if index is None:
+            groups: Dict = {}
+            for record in self:
+                groups.setdefault(record.get(field), []).append(record)
+            index = self._by_field[field] = {value: tuple(items) for value, items in groups.items()}
+        return index.get(value, ())
+
+    def with_robot(self, nome: str) -> Tuple:
+        """Registros do robô pelos labels de ROBOT_LABELS, comparando nomes normalizados (robot_key)."""
+        if self._by_robot is None:
+            groups: Dict[str, List] = {}
+            for record in self:
+                labels = record.get('labels') or {}
+                nome_robo = next((labels.get(key) for key in ROBOT_LABELS if labels.get(key)), '')
+                if nome_robo:
+                    groups.setdefault(robot_key(nome_robo), []).append(record)
+            self._by_robot = {key: tuple(items) for key, items in groups.items()}
+        return self._by_robot.get(robot_key(nome), ())
+
+    def with_name_prefix(self, prefix: str) -> List:
+        """Registros cujo nome começa com prefix (busca binária nos nomes ordenados)."""
+        index = self._name_index()
+        if self._sorted_names is None:
+            self._sorted_names = sorted(index)
+        names = self._sorted_names
+        start = bisect.bisect_left(names, prefix)
+        result = []
+        for name in names[start:]:
+            if not name.startswith(prefix):
+                break
+            result.extend(index[name])
+        return result
+
+    def select(self, label_selector: Optional[str]) -> 'RecordList':
+        """Filtro `key=value` (mesma regra dos _filter_by_label das views); outro formato não filtra."""
+        if not label_selector or '=' not in label_selector:
+            return self
+        key, value = [part.strip() for part in label_selector.split('=', 1)]
+        if not key:
+            return self
+        return RecordList(self.with_label(key, value))
+
+
+def as_record_list(records: Optional[Iterable]) -> RecordList:
+    """A própria lista se já for RecordList (índices prontos); senão uma RecordList com os registros."""
+    if isinstance(records, RecordList):
+        return records
+    return RecordList(records or ())
+
+
+class ClusterSnapshot:
+    """
+    Estado do cluster coletado em um único instante.
+
+    Imutável depois de construído: é publicado no cache como uma unidade
+    (jobs, pods, cronjobs e deployments sempre do mesmo ciclo) e por isso não é
+    copiado na leitura do cache. Os getters devolvem listas novas de registros
+    imutáveis (services.k8s_records), compartilhados sem cópia; as propriedades
+    pods/jobs/running_pods devolvem as RecordLists indexadas do snapshot.
+    """
+
+    def __init__(self, pods: List[PodInfo], jobs: List[JobInfo], cronjobs: List[CronjobInfo],
+                 deployments: List[DeploymentInfo], pod_items: List[Dict], collected_at: Optional[float] = None):
+        self._pods = as_record_list(pods).build_indexes()
+        self._jobs = as_record_list(jobs).build_indexes()
+        self._cronjobs = as_record_list(cronjobs)
+        self._deployments = as_record_list(deployments)
+        self._running_pods = RecordList(self._pods.with_field('phase', 'Running')).build_indexes()
+        # Itens brutos de pods (spec/resources), usados pelas métricas de recursos
+        self._pod_items = pod_items
+        self.collected_at = collected_at or time.time()
+
+    @classmethod
+    def from_list(cls, k8s_service, data: Dict, collected_at: Optional[float] = None) -> 'ClusterSnapshot':
+        """Monta o snapshot a partir da List retornada por `kubectl get <vários> -o json`."""
+        items_by_kind = {kind: [] for kind in SNAPSHOT_KINDS}
+        for item in data.get('items', []):
+            kind_items = items_by_kind.get(item.get('kind'))
+            if kind_items is not None:
+                kind_items.append(item)
+        return cls.from_items(k8s_service, items_by_kind, collected_at)
+
+    @classmethod
+    def from_items(cls, k8s_service, items_by_kind: Dict[str, List[Dict]],
+                   collected_at: Optional[float] = None) -> 'ClusterSnapshot':
+        """Monta o snapshot a partir dos objetos brutos agrupados por kind (Pod, Job, CronJob, Deployment)."""
+        items_by_kind = {kind: items_by_kind.get(kind, []) for kind in SNAPSHOT_KINDS}
+        pods = k8s_service.parse_pods({'items': items_by_kind['Pod']})
+        return cls(
+            pods=pods,
+            jobs=k8s_service.parse_jobs({'items': items_by_kind['Job']}, pods),
+            cronjobs=k8s_service.parse_cronjobs({'items': items_by_kind['CronJob']}),
+            deployments=k8s_service.parse_deployments({'items': items_by_kind['Deployment']}),
+            pod_items=items_by_kind['Pod'],
+            collected_at=collected_at,
+        )
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.collected_at
+
+    @property
+    def pods(self) -> RecordList:
+        return self._pods
+
+    @property
+    def jobs(self) -> RecordList:
+        return self._jobs
+
+    @property
+    def running_pods(self) -> RecordList:
+        return self._running_pods
+
+    @property
+    def cronjobs(self) -> RecordList:
+        return self._cronjobs
+
+    @property
+    def deployments(self) -> RecordList:
+        return self._deployments
+
+    def get_pods(self) -> List[PodInfo]:
+        return list(self._pods)
+
+    def get_jobs(self) -> List[JobInfo]:
+        return list(self._jobs)
+
+    def get_cronjobs(self) -> List[CronjobInfo]:
+        return list(self._cronjobs)
+
+    def get_deployments(self) -> List[DeploymentInfo]:
+        return list(self._deployments)
+
+    def restamped(self) -> 'ClusterSnapshot':
+        """Mesmo estado com collected_at atual (watch ou saída idêntica), compartilhando as mesmas listas."""
+        snapshot = copy.copy(self)
+        snapshot.collected_at = time.time()
+        return snapshot
+
+    def get_pods_document(self) -> Dict:
+        """Pods no formato de `kubectl get pods -o json` (somente leitura)."""
+        return {'items': self._pod_items}
+
+
+def publish_cluster_snapshot(snapshot: ClusterSnapshot, interval: Optional[float] = None,
+                             related: Optional[Dict] = None):
+    """
+    Publica o snapshot no cache; interval é o período de coleta, usado para avaliar frescor.
+
+    related são as chaves derivadas do mesmo snapshot (jobs, pods, ...), publicadas
+    na mesma geração para que leitores de CacheService.snapshot() vejam um único ciclo.
+    """
+    CacheService.publish({CacheKeys.CLUSTER_SNAPSHOT: snapshot, **(related or {})}, meta={'interval': interval})
+
+
+def get_fresh_cluster_snapshot() -> Optional[ClusterSnapshot]:
+    """Retorna o snapshot publicado se tiver no máximo dois ciclos de coleta de idade."""
+    entry = CacheService.get_entry(CacheKeys.CLUSTER_SNAPSHOT)
+    if not entry or entry.get('data') is None:
+        return None
+    interval = entry.get('meta', {}).get('interval')
+    max_age = interval * 2 if interval else DEFAULT_MAX_AGE
+    snapshot = entry['data']
+    return snapshot if snapshot.age <= max_age else None
+
+
+def load_running_pods(k8s_service) -> RecordList:
+    """
+    Pods rodando, os mesmos que o polling publica em CacheKeys.PODS: do snapshot
+    recente se houver, senão de k8s_service.get_pods() filtrado por phase Running.
+    Loader de CacheService.get_or_load para a chave PODS.
+    """
+    snapshot = get_fresh_cluster_snapshot()
+    if snapshot is not None:
+        return snapshot.running_pods
+    pods = as_record_list(k8s_service.get_pods())
+    return RecordList(pods.with_field('phase', 'Running')).build_indexes()
@@ -0,0 +1,226 @@
+"""
+Estado do cluster mantido por watch da API do Kubernetes.
+
+Em vez de listar pods, jobs, cronjobs e deployments a cada ciclo de polling,
+cada tipo é listado uma vez e depois acompanhado por um watch de longa duração
+(um canal SSH dedicado por tipo). Os eventos ADDED/MODIFIED/DELETED são
+aplicados num store em memória indexado por uid; ao perder o watch, o tipo é
+listado de novo (resync) e o watch retoma a partir do resourceVersion da lista.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from services import json_codec
+from services.cluster_snapshot import ClusterSnapshot
+from services.ssh_service import CommandStream
+
+logger = logging.getLogger(__name__)
+
+
+class WatchExpired(Exception):
+    """O resourceVersion do watch expirou (HTTP 410); é preciso listar de novo."""
+
+
+class ClusterWatchStore:
+    """
+    Store de objetos do cluster alimentado por watch.
+
+    on_change é chamado (em thread própria, com debounce) sempre que o estado
+    muda; o snapshot atual é obtido com get_snapshot().
+    """
+
+    # kind -> caminho da API (namespaced)
+    RESOURCES = {
+        'Pod': '/api/v1/namespaces/{namespace}/pods',
+        'Job': '/apis/batch/v1/namespaces/{namespace}/jobs',
+        'CronJob': '/apis/batch/v1/namespaces/{namespace}/cronjobs',
+        'Deployment': '/apis/apps/v1/namespaces/{namespace}/deployments',
+    }
+    RETRY_DELAY = 5.0
+    # Eventos em rajada (ex: job criando pod) geram uma única notificação
+    PUBLISH_DEBOUNCE = 0.3
+
+    def __init__(self, k8s_service, on_change: Optional[Callable[[], None]] = None):
+        self.k8s_service = k8s_service
+        self.on_change = on_change
+        self.namespace: Optional[str] = None
+        self._lock = threading.Lock()
+        self._objects: Dict[str, Dict[str, Dict]] = {kind: {} for kind in self.RESOURCES}
+        self._synced: Dict[str, bool] = {kind: False for kind in self.RESOURCES}
+        self._version = 0
+        self._snapshot: Optional[ClusterSnapshot] = None
+        self._snapshot_version = -1
+        self._changed = threading.Event()
+        self._stopping = threading.Event()
+        self._running = False
+        self._threads = []
+        # Watches abertos (kind -> stream), fechados em stop()
+        self._streams: Dict[str, CommandStream] = {}
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._watch_loop, args=(kind,), daemon=True, name=f"watch-{kind}")
+            for kind in self.RESOURCES
+        ]
+        self._threads.append(threading.Thread(target=self._publish_loop, daemon=True, name="watch-publish"))
+        for thread in self._threads:
+            thread.start()
+        logger.info("ClusterWatchStore iniciado")
+
+    def stop(self):
+        """Para as threads e fecha os canais dos watches abertos (inclusive os ociosos)."""
+        self._running = False
+        self._stopping.set()
+        self._changed.set()
+        with self._lock:
+            streams = list(self._streams.values())
+        for stream in streams:
+            stream.cancel()
+        deadline = time.time() + 2.0
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.time()))
+        self._threads = []
+        logger.info("ClusterWatchStore parado")
+
+    @property
+    def synced(self) -> bool:
+        """True quando todos os tipos foram listados e estão com watch ativo."""
+        with self._lock:
+            return self._running and all(self._synced.values())
+
+    def get_snapshot(self) -> ClusterSnapshot:
+        """Snapshot do estado atual (reconstruído só quando houve mudança desde o último)."""
+        with self._lock:
+            version = self._version
+            if self._snapshot is not None and self._snapshot_version == version:
+                return self._snapshot.restamped()
+            items_by_kind = {kind: list(objects.values()) for kind, objects in self._objects.items()}
+
+        snapshot = ClusterSnapshot.from_items(self.k8s_service, items_by_kind)
+        with self._lock:
+            if version >= self._snapshot_version:
+                self._snapshot = snapshot
+                self._snapshot_version = version
+        return snapshot
+
+    def _set_synced(self, kind: str, synced: bool):
+        with self._lock:
+            self._synced[kind] = synced
+
+    def _mark_changed(self):
+        """Chamar com lock."""
+        self._version += 1
+        self._changed.set()
+
+    @staticmethod
+    def _strip(obj: Dict) -> Dict:
+        # managedFields não é usado e costuma ser a maior parte do objeto
+        obj.get('metadata', {}).pop('managedFields', None)
+        return obj
+
+    def _resync(self, kind: str) -> str:
+        """Lista o tipo inteiro, substitui o conteúdo do store e retorna o resourceVersion da lista."""
+        path = self.RESOURCES[kind].format(namespace=self.namespace)
+        data = self.k8s_service.get_raw(path)
+        objects = {}
+        for item in data.get('items', []):
+            uid = item.get('metadata', {}).get('uid')
+            if uid:
+                objects[uid] = self._strip(item)
+        with self._lock:
+            self._objects[kind] = objects
+            self._synced[kind] = True
+            self._mark_changed()
+        logger.info(f"Watch {kind}: resync com {len(objects)} objetos")
+        return data.get('metadata', {}).get('resourceVersion', '')
+
+    def _apply_event(self, kind: str, event: Dict) -> Optional[str]:
+        """Aplica um evento do watch e retorna o novo resourceVersion."""
+        event_type = event.get('type')
+        obj = event.get('object') or {}
+        metadata = obj.get('metadata', {})
+
+        if event_type == 'ERROR':
+            if obj.get('code') == 410:
+                raise WatchExpired(obj.get('message', 'resourceVersion expirado'))
+            raise RuntimeError(f"Erro no watch de {kind}: {obj.get('message', obj)}")
+        if event_type == 'BOOKMARK':
+            return metadata.get('resourceVersion')
+
+        uid = metadata.get('uid')
+        if uid:
+            with self._lock:
+                if event_type == 'DELETED':
+                    self._objects[kind].pop(uid, None)
+                else:
+                    self._objects[kind][uid] = self._strip(obj)
+                self._mark_changed()
+        return metadata.get('resourceVersion')
+
+    def _watch(self, kind: str, resource_version: str) -> str:
+        """Consome o watch até o servidor encerrá-lo; retorna o último resourceVersion visto."""
+        path = self.RESOURCES[kind].format(namespace=self.namespace)
+        stream = self.k8s_service.watch_raw(path, resource_version)
+        with self._lock:
+            self._streams[kind] = stream
+        if not self._running:
+            stream.cancel()  # stop() chamado antes do registro
+        try:
+            buffer = b''
+            for chunk in stream:
+                if not self._running:
+                    break
+                buffer += chunk
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    if line.strip():
+                        resource_version = self._apply_event(kind, json_codec.loads(line)) or resource_version
+            if self._running and stream.return_code not in (0, None):
+                raise RuntimeError(f"Watch de {kind} terminou com código {stream.return_code}: {stream.stderr_text}")
+            return resource_version
+        finally:
+            with self._lock:
+                if self._streams.get(kind) is stream:
+                    del self._streams[kind]
+            stream.close()
+
+    def _watch_loop(self, kind: str):
+        resource_version = None
+        while self._running:
+            try:
+                if self.namespace is None:
+                    self.namespace = self.k8s_service.get_namespace()
+                if not resource_version:
+                    resource_version = self._resync(kind)
+                # Fim normal (timeout do servidor): retomar do último resourceVersion, sem nova lista
+                resource_version = self._watch(kind, resource_version)
+            except WatchExpired as e:
+                logger.info(f"Watch {kind} expirado ({e}), listando novamente")
+                resource_version = None
+            except Exception as e:
+                if not self._running:
+                    break
+                # Desconexão: o store deste tipo deixa de ser confiável até o próximo resync
+                self._set_synced(kind, False)
+                resource_version = None
+                logger.warning(f"Watch {kind} interrompido: {e}; nova tentativa em {self.RETRY_DELAY}s")
+                self._stopping.wait(self.RETRY_DELAY)
+
+    def _publish_loop(self):
+        while self._running:
+            if not self._changed.wait(timeout=1.0):
+                continue
+            time.sleep(self.PUBLISH_DEBOUNCE)
+            self._changed.clear()
+            if not self._running or not self.synced or self.on_change is None:
+                continue
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.warning(f"Erro ao publicar mudança do cluster: {e}")
@@ -0,0 +1,158 @@
+"""
+Decodificação de JSON das saídas do kubectl/API.
+
+Usa orjson quando instalado (opcional, `pip install orjson`) e a biblioteca
+padrão caso contrário. Decodifica direto dos bytes, sem a cópia intermediária
+em str, e oferece leitura incremental dos itens de `.items[]` à medida que os
+chunks chegam do SSH. dumps() serializa os payloads do cache (registros do
+cluster, FrozenDict/FrozenList) direto para bytes.
+
+Durante a decodificação o coletor de ciclos (gc) fica pausado: um documento do
+kubectl cria centenas de milhares de dicts/listas sem ciclos, e as coletas
+disparadas por essas alocações percorrem o heap inteiro várias vezes, custando
+mais do que a própria decodificação. Na leitura incremental a pausa cobre só
+a decodificação de cada item, não a espera pelos chunks do SSH.
+"""
+import codecs
+import datetime
+import decimal
+import gc
+import json
+import threading
+import uuid
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+JSONDecodeError = json.JSONDecodeError
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def _gc_paused():
+    """Pausa o gc enquanto houver alguma decodificação em andamento (em qualquer thread)."""
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def loads(payload: Union[bytes, str]):
+    """Decodifica um documento JSON completo (bytes ou str)."""
+    with _gc_paused():
+        if orjson is not None:
+            # orjson.JSONDecodeError é subclasse de json.JSONDecodeError
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+
+def iter_items(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    """
+    Gera os objetos de `.items[]` de uma List do kubectl enquanto o stdout chega.
+
+    Cada item é decodificado assim que o seu texto está completo no buffer, então
+    o mapeamento pode começar antes do fim da transferência. Os demais campos do
+    documento (apiVersion, kind, metadata) são ignorados.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    text = ''
+    pos = 0
+    in_items = False
+    done = False
+    for chunk in chunks:
+        if done:
+            continue  # drenar o stream
+        # O decoder incremental guarda caracteres UTF-8 cortados no fim do chunk
+        text = text[pos:] + decoder.decode(chunk)
+        pos = 0
+
+        if not in_items:
+            start = text.find('"items"')
+            bracket = text.find('[', start) if start >= 0 else -1
+            if bracket < 0:
+                continue
+            in_items = True
+            pos = bracket + 1
+
+        while True:
+            while pos < len(text) and (text[pos] in _WHITESPACE or text[pos] == ','):
+                pos += 1
+            if pos >= len(text):
+                break
+            if text[pos] == ']':
+                done = True
+                break
+            try:
+                # gc pausado só durante a decodificação do item, nunca durante a leitura do SSH
+                with _gc_paused():
+                    item, end = _decoder.raw_decode(text, pos)
+            except JSONDecodeError:
+                break  # item incompleto: aguardar o próximo chunk
+            pos = end
+            yield item
+    if not done:
+        raise JSONDecodeError("lista de itens ausente ou incompleta", text, pos)
+
+
+def load_items(chunks: Iterable[bytes]) -> Dict:
+    """Monta {'items': [...]} a partir do stdout em chunks (ver iter_items)."""
+    return {'items': list(iter_items(chunks))}
+
+
+def _default(value: Any):
+    """Tipos que o encoder não conhece, convertidos como no JSONEncoder do DRF."""
+    if isinstance(value, Mapping):
+        # Registros do cluster e labels (MappingProxyType)
+        return value.to_dict() if hasattr(value, 'to_dict') else dict(value)
+    if isinstance(value, datetime.datetime):
+        representation = value.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value.total_seconds())
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Objeto do tipo {type(value).__name__} não é serializável em JSON")
+
+
+_stdlib_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps(value: Any) -> bytes:
+    """Serializa em JSON compacto UTF-8 (orjson se instalado)."""
+    if orjson is not None:
+        # datetime pelo _default para manter o formato do DRF
+        return orjson.dumps(value, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return _stdlib_encoder.encode(value).encode('utf-8')
@@ -0,0 +1,176 @@
+"""
+Registros compactos de pods, jobs, cronjobs e deployments.
+
+Os parsers do KubernetesService produzem estes registros em vez de dicts
+aninhados: dataclasses congeladas com __slots__ (sem __dict__ por objeto),
+com namespaces, fases, status, imagens e labels internados (sys.intern) para
+que os milhares de jobs concluídos compartilhem as mesmas strings.
+
+Os registros são imutáveis, então cópias (inclusive deepcopy no cache) devolvem
+o próprio objeto. Eles se comportam como Mapping somente leitura
+(`pod['name']`, `job.get('labels', {})`) e são convertidos em dicts apenas na
+fronteira da API (renderer do DRF, to_dict() ao gravar no banco).
+"""
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+_EMPTY_LABELS = MappingProxyType({})
+
+
+def intern_str(value: Optional[str]) -> str:
+    """Interna strings repetidas entre objetos (namespaces, fases, labels, imagens)."""
+    return sys.intern(value) if isinstance(value, str) else (value or '')
+
+
+def freeze_labels(labels: Optional[Dict]) -> Mapping:
+    """Labels como mapa somente leitura, com chaves e valores internados."""
+    if not labels:
+        return _EMPTY_LABELS
+    return MappingProxyType({
+        intern_str(key): intern_str(value) if isinstance(value, str) else value
+        for key, value in labels.items()
+    })
+
+
+def _plain(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain(item) for item in value]
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    return value
+
+
+class _Record(Mapping):
+    """Base dos registros: leitura como Mapping, cópia sem custo e to_dict()."""
+
+    __slots__ = ()
+
+    def _keys(self) -> Tuple[str, ...]:
+        return tuple(self.__dataclass_fields__)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.__dataclass_fields__:
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys()
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação em dicts/listas (JSON) usada na fronteira da API."""
+        return {key: _plain(getattr(self, key)) for key in self._keys()}
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ContainerState(_Record):
+    type: str
+    started: str = ''
+    reason: str = ''
+    message: str = ''
+    exit_code: int = 0
+    finished: str = ''
+
+    # Campos expostos em cada tipo de estado (mesmo formato dos dicts anteriores)
+    _KEYS_BY_TYPE = {
+        'running': ('type', 'started'),
+        'waiting': ('type', 'reason', 'message'),
+        'terminated': ('type', 'exit_code', 'reason', 'finished'),
+    }
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self._KEYS_BY_TYPE.get(self.type, ('type',))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._keys() else default
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ContainerInfo(_Record):
+    name: str
+    ready: bool
+    restart_count: int
+    state: ContainerState
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class PodInfo(_Record):
+    name: str
+    namespace: str
+    labels: Mapping
+    phase: str
+    status: str
+    start_time: str
+    containers: Tuple[ContainerInfo, ...]
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class JobInfo(_Record):
+    name: str
+    namespace: str
+    labels: Mapping
+    completions: int
+    active: int
+    failed: int
+    start_time: str
+    completion_time: str
+    status: str
+    image: str
+    pod_name: str
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CronjobInfo(_Record):
+    name: str
+    namespace: str
+    schedule: str
+    suspended: bool
+    last_schedule_time: str
+    last_successful_time: str
+    image: str
+    nome_robo: str
+    memory_limit: str
+    timezone: str
+    ttl_seconds_after_finished: int
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class DeploymentInfo(_Record):
+    name: str
+    namespace: str
+    replicas: int
+    ready_replicas: int
+    available_replicas: int
+
+
+def to_plain(value):
+    """Converte registros (ou listas de registros) em dicts; outros valores passam direto."""
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return _plain(value)
@@ -0,0 +1,267 @@
+"""
+Cliente HTTP da API do Kubernetes tunelado pelo SSH.
+
+Cada chamada ao kubectl na VM paga a criação do processo, a leitura do
+kubeconfig e o discovery da API antes de qualquer dado trafegar. Este cliente
+fala HTTP/1.1 com keep-alive direto com um `kubectl proxy` na VM, através de
+canais direct-tcpip nos Transports do pool SSH: o proxy cuida da autenticação
+no API server e as conexões HTTP ficam abertas entre as chamadas.
+"""
+import http.client
+import io
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import paramiko
+
+from services import json_codec
+from services.ssh_service import CommandStream
+
+logger = logging.getLogger(__name__)
+
+
+class KubeApiError(Exception):
+    """Resposta de erro da API do Kubernetes (status HTTP >= 400)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class _ChannelIO(io.RawIOBase):
+    """Leitura bruta de um canal SSH, para ser envolvida em io.BufferedReader."""
+
+    def __init__(self, channel: paramiko.Channel):
+        self._channel = channel
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._channel.recv(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class _ChannelSocket:
+    """Adapta um canal direct-tcpip à interface de socket usada pelo http.client."""
+
+    def __init__(self, channel: paramiko.Channel):
+        self._channel = channel
+
+    def sendall(self, data: bytes):
+        self._channel.sendall(data)
+
+    def makefile(self, mode: str = 'rb', *args, **kwargs):
+        return io.BufferedReader(_ChannelIO(self._channel))
+
+    def settimeout(self, timeout: Optional[float]):
+        self._channel.settimeout(timeout)
+
+    def close(self):
+        self._channel.close()
+
+
+class _TunnelHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection cujo "socket" é um canal direct-tcpip aberto pelo SSHService."""
+
+    def __init__(self, ssh_service, host: str, port: int, timeout: Optional[float]):
+        super().__init__(host, port, timeout=timeout)
+        self.ssh_service = ssh_service
+
+    def connect(self):
+        channel = self.ssh_service.open_tunnel(self.host, self.port, timeout=self.timeout)
+        channel.settimeout(self.timeout)
+        self.sock = _ChannelSocket(channel)
+
+
+class KubeApiClient:
+    """
+    Chamadas list/get/watch/create/delete/patch à API do Kubernetes via `kubectl proxy`.
+
+    As conexões HTTP ociosas são reaproveitadas (keep-alive); o watch usa uma
+    conexão dedicada. Se nada estiver escutando na porta do proxy, ele é
+    iniciado na VM (`kubectl proxy` em background).
+    """
+
+    MAX_IDLE = 4
+    PROXY_START_WAIT = 5.0
+    # Métodos que podem ser reenviados mesmo se a falha vier depois do envio
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD'})
+
+    def __init__(self, ssh_service, host: str = '127.0.0.1', port: int = 8001):
+        self.ssh_service = ssh_service
+        self.host = host
+        self.port = port
+        self._idle: List[_TunnelHTTPConnection] = []
+        self._lock = threading.Lock()
+        self._proxy_lock = threading.Lock()
+
+    def _start_proxy(self):
+        """Inicia o kubectl proxy na VM e aguarda a porta aceitar conexões."""
+        with self._proxy_lock:
+            try:
+                self.ssh_service.open_tunnel(self.host, self.port, timeout=5).close()
+                return  # outra thread já iniciou
+            except paramiko.ChannelException:
+                pass
+            logger.info(f"Iniciando kubectl proxy na VM em {self.host}:{self.port}")
+            self.ssh_service.execute_command(
+                f"nohup kubectl proxy --address={self.host} --port={self.port} >/dev/null 2>&1 &", timeout=10
+            )
+            deadline = time.time() + self.PROXY_START_WAIT
+            while True:
+                try:
+                    self.ssh_service.open_tunnel(self.host, self.port, timeout=5).close()
+                    return
+                except paramiko.ChannelException:
+                    if time.time() > deadline:
+                        raise ConnectionError(f"kubectl proxy não respondeu em {self.host}:{self.port}")
+                    time.sleep(0.2)
+
+    def _new_connection(self, timeout: Optional[float]) -> _TunnelHTTPConnection:
+        conn = _TunnelHTTPConnection(self.ssh_service, self.host, self.port, timeout)
+        try:
+            conn.connect()
+        except paramiko.ChannelException:
+            self._start_proxy()
+            conn.connect()
+        return conn
+
+    def _checkout(self, timeout: Optional[float]) -> Tuple[_TunnelHTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+                conn.timeout = timeout
+                conn.sock.settimeout(timeout)
+                return conn, True
+        return self._new_connection(timeout), False
+
+    def _checkin(self, conn: _TunnelHTTPConnection):
+        with self._lock:
+            if len(self._idle) < self.MAX_IDLE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    def _url(path: str, params: Optional[Dict] = None) -> str:
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        return f"{path}?{urlencode(params)}" if params else path
+
+    def request(self, method: str, path: str, params: Optional[Dict] = None, body=None,
+                content_type: str = 'application/json', timeout: Optional[float] = 30) -> Tuple[int, bytes]:
+        """
+        Executa uma requisição e retorna (status, corpo).
+
+        Uma conexão reaproveitada que falhar é refeita, mas a requisição só é
+        reenviada se não pode ter sido processada: métodos idempotentes (GET),
+        ou falha ainda durante o envio (proxy já havia fechado a conexão).
+        POST/DELETE/PATCH que falham depois do envio (ex.: timeout aguardando a
+        resposta) propagam o erro, para não criar ou remover recursos duas vezes.
+        """
+        url = self._url(path, params)
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            if not isinstance(body, (bytes, str)):
+                body = json.dumps(body, separators=(',', ':'))
+            headers['Content-Type'] = content_type
+
+        while True:
+            conn, reused = self._checkout(timeout)
+            sent = False
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, OSError, paramiko.SSHException) as e:
+                conn.close()
+                if reused and (not sent or method in self.IDEMPOTENT_METHODS):
+                    logger.debug(f"Conexão HTTP reaproveitada falhou ({e}), abrindo outra")
+                    continue
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            return response.status, payload
+
+    def _check(self, status: int, payload: bytes) -> bytes:
+        if status >= 400:
+            try:
+                message = json.loads(payload).get('message', '')
+            except ValueError:
+                message = payload.decode('utf-8', errors='replace')
+            raise KubeApiError(status, message or http.client.responses.get(status, ''))
+        return payload
+
+    def get_json(self, path: str, params: Optional[Dict] = None, timeout: Optional[float] = 30) -> Dict:
+        return json_codec.loads(self._check(*self.request('GET', path, params, timeout=timeout)))
+
+    def get_text(self, path: str, params: Optional[Dict] = None, timeout: Optional[float] = 30) -> str:
+        return self._check(*self.request('GET', path, params, timeout=timeout)).decode('utf-8', errors='replace')
+
+    def list(self, path: str, label_selector: Optional[str] = None, timeout: Optional[float] = 30) -> Dict:
+        return self.get_json(path, {'labelSelector': label_selector}, timeout=timeout)
+
+    def create(self, path: str, obj: Dict, timeout: Optional[float] = 30) -> Dict:
+        return json_codec.loads(self._check(*self.request('POST', path, body=obj, timeout=timeout)))
+
+    def delete(self, path: str, propagation: str = 'Background', timeout: Optional[float] = 30) -> Dict:
+        # Mesmo comportamento padrão do `kubectl delete` (dependentes removidos em background)
+        body = {'kind': 'DeleteOptions', 'apiVersion': 'v1', 'propagationPolicy': propagation}
+        return json_codec.loads(self._check(*self.request('DELETE', path, body=body, timeout=timeout)))
+
+    def patch(self, path: str, patch: Dict, timeout: Optional[float] = 30) -> Dict:
+        """Aplica um JSON merge patch (equivalente ao `kubectl patch -p`)."""
+        return json_codec.loads(self._check(*self.request(
+            'PATCH', path, body=patch, content_type='application/merge-patch+json', timeout=timeout
+        )))
+
+    def watch(self, path: str, resource_version: str, chunk_size: int = 65536) -> CommandStream:
+        """
+        Abre um watch em conexão dedicada.
+
+        Returns:
+            CommandStream com um evento JSON por linha, no mesmo formato do
+            `kubectl get --raw` (return_code 0 quando o servidor encerra o watch)
+        """
+        params = {'watch': '1', 'allowWatchBookmarks': 'true', 'resourceVersion': resource_version}
+        conn = self._new_connection(timeout=30)
+        try:
+            conn.request('GET', self._url(path, params), headers={'Accept': 'application/json'})
+            response = conn.getresponse()
+            if response.status >= 400:
+                self._check(response.status, response.read())
+            # Watch ocioso pode ficar minutos sem eventos
+            conn.sock.settimeout(None)
+        except Exception:
+            conn.close()
+            raise
+
+        stream = CommandStream(iter(()))
+        # cancel() fecha só o canal: a leitura bloqueada em read1 termina como EOF
+        stream._cancel = conn.sock.close
+
+        def chunks():
+            try:
+                while True:
+                    data = response.read1(chunk_size)
+                    if not data:
+                        break
+                    yield data
+                stream.return_code = 0
+            except (http.client.HTTPException, OSError, ValueError) as e:
+                stream.return_code = -1
+                stream.stderr = str(e).encode('utf-8')
+            finally:
+                conn.close()
+
+        stream._chunks = chunks()
+        return stream
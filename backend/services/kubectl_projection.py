@@ -0,0 +1,187 @@
+"""
+Projeção da saída do kubectl no servidor.
+
+Em vez de `-o json` (objetos completos, com managedFields, env, volumes...),
+o kubectl recebe um template `-o jsonpath` que emite só os campos usados pelo
+backend: uma linha por objeto, campos separados por TAB, mapas/listas como JSON
+compacto (kubectl >= 1.19; versões antigas imprimem map[...] e a decodificação
+falha com ValueError em vez de gerar dados errados). A saída é remontada aqui em objetos com o mesmo formato do JSON do
+kubectl (só com os campos projetados), então os parsers existentes funcionam
+sem alteração.
+"""
+import json
+from typing import Dict, Iterable, List, Tuple, Union
+
+PathPart = Union[str, int]
+
+# Tipos de campo:
+#   str  - valor textual
+#   int  - inteiro
+#   bool - true/false
+#   json - mapa/lista impresso como JSON pelo kubectl
+# Um '*' no caminho projeta o campo de todos os elementos da lista, p.ex. a
+# imagem de cada container: um {range} interno emite cada valor seguido de
+# ELEMENT_SEPARATOR (caractere de controle, não aparece em nomes nem em JSON).
+POD_FIELDS: List[Tuple[Tuple[PathPart, ...], str]] = [
+    (('metadata', 'name'), 'str'),
+    (('metadata', 'namespace'), 'str'),
+    (('metadata', 'labels'), 'json'),
+    (('status', 'phase'), 'str'),
+    (('status', 'startTime'), 'str'),
+    (('status', 'containerStatuses'), 'json'),
+    (('spec', 'nodeName'), 'str'),
+    (('spec', 'containers', '*', 'image'), 'str'),
+    (('spec', 'containers', '*', 'resources'), 'json'),
+]
+
+JOB_FIELDS = [
+    (('metadata', 'name'), 'str'),
+    (('metadata', 'namespace'), 'str'),
+    (('metadata', 'labels'), 'json'),
+    (('status', 'active'), 'int'),
+    (('status', 'failed'), 'int'),
+    (('status', 'succeeded'), 'int'),
+    (('status', 'startTime'), 'str'),
+    (('status', 'completionTime'), 'str'),
+    (('spec', 'template', 'spec', 'containers', 0, 'image'), 'str'),
+]
+
+_CRONJOB_CONTAINER = ('spec', 'jobTemplate', 'spec', 'template', 'spec', 'containers', 0)
+CRONJOB_FIELDS = [
+    (('metadata', 'name'), 'str'),
+    (('metadata', 'namespace'), 'str'),
+    (('spec', 'schedule'), 'str'),
+    (('spec', 'suspend'), 'bool'),
+    (('spec', 'timeZone'), 'str'),
+    (('spec', 'jobTemplate', 'spec', 'ttlSecondsAfterFinished'), 'int'),
+    (_CRONJOB_CONTAINER + ('image',), 'str'),
+    (_CRONJOB_CONTAINER + ('env',), 'json'),
+    (_CRONJOB_CONTAINER + ('resources', 'limits', 'memory'), 'str'),
+    (('status', 'lastScheduleTime'), 'str'),
+    (('status', 'lastSuccessfulTime'), 'str'),
+]
+
+DEPLOYMENT_FIELDS = [
+    (('metadata', 'name'), 'str'),
+    (('metadata', 'namespace'), 'str'),
+    (('spec', 'replicas'), 'int'),
+    (('status', 'readyReplicas'), 'int'),
+    (('status', 'availableReplicas'), 'int'),
+]
+
+PROJECTIONS = {
+    'Pod': POD_FIELDS,
+    'Job': JOB_FIELDS,
+    'CronJob': CRONJOB_FIELDS,
+    'Deployment': DEPLOYMENT_FIELDS,
+}
+
+# Separador dos valores de um campo com '*' (US, "unit separator" do ASCII)
+ELEMENT_SEPARATOR = '\x1f'
+
+
+def _path_expression(path: Tuple[PathPart, ...]) -> str:
+    parts = []
+    for part in path:
+        if isinstance(part, int):
+            parts.append(f'[{part}]')
+        else:
+            parts.append(f'.{part}')
+    return ''.join(parts)
+
+
+def _expression(path: Tuple[PathPart, ...]) -> str:
+    """Expressão jsonpath do campo; com '*', um valor por elemento terminado em ELEMENT_SEPARATOR."""
+    if '*' not in path:
+        return '{' + _path_expression(path) + '}'
+    star = path.index('*')
+    prefix, suffix = path[:star], path[star + 1:]
+    return (
+        '{range ' + _path_expression(prefix) + '[*]}'
+        '{' + (_path_expression(suffix) or '@') + '}'
+        '{"\\x1f"}{end}'
+    )
+
+
+def _columns(kinds: Iterable[str]) -> List[Tuple[Tuple[PathPart, ...], str]]:
+    """União ordenada dos campos dos kinds (um mesmo caminho vira uma única coluna)."""
+    columns = []
+    for kind in kinds:
+        for field in PROJECTIONS[kind]:
+            if field not in columns:
+                columns.append(field)
+    return columns
+
+
+def build_template(kinds: Iterable[str]) -> str:
+    """Template jsonpath para os kinds informados (primeira coluna: kind)."""
+    columns = ['{.kind}'] + [_expression(path) for path, _ in _columns(kinds)]
+    return '{range .items[*]}' + '{"\\t"}'.join(columns) + '{"\\n"}{end}'
+
+
+def _convert(raw: str, field_type: str):
+    if field_type == 'int':
+        return int(raw)
+    if field_type == 'bool':
+        return raw == 'true'
+    if field_type == 'json':
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ValueError(
+                f"Campo projetado não é JSON ({raw[:40]!r}); kubectl antigo? "
+                f"Desative kubectl_projection"
+            ) from None
+    return raw
+
+
+def _set(obj: Dict, path: Tuple[PathPart, ...], value):
+    target = obj
+    for i, part in enumerate(path[:-1]):
+        next_part = path[i + 1]
+        if isinstance(part, int):
+            while len(target) <= part:
+                target.append({})
+            target = target[part]
+        else:
+            default = [] if isinstance(next_part, int) else {}
+            target = target.setdefault(part, default)
+    target[path[-1]] = value
+
+
+def _set_each(obj: Dict, path: Tuple[PathPart, ...], raw: str, field_type: str):
+    """Campo projetado com '*': um valor por elemento da lista, cada um terminado em ELEMENT_SEPARATOR."""
+    star = path.index('*')
+    prefix, suffix = path[:star], path[star + 1:]
+    items = raw.split(ELEMENT_SEPARATOR)
+    if items[-1]:
+        raise ValueError(f"Campo projetado {'.'.join(map(str, path))} sem separador de elementos")
+    for index, item in enumerate(items[:-1]):
+        if item:
+            _set(obj, prefix + (index,) + suffix, _convert(item, field_type))
+
+
+def parse_output(output: str, kinds: Iterable[str]) -> Dict:
+    """Remonta a saída do template em {'items': [...]} no formato do `kubectl get -o json`."""
+    kinds = list(kinds)
+    columns = _columns(kinds)
+    fields_by_kind = {kind: set(PROJECTIONS[kind]) for kind in kinds}
+    items = []
+    for line in output.split('\n'):
+        if not line:
+            continue
+        values = line.split('\t')
+        kind = values[0]
+        kind_fields = fields_by_kind.get(kind)
+        if kind_fields is None:
+            continue
+        obj = {'kind': kind}
+        for (path, field_type), raw in zip(columns, values[1:]):
+            if not raw or (path, field_type) not in kind_fields:
+                continue
+            if '*' in path:
+                _set_each(obj, path, raw, field_type)
+            else:
+                _set(obj, path, _convert(raw, field_type))
+        items.append(obj)
+    return {'items': items}
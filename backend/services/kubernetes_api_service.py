@@ -0,0 +1,218 @@
+"""
+KubernetesService que fala direto com a API do Kubernetes (via `kubectl proxy`
+tunelado pelo SSH) em vez de executar um processo kubectl por chamada.
+
+Selecionado com `kubernetes_backend = api` na seção [BACKEND] do config.ini.
+Leituras de lista voltam para o kubectl se o túnel falhar; `apply -f` de
+arquivos da VM continua usando o kubectl.
+"""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import paramiko
+
+from services.cluster_watch import ClusterWatchStore
+from services.kube_api_client import KubeApiClient, KubeApiError
+from services.kubernetes_service import KubernetesService
+
+logger = logging.getLogger(__name__)
+
+# Recurso do kubectl -> kind (caminhos da API em ClusterWatchStore.RESOURCES)
+_RESOURCE_KINDS = {
+    'pods': 'Pod',
+    'jobs': 'Job',
+    'cronjobs': 'CronJob',
+    'deployments': 'Deployment',
+}
+
+# Falhas do túnel (não respostas de erro da API)
+_TRANSPORT_ERRORS = (OSError, paramiko.SSHException, ConnectionError)
+
+
+class KubernetesApiService(KubernetesService):
+    """Mesma interface do KubernetesService, com chamadas HTTP à API no lugar do kubectl."""
+
+    def __init__(self, ssh_service=None, api_host: str = '127.0.0.1', api_port: int = 8001):
+        super().__init__(ssh_service)
+        self.api = KubeApiClient(self.ssh_service, api_host, api_port)
+        self._namespace: Optional[str] = None
+
+    def get_namespace(self) -> str:
+        # Namespace do contexto do kubectl: o mesmo usado pelo backend kubectl sem -n
+        if self._namespace is None:
+            self._namespace = super().get_namespace()
+        return self._namespace
+
+    def _path(self, kind: str, name: str = None) -> str:
+        path = ClusterWatchStore.RESOURCES[kind].format(namespace=self.get_namespace())
+        return f"{path}/{name}" if name else path
+
+    def _api_list(self, resources: str, label_selector: str = None, timeout: int = 30) -> Dict:
+        """
+        Lista um ou mais recursos (separados por vírgula) como um documento {'items': [...]}.
+
+        O 'fingerprint' do documento são os resourceVersions das listas: mudam
+        sempre que algum objeto do tipo muda.
+        """
+        items = []
+        versions = []
+        for resource in resources.split(','):
+            kind = _RESOURCE_KINDS[resource]
+            data = self.api.list(self._path(kind), label_selector, timeout=timeout)
+            versions.append(data.get('metadata', {}).get('resourceVersion') or '')
+            for item in data.get('items', []):
+                # Listas da API não trazem kind em cada item (o kubectl preenche)
+                item['kind'] = kind
+                item.get('metadata', {}).pop('managedFields', None)
+                items.append(item)
+        fingerprint = None
+        if all(versions):
+            fingerprint = f"{label_selector or ''}@{','.join(versions)}"
+        return {'items': items, 'fingerprint': fingerprint}
+
+    def _get_list(self, resources: str, label_selector: str = None, timeout: int = 30,
+                  unchanged_if: Optional[str] = None) -> Tuple[int, Optional[Dict], str]:
+        # A lista vem decodificada da API; a repetição é detectada em snapshot_from_list
+        try:
+            return 0, self._api_list(resources, label_selector, timeout), ''
+        except KubeApiError as e:
+            return e.status, None, e.message
+        except _TRANSPORT_ERRORS as e:
+            logger.warning(f"API do Kubernetes indisponível ({e}), listando {resources} via kubectl")
+            return super()._get_list(resources, label_selector, timeout, unchanged_if)
+
+    def _get_lists(self, resources: List[str], label_selector: str = None,
+                   timeout: int = 30) -> List[Tuple[int, Optional[Dict], str]]:
+        return [self._get_list(r, label_selector, timeout) for r in resources]
+
+    def get_raw(self, path: str, timeout: int = 30) -> Dict:
+        try:
+            return self.api.get_json(path, timeout=timeout)
+        except KubeApiError as e:
+            raise RuntimeError(f"Erro ao ler {path}: {e}")
+        except _TRANSPORT_ERRORS as e:
+            logger.warning(f"API do Kubernetes indisponível ({e}), lendo {path} via kubectl")
+            return super().get_raw(path, timeout)
+
+    def watch_raw(self, path: str, resource_version: str):
+        return self.api.watch(path, resource_version)
+
+    def count_active_jobs(self, nome_do_robo: str) -> int:
+        label_selector = f"nome_robo={nome_do_robo.lower()}"
+        try:
+            jobs = self.api.list(self._path('Job'), label_selector)
+            pods = self.api.list(self._path('Pod'), label_selector)
+        except Exception as e:
+            logger.error(f"Erro ao contar jobs ativos de {nome_do_robo}: {e}")
+            return 0
+
+        # Jobs com pods ativos, mais pods de job ainda pendentes
+        count = sum(item.get('status', {}).get('active', 0) or 0 for item in jobs.get('items', []))
+        for pod in pods.get('items', []):
+            if pod.get('metadata', {}).get('labels', {}).get('job-name') and pod.get('status', {}).get('phase') == 'Pending':
+                count += 1
+        return count
+
+    def _submit_job(self, job: Dict) -> Tuple[bool, str]:
+        try:
+            self.api.create(self._path('Job'), job)
+            return True, ''
+        except (KubeApiError, *_TRANSPORT_ERRORS) as e:
+            return False, str(e)
+
+    def _call(self, action: str, func, *args) -> bool:
+        """Executa uma chamada de escrita, registrando o erro como os métodos via kubectl."""
+        try:
+            func(*args)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao {action}: {e}")
+            return False
+
+    def delete_job(self, job_name: str) -> bool:
+        return self._call('deletar job', self.api.delete, self._path('Job', job_name))
+
+    def delete_pod(self, pod_name: str) -> bool:
+        return self._call('deletar pod', self.api.delete, self._path('Pod', pod_name))
+
+    def delete_cronjob(self, nome: str) -> bool:
+        return self._call('deletar cronjob', self.api.delete, self._path('CronJob', nome))
+
+    def delete_deployment(self, nome: str) -> bool:
+        return self._call('deletar deployment', self.api.delete, self._path('Deployment', nome))
+
+    def suspend_cronjob(self, nome: str) -> bool:
+        return self._call('suspender cronjob', self.api.patch, self._path('CronJob', nome), {'spec': {'suspend': True}})
+
+    def unsuspend_cronjob(self, nome: str) -> bool:
+        return self._call('reativar cronjob', self.api.patch, self._path('CronJob', nome), {'spec': {'suspend': False}})
+
+    def cronjob_exists(self, nome: str) -> bool:
+        try:
+            self.api.get_json(self._path('CronJob', nome), timeout=10)
+            return True
+        except KubeApiError as e:
+            if e.status == 404:
+                return False
+            raise
+
+    def get_pod_logs(self, pod_name: str, tail: int = 100) -> str:
+        try:
+            return self.api.get_text(f"{self._path('Pod', pod_name)}/log", {'tailLines': tail})
+        except Exception as e:
+            logger.error(f"Erro ao obter logs: {e}")
+            return ""
+
+    def create_job_from_cronjob(self, cronjob_name: str) -> bool:
+        timestamp = int(time.time())
+        job_name = f"{cronjob_name}-manual-{timestamp}"
+        try:
+            cronjob = self.api.get_json(self._path('CronJob', cronjob_name))
+            template = cronjob.get('spec', {}).get('jobTemplate', {})
+            metadata = cronjob.get('metadata', {})
+            # Mesmo objeto que o `kubectl create job --from=cronjob/...` gera
+            job = {
+                'apiVersion': 'batch/v1',
+                'kind': 'Job',
+                'metadata': {
+                    'name': job_name,
+                    'labels': template.get('metadata', {}).get('labels', {}),
+                    'annotations': {
+                        **template.get('metadata', {}).get('annotations', {}),
+                        'cronjob.kubernetes.io/instantiate': 'manual',
+                    },
+                    'ownerReferences': [{
+                        'apiVersion': 'batch/v1',
+                        'kind': 'CronJob',
+                        'name': metadata.get('name', cronjob_name),
+                        'uid': metadata.get('uid'),
+                        'controller': True,
+                    }],
+                },
+                'spec': template.get('spec', {}),
+            }
+            self.api.create(self._path('Job'), job)
+        except Exception as e:
+            logger.error(f"Erro ao criar job do cronjob: {e}")
+            return False
+
+        logger.info(f"Job '{job_name}' criado com sucesso a partir do cronjob '{cronjob_name}'")
+        return True
+
+
+def create_kubernetes_service(ssh_service) -> KubernetesService:
+    """Instancia o KubernetesService do backend configurado (kubectl ou api)."""
+    try:
+        from config.ssh_config import get_backend_config
+        config = get_backend_config()
+    except Exception:
+        config = {}
+    if config.get('kubernetes_backend', 'kubectl') == 'api':
+        logger.info("Usando a API do Kubernetes via kubectl proxy tunelado pelo SSH")
+        return KubernetesApiService(
+            ssh_service,
+            api_host=config.get('kubernetes_api_host', '127.0.0.1'),
+            api_port=config.get('kubernetes_api_port', 8001),
+        )
+    return KubernetesService(ssh_service=ssh_service)
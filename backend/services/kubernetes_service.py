@@ -1,9 +1,17 @@
 import yaml
+import hashlib
 import logging
 import re
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from services.ssh_service import SSHService
+from services.cluster_snapshot import (
+    SNAPSHOT_KINDS, SNAPSHOT_RESOURCES, ClusterSnapshot, get_fresh_cluster_snapshot, list_fingerprint,
+)
+from services import json_codec, kubectl_projection
+from services.k8s_records import (
+    ContainerInfo, ContainerState, CronjobInfo, DeploymentInfo, JobInfo, PodInfo, freeze_labels, intern_str,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +25,161 @@ class KubernetesService:
             self.ssh_service = get_ssh_service()
         else:
             self.ssh_service = ssh_service
+        # Projeção no servidor (-o jsonpath só com os campos usados) em vez de -o json completo
+        try:
+            from config.ssh_config import get_backend_config
+            self.projection = get_backend_config().get('kubectl_projection', False)
+        except Exception:
+            self.projection = False
+        # Último snapshot montado e a impressão digital da saída que o gerou
+        self._last_snapshot: Optional[Tuple[str, ClusterSnapshot]] = None
     
-    def get_pods(self, label_selector: str = None) -> List[Dict]:
+    def _get_json(self, cmd: str, timeout: int = 30) -> Tuple[int, Optional[Dict], str]:
+        """
+        Executa um comando kubectl que emite JSON e decodifica direto dos bytes do stream.
+        
+        Returns:
+            Tuple[int, Optional[Dict], str]: (return_code, documento, stderr)
+        """
+        stream = self.ssh_service.execute_command_stream(
+            cmd, timeout=timeout, compress=self.ssh_service.compress_output
+        )
+        payload = stream.read_all()
+        if stream.return_code != 0:
+            return stream.return_code, None, stream.stderr_text
+        return stream.return_code, json_codec.loads(payload), stream.stderr_text
+    
+    # kind usado na projeção de cada recurso listado
+    _RESOURCE_KINDS = {
+        'pods': ('Pod',),
+        'jobs': ('Job',),
+        'cronjobs': ('CronJob',),
+        'deployments': ('Deployment',),
+        SNAPSHOT_RESOURCES: SNAPSHOT_KINDS,
+    }
+    
+    def _list_command(self, resources: str, label_selector: str = None) -> str:
+        """Comando `kubectl get` para listar os recursos (projetado ou -o json)."""
+        if self.projection:
+            template = kubectl_projection.build_template(self._RESOURCE_KINDS[resources])
+            cmd = f"kubectl get {resources} -o jsonpath='{template}'"
+        else:
+            cmd = f"kubectl get {resources} -o json"
+        if label_selector:
+            cmd += f" -l {label_selector}"
+        return cmd
+    
+    def _decode_list(self, resources: str, payload: bytes) -> Dict:
+        """Decodifica a saída de _list_command em {'items': [...]} no formato do -o json."""
+        if self.projection:
+            return kubectl_projection.parse_output(payload.decode('utf-8'), self._RESOURCE_KINDS[resources])
+        return json_codec.loads(payload)
+    
+    def _get_list(self, resources: str, label_selector: str = None, timeout: int = 30,
+                  unchanged_if: Optional[str] = None) -> Tuple[int, Optional[Dict], str]:
+        """
+        Lista recursos via kubectl. Returns: (return_code, documento, stderr).
+        
+        O documento traz 'fingerprint' (hash do stdout). Se for igual a
+        unchanged_if, a saída não é decodificada e o documento vem sem 'items'.
+        """
+        stream = self.ssh_service.execute_command_stream(
+            self._list_command(resources, label_selector), timeout=timeout,
+            compress=self.ssh_service.compress_output
+        )
+        if self.projection:
+            payload = stream.read_all()
+            if stream.return_code != 0:
+                return stream.return_code, None, stream.stderr_text
+            fingerprint = hashlib.blake2b(payload, digest_size=16).hexdigest()
+            if unchanged_if is not None and fingerprint == unchanged_if:
+                return stream.return_code, {'fingerprint': fingerprint}, stream.stderr_text
+            data = self._decode_list(resources, payload)
+            data['fingerprint'] = fingerprint
+            return stream.return_code, data, stream.stderr_text
+        
+        # -o json: itens decodificados à medida que o stdout chega (e hasheados junto)
+        digest = hashlib.blake2b(digest_size=16)
+        
+        def chunks():
+            for chunk in stream:
+                digest.update(chunk)
+                yield chunk
+        
+        try:
+            data = json_codec.load_items(chunks())
+        except json_codec.JSONDecodeError:
+            if stream.return_code != 0:
+                return stream.return_code, None, stream.stderr_text
+            raise
+        data['fingerprint'] = digest.hexdigest()
+        return stream.return_code, data, stream.stderr_text
+    
+    def _get_lists(self, resources: List[str], label_selector: str = None,
+                   timeout: int = 30) -> List[Tuple[int, Optional[Dict], str]]:
+        """Lista vários recursos em uma única ida e volta SSH. Returns: [(return_code, documento, stderr), ...]."""
+        results = self.ssh_service.execute_many(
+            [self._list_command(r, label_selector) for r in resources],
+            timeout=timeout,
+            binary=True,
+            compress=self.ssh_service.compress_output,
+        )
+        return [
+            (code, self._decode_list(r, stdout) if code == 0 else None, stderr)
+            for r, (code, stdout, stderr) in zip(resources, results)
+        ]
+    
+    def get_namespace(self) -> str:
+        """Namespace do contexto atual do kubectl (o mesmo usado pelos comandos sem -n)."""
+        return_code, stdout, _ = self.ssh_service.execute_command(
+            "kubectl config view --minify -o jsonpath='{..namespace}'", timeout=15
+        )
+        namespace = stdout.strip() if return_code == 0 else ''
+        return namespace or 'default'
+    
+    def get_raw(self, path: str, timeout: int = 30) -> Dict:
+        """Lê um recurso diretamente da API do Kubernetes (`kubectl get --raw`)."""
+        return_code, data, stderr = self._get_json(f"kubectl get --raw '{path}'", timeout=timeout)
+        if return_code != 0:
+            raise RuntimeError(f"Erro ao ler {path}: {stderr}")
+        return data
+    
+    def watch_raw(self, path: str, resource_version: str):
+        """
+        Abre um watch da API do Kubernetes a partir de resource_version.
+        
+        Returns:
+            CommandStream com um evento JSON por linha ({"type": ..., "object": ...});
+            sem timeout, até o servidor encerrar o watch ou o stream ser fechado
+        """
+        query = f"watch=1&allowWatchBookmarks=true&resourceVersion={resource_version}"
+        return self.ssh_service.execute_command_stream(f"kubectl get --raw '{path}?{query}'", timeout=None)
+    
+    def get_cluster_snapshot(self, timeout: int = 30) -> ClusterSnapshot:
+        """Busca pods, jobs, cronjobs e deployments em uma única chamada kubectl."""
+        last_fingerprint = self._last_snapshot[0] if self._last_snapshot else None
+        return_code, data, stderr = self._get_list(SNAPSHOT_RESOURCES, timeout=timeout, unchanged_if=last_fingerprint)
+        if return_code != 0:
+            raise RuntimeError(f"Erro ao obter snapshot do cluster: {stderr}")
+        return self.snapshot_from_list(data)
+    
+    def snapshot_from_list(self, data: Dict) -> ClusterSnapshot:
+        """
+        Monta o ClusterSnapshot da List consolidada.
+        
+        Saída idêntica à do último snapshot (mesma impressão digital) não é
+        mapeada de novo: o snapshot anterior é reaproveitado com as mesmas listas,
+        e o cache mantém as versões (e as respostas renderizadas) das chaves.
+        """
+        fingerprint = list_fingerprint(data)
+        last = self._last_snapshot
+        if fingerprint is not None and last is not None and last[0] == fingerprint:
+            return last[1].restamped()
+        snapshot = ClusterSnapshot.from_list(self, data)
+        self._last_snapshot = (fingerprint, snapshot) if fingerprint is not None else None
+        return snapshot
+    
+    def get_pods(self, label_selector: str = None) -> List[PodInfo]:
         """
         Lista pods com informações detalhadas.
         
@@ -26,55 +187,58 @@ class KubernetesService:
             label_selector: Filtro por labels (ex: "nome_robo=att_infos_bitrix")
         
         Returns:
-            Lista de dicionários com informações dos pods
+            Lista de PodInfo (registros somente leitura) com informações dos pods
         """
-        cmd = "kubectl get pods -o json"
-        if label_selector:
-            cmd += f" -l {label_selector}"
+        # Sem filtro: derivar do snapshot consolidado do ciclo de polling, se recente
+        if not label_selector:
+            snapshot = get_fresh_cluster_snapshot()
+            if snapshot is not None:
+                return snapshot.get_pods()
         
         try:
-            return_code, stdout, stderr = self.ssh_service.execute_command(cmd, timeout=30)
+            return_code, data, stderr = self._get_list('pods', label_selector, timeout=30)
             
             if return_code != 0:
                 logger.error(f"Erro ao listar pods: {stderr}")
                 return []
             
-            import json
-            data = json.loads(stdout)
-            pods = []
-            
-            for item in data.get('items', []):
-                metadata = item.get('metadata', {})
-                status = item.get('status', {})
-                spec = item.get('spec', {})
-                
-                pod_info = {
-                    'name': metadata.get('name', ''),
-                    'namespace': metadata.get('namespace', 'default'),
-                    'labels': metadata.get('labels', {}),
-                    'phase': status.get('phase', 'Unknown'),
-                    'status': self._get_pod_status(status),
-                    'start_time': status.get('startTime', ''),
-                    'containers': []
-                }
-                
-                # Informações dos containers
-                for container in status.get('containerStatuses', []):
-                    container_info = {
-                        'name': container.get('name', ''),
-                        'ready': container.get('ready', False),
-                        'restart_count': container.get('restartCount', 0),
-                        'state': self._get_container_state(container.get('state', {}))
-                    }
-                    pod_info['containers'].append(container_info)
-                
-                pods.append(pod_info)
-            
-            return pods
+            return self.parse_pods(data)
         except Exception as e:
             logger.error(f"Erro ao processar pods: {e}")
             return []
     
+    def parse_pods(self, data: Dict) -> List[PodInfo]:
+        """Converte a saída de `kubectl get pods -o json` na lista de pods usada pelo backend."""
+        pods = []
+        
+        for item in data.get('items', []):
+            metadata = item.get('metadata', {})
+            status = item.get('status', {})
+            spec = item.get('spec', {})
+            
+            # Informações dos containers
+            containers = tuple(
+                ContainerInfo(
+                    name=intern_str(container.get('name', '')),
+                    ready=container.get('ready', False),
+                    restart_count=container.get('restartCount', 0),
+                    state=self._get_container_state(container.get('state', {})),
+                )
+                for container in status.get('containerStatuses', [])
+            )
+            
+            pods.append(PodInfo(
+                name=metadata.get('name', ''),
+                namespace=intern_str(metadata.get('namespace', 'default')),
+                labels=freeze_labels(metadata.get('labels')),
+                phase=intern_str(status.get('phase', 'Unknown')),
+                status=intern_str(self._get_pod_status(status)),
+                start_time=status.get('startTime', ''),
+                containers=containers,
+            ))
+        
+        return pods
+    
     def _get_pod_status(self, status: Dict) -> str:
         """Determina o status detalhado de um pod."""
         phase = status.get('phase', 'Unknown')
@@ -104,139 +268,158 @@ class KubernetesService:
         else:
             return phase
     
-    def _get_container_state(self, state: Dict) -> Dict:
+    def _get_container_state(self, state: Dict) -> ContainerState:
         """Extrai informações de estado do container."""
         if 'running' in state:
-            return {'type': 'running', 'started': state['running'].get('startedAt', '')}
+            return ContainerState(type='running', started=state['running'].get('startedAt', ''))
         elif 'waiting' in state:
-            return {
-                'type': 'waiting',
-                'reason': state['waiting'].get('reason', ''),
-                'message': state['waiting'].get('message', '')
-            }
+            return ContainerState(
+                type='waiting',
+                reason=intern_str(state['waiting'].get('reason', '')),
+                message=state['waiting'].get('message', '')
+            )
         elif 'terminated' in state:
-            return {
-                'type': 'terminated',
-                'exit_code': state['terminated'].get('exitCode', 0),
-                'reason': state['terminated'].get('reason', ''),
-                'finished': state['terminated'].get('finishedAt', '')
-            }
-        return {'type': 'unknown'}
+            return ContainerState(
+                type='terminated',
+                exit_code=state['terminated'].get('exitCode', 0),
+                reason=intern_str(state['terminated'].get('reason', '')),
+                finished=state['terminated'].get('finishedAt', '')
+            )
+        return ContainerState(type='unknown')
     
-    def get_jobs(self, label_selector: str = None) -> List[Dict]:
+    def get_jobs(self, label_selector: str = None) -> List[JobInfo]:
         """Lista jobs com informações detalhadas."""
-        cmd = "kubectl get jobs -o json"
-        if label_selector:
-            cmd += f" -l {label_selector}"
+        if not label_selector:
+            snapshot = get_fresh_cluster_snapshot()
+            if snapshot is not None:
+                return snapshot.get_jobs()
         
         try:
-            return_code, stdout, stderr = self.ssh_service.execute_command(cmd, timeout=30)
+            # Jobs e pods (usados para enriquecer status) em uma única ida e volta SSH
+            (return_code, data, stderr), (pods_code, pods_data, pods_stderr) = self._get_lists(
+                ['jobs', 'pods'], label_selector, timeout=30
+            )
             
             if return_code != 0:
                 logger.error(f"Erro ao listar jobs: {stderr}")
                 return []
             
-            import json
-            data = json.loads(stdout)
-            
-            # Buscar pods para enriquecer status e imagem
-            all_pods = self.get_pods(label_selector)
-            pods_by_job = {}
-            for pod in all_pods:
-                job_name = pod.get('labels', {}).get('job-name') or pod.get('metadata', {}).get('ownerReferences', [{}])[0].get('name')
-                if job_name:
-                    if job_name not in pods_by_job:
-                        pods_by_job[job_name] = []
-                    pods_by_job[job_name].append(pod)
-
-            jobs = []
+            # Pods para enriquecer status e imagem
+            all_pods = []
+            if pods_code == 0:
+                all_pods = self.parse_pods(pods_data)
+            else:
+                logger.error(f"Erro ao listar pods: {pods_stderr}")
             
-            for item in data.get('items', []):
-                metadata = item.get('metadata', {})
-                status = item.get('status', {})
-                spec = item.get('spec', {})
-                
-                name = metadata.get('name', '')
-                
-                # Determinar status e imagem baseados nos pods
-                job_pods = pods_by_job.get(name, [])
-                job_status = 'Pending' # Default
-                image = ''
-                
-                # Tentar pegar imagem do template do job se não tiver pods
-                if not image:
-                    try:
-                        image = spec['template']['spec']['containers'][0]['image']
-                    except:
-                        pass
+            return self.parse_jobs(data, all_pods)
+        except Exception as e:
+            logger.error(f"Erro ao processar jobs: {e}")
+            return []
+    
+    def parse_jobs(self, data: Dict, all_pods: List[PodInfo]) -> List[JobInfo]:
+        """Converte a saída de `kubectl get jobs -o json` na lista de jobs, enriquecida com os pods."""
+        pods_by_job = {}
+        for pod in all_pods:
+            job_name = pod.get('labels', {}).get('job-name') or pod.get('metadata', {}).get('ownerReferences', [{}])[0].get('name')
+            if job_name:
+                if job_name not in pods_by_job:
+                    pods_by_job[job_name] = []
+                pods_by_job[job_name].append(pod)
 
-                if status.get('active', 0) > 0:
-                    job_status = 'Running'
-                elif status.get('failed', 0) > 0:
-                    job_status = 'Failed'
-                elif status.get('succeeded', 0) > 0:
-                    job_status = 'Succeeded'
+        jobs = []
+        
+        for item in data.get('items', []):
+            metadata = item.get('metadata', {})
+            status = item.get('status', {})
+            spec = item.get('spec', {})
+            
+            name = metadata.get('name', '')
+            
+            # Determinar status e imagem baseados nos pods
+            job_pods = pods_by_job.get(name, [])
+            job_status = 'Pending' # Default
+            image = ''
+            
+            # Tentar pegar imagem do template do job se não tiver pods
+            if not image:
+                try:
+                    image = spec['template']['spec']['containers'][0]['image']
+                except:
+                    pass
 
-                # Refinar status com base no pod mais recente/relevante
-                pod_name = ''
-                if job_pods:
-                    # Pega o primeiro pod (geralmente só tem 1 ativo por job neste caso de uso)
-                    pod = job_pods[0]
-                    pod_name = pod.get('name', '')
-                    # Se tiver pod, usa a imagem dele que é a real em execução
-                    if pod.get('containers'):
-                        # A logica de get_pods já retorna 'containers' processados? 
-                        # get_pods retorna dict customizado. Vamos verificar o que get_pods retorna.
-                        # get_pods retorna lista de dicts com 'status' (string) e 'containers' (lista).
-                        # pod['status'] já é processado por _get_pod_status!
-                         job_status = pod['status']
-                    
-                    # Tentar extrair imagem do status do container do pod se não pegou do template
-                    # Mas get_pods não retorna image nos containers, vou ter que confiar no template ou adicionar image ao get_pods.
-                    # Vamos manter a imagem do template que é mais garantido de existir no objeto Job.
+            if status.get('active', 0) > 0:
+                job_status = 'Running'
+            elif status.get('failed', 0) > 0:
+                job_status = 'Failed'
+            elif status.get('succeeded', 0) > 0:
+                job_status = 'Succeeded'
 
-                job_info = {
-                    'name': name,
-                    'namespace': metadata.get('namespace', 'default'),
-                    'labels': metadata.get('labels', {}),
-                    'completions': status.get('succeeded', 0),
-                    'active': status.get('active', 0),
-                    'failed': status.get('failed', 0),
-                    'start_time': status.get('startTime', ''),
-                    'completion_time': status.get('completionTime', ''),
-                    'status': job_status,
-                    'image': image,
-                    'pod_name': pod_name
-                }
+            # Refinar status com base no pod mais recente/relevante
+            pod_name = ''
+            if job_pods:
+                # Pega o primeiro pod (geralmente só tem 1 ativo por job neste caso de uso)
+                pod = job_pods[0]
+                pod_name = pod.get('name', '')
+                # Se tiver pod, usa a imagem dele que é a real em execução
+                if pod.get('containers'):
+                    # A logica de get_pods já retorna 'containers' processados? 
+                    # get_pods retorna dict customizado. Vamos verificar o que get_pods retorna.
+                    # get_pods retorna lista de dicts com 'status' (string) e 'containers' (lista).
+                    # pod['status'] já é processado por _get_pod_status!
+                     job_status = pod['status']
                 
-                jobs.append(job_info)
-            
-            return jobs
-        except Exception as e:
-            logger.error(f"Erro ao processar jobs: {e}")
-            return []
+                # Tentar extrair imagem do status do container do pod se não pegou do template
+                # Mas get_pods não retorna image nos containers, vou ter que confiar no template ou adicionar image ao get_pods.
+                # Vamos manter a imagem do template que é mais garantido de existir no objeto Job.
+
+            jobs.append(JobInfo(
+                name=name,
+                namespace=intern_str(metadata.get('namespace', 'default')),
+                labels=freeze_labels(metadata.get('labels')),
+                completions=status.get('succeeded', 0),
+                active=status.get('active', 0),
+                failed=status.get('failed', 0),
+                start_time=status.get('startTime', ''),
+                completion_time=status.get('completionTime', ''),
+                status=intern_str(job_status),
+                image=intern_str(image),
+                pod_name=pod_name,
+            ))
+        
+        return jobs
+    
+    # Agregação no servidor: só os números necessários, sem objetos completos
+    _ACTIVE_JOBS_TEMPLATE = '{range .items[*]}{.status.active}{"\\n"}{end}'
+    _JOB_PODS_PHASE_TEMPLATE = '{range .items[*]}{.metadata.labels.job-name}{"\\t"}{.status.phase}{"\\n"}{end}'
     
     def count_active_jobs(self, nome_do_robo: str) -> int:
         """Conta jobs ativos de um RPA específico usando kubectl get jobs."""
         label_selector = f"nome_robo={nome_do_robo.lower()}"
-        jobs = self.get_jobs(label_selector)
+        try:
+            (jobs_code, jobs_out, jobs_err), (pods_code, pods_out, pods_err) = self.ssh_service.execute_many([
+                f"kubectl get jobs -l {label_selector} -o jsonpath='{self._ACTIVE_JOBS_TEMPLATE}'",
+                f"kubectl get pods -l {label_selector} -o jsonpath='{self._JOB_PODS_PHASE_TEMPLATE}'",
+            ], timeout=30)
+        except Exception as e:
+            logger.error(f"Erro ao contar jobs ativos de {nome_do_robo}: {e}")
+            return 0
         
         count = 0
-        for job in jobs:
-            # Contar jobs que têm pods ativos (running) ou pendentes
-            active = job.get('active', 0)
-            if active > 0:
-                count += active
+        # Contar jobs que têm pods ativos (running) ou pendentes
+        if jobs_code == 0:
+            count += sum(int(active) for active in jobs_out.split() if active.isdigit())
+        else:
+            logger.error(f"Erro ao listar jobs: {jobs_err}")
         
         # Também verificar pods pendentes que podem não estar no status do job
-        pods = self.get_pods(label_selector)
-        pods_de_jobs = [p for p in pods if p.get('labels', {}).get('job-name')]
-        
-        for pod in pods_de_jobs:
-            phase = pod.get('phase', '')
-            # Se o pod está pendente, considerar como job ativo
-            if phase == 'Pending':
-                count += 1
+        if pods_code == 0:
+            for line in pods_out.splitlines():
+                job_name, _, phase = line.partition('\t')
+                # Se o pod está pendente, considerar como job ativo
+                if job_name and phase == 'Pending':
+                    count += 1
+        else:
+            logger.error(f"Erro ao listar pods: {pods_err}")
         
         return count
     
@@ -320,14 +503,10 @@ class KubernetesService:
                 job_yaml = job_yaml_base.copy()
                 job_yaml['metadata']['labels']['instancia'] = str(i + 1)
                 
-                yaml_content = yaml.dump(job_yaml, default_flow_style=False)
+                created, error = self._submit_job(job_yaml)
                 
-                # Criar job via kubectl
-                cmd = f"kubectl create -f - <<EOF\n{yaml_content}\nEOF"
-                return_code, stdout, stderr = self.ssh_service.execute_command(cmd, timeout=30)
-                
-                if return_code != 0:
-                    logger.error(f"Erro ao criar job: {stderr}")
+                if not created:
+                    logger.error(f"Erro ao criar job: {error}")
                     return False
             
             return True
@@ -335,6 +514,15 @@ class KubernetesService:
             logger.error(f"Erro ao criar job: {e}")
             return False
     
+    def _submit_job(self, job: Dict) -> Tuple[bool, str]:
+        """Cria o job a partir do manifesto. Returns: (criado, mensagem de erro)."""
+        yaml_content = yaml.dump(job, default_flow_style=False)
+        
+        # Criar job via kubectl
+        cmd = f"kubectl create -f - <<EOF\n{yaml_content}\nEOF"
+        return_code, stdout, stderr = self.ssh_service.execute_command(cmd, timeout=30)
+        return return_code == 0, stderr
+    
     def delete_job(self, job_name: str) -> bool:
         """Deleta um job Kubernetes."""
         cmd = f"kubectl delete job {job_name}"
@@ -383,74 +571,76 @@ class KubernetesService:
             logger.error(f"Erro ao obter logs: {e}")
             return ""
     
-    def get_cronjobs(self) -> List[Dict]:
+    def get_cronjobs(self) -> List[CronjobInfo]:
         """Lista cronjobs com informações detalhadas."""
-        cmd = "kubectl get cronjobs -o json"
+        snapshot = get_fresh_cluster_snapshot()
+        if snapshot is not None:
+            return snapshot.get_cronjobs()
         
         try:
-            return_code, stdout, stderr = self.ssh_service.execute_command(cmd, timeout=30)
+            return_code, data, stderr = self._get_list('cronjobs', timeout=30)
             
             if return_code != 0:
                 logger.error(f"Erro ao listar cronjobs: {stderr}")
                 return []
             
-            import json
-            data = json.loads(stdout)
-            cronjobs = []
-            
-            for item in data.get('items', []):
-                metadata = item.get('metadata', {})
-                spec = item.get('spec', {})
-                status = item.get('status', {})
-                
-                # Extrair informações do container
-                job_template = spec.get('jobTemplate', {})
-                pod_spec = job_template.get('spec', {}).get('template', {}).get('spec', {})
-                containers = pod_spec.get('containers', [])
-                
-                # Obter imagem do primeiro container
-                image = ''
-                nome_robo = ''
-                memory_limit = ''
-                if containers:
-                    first_container = containers[0]
-                    image = first_container.get('image', '')
-                    # Extrair nome_robo das variáveis de ambiente
-                    env_vars = first_container.get('env', [])
-                    for env_var in env_vars:
-                        if env_var.get('name') == 'NOME_ROBO':
-                            nome_robo = env_var.get('value', '')
-                            break
-                    # Extrair memory limit
-                    resources = first_container.get('resources', {})
-                    limits = resources.get('limits', {})
-                    memory_limit = limits.get('memory', '')
-                
-                # Extrair timezone e ttl
-                timezone = spec.get('timeZone', 'America/Sao_Paulo')
-                ttl_seconds = job_template.get('spec', {}).get('ttlSecondsAfterFinished', 60)
-                
-                cronjob_info = {
-                    'name': metadata.get('name', ''),
-                    'namespace': metadata.get('namespace', 'default'),
-                    'schedule': spec.get('schedule', ''),
-                    'suspended': spec.get('suspend', False),
-                    'last_schedule_time': status.get('lastScheduleTime', ''),
-                    'last_successful_time': status.get('lastSuccessfulTime', ''),
-                    'image': image,
-                    'nome_robo': nome_robo,
-                    'memory_limit': memory_limit,
-                    'timezone': timezone,
-                    'ttl_seconds_after_finished': ttl_seconds
-                }
-                
-                cronjobs.append(cronjob_info)
-            
-            return cronjobs
+            return self.parse_cronjobs(data)
         except Exception as e:
             logger.error(f"Erro ao processar cronjobs: {e}")
             return []
     
+    def parse_cronjobs(self, data: Dict) -> List[CronjobInfo]:
+        """Converte a saída de `kubectl get cronjobs -o json` na lista de cronjobs usada pelo backend."""
+        cronjobs = []
+        
+        for item in data.get('items', []):
+            metadata = item.get('metadata', {})
+            spec = item.get('spec', {})
+            status = item.get('status', {})
+            
+            # Extrair informações do container
+            job_template = spec.get('jobTemplate', {})
+            pod_spec = job_template.get('spec', {}).get('template', {}).get('spec', {})
+            containers = pod_spec.get('containers', [])
+            
+            # Obter imagem do primeiro container
+            image = ''
+            nome_robo = ''
+            memory_limit = ''
+            if containers:
+                first_container = containers[0]
+                image = first_container.get('image', '')
+                # Extrair nome_robo das variáveis de ambiente
+                env_vars = first_container.get('env', [])
+                for env_var in env_vars:
+                    if env_var.get('name') == 'NOME_ROBO':
+                        nome_robo = env_var.get('value', '')
+                        break
+                # Extrair memory limit
+                resources = first_container.get('resources', {})
+                limits = resources.get('limits', {})
+                memory_limit = limits.get('memory', '')
+            
+            # Extrair timezone e ttl
+            timezone = spec.get('timeZone', 'America/Sao_Paulo')
+            ttl_seconds = job_template.get('spec', {}).get('ttlSecondsAfterFinished', 60)
+            
+            cronjobs.append(CronjobInfo(
+                name=metadata.get('name', ''),
+                namespace=intern_str(metadata.get('namespace', 'default')),
+                schedule=spec.get('schedule', ''),
+                suspended=spec.get('suspend', False),
+                last_schedule_time=status.get('lastScheduleTime', ''),
+                last_successful_time=status.get('lastSuccessfulTime', ''),
+                image=intern_str(image),
+                nome_robo=intern_str(nome_robo),
+                memory_limit=memory_limit,
+                timezone=intern_str(timezone),
+                ttl_seconds_after_finished=ttl_seconds,
+            ))
+        
+        return cronjobs
+    
     def cronjob_exists(self, nome: str) -> bool:
         """Verifica se um cronjob existe."""
         cmd = f"kubectl get cronjob {nome}"
@@ -540,41 +730,43 @@ class KubernetesService:
             logger.error(f"Erro ao criar job do cronjob: {e}")
             return False
     
-    def get_deployments(self) -> List[Dict]:
+    def get_deployments(self) -> List[DeploymentInfo]:
         """Lista deployments com informações detalhadas."""
-        cmd = "kubectl get deployments -o json"
+        snapshot = get_fresh_cluster_snapshot()
+        if snapshot is not None:
+            return snapshot.get_deployments()
         
         try:
-            return_code, stdout, stderr = self.ssh_service.execute_command(cmd, timeout=30)
+            return_code, data, stderr = self._get_list('deployments', timeout=30)
             
             if return_code != 0:
                 logger.error(f"Erro ao listar deployments: {stderr}")
                 return []
             
-            import json
-            data = json.loads(stdout)
-            deployments = []
-            
-            for item in data.get('items', []):
-                metadata = item.get('metadata', {})
-                spec = item.get('spec', {})
-                status = item.get('status', {})
-                
-                deployment_info = {
-                    'name': metadata.get('name', ''),
-                    'namespace': metadata.get('namespace', 'default'),
-                    'replicas': spec.get('replicas', 0),
-                    'ready_replicas': status.get('readyReplicas', 0),
-                    'available_replicas': status.get('availableReplicas', 0)
-                }
-                
-                deployments.append(deployment_info)
-            
-            return deployments
+            return self.parse_deployments(data)
         except Exception as e:
             logger.error(f"Erro ao processar deployments: {e}")
             return []
     
+    def parse_deployments(self, data: Dict) -> List[DeploymentInfo]:
+        """Converte a saída de `kubectl get deployments -o json` na lista de deployments usada pelo backend."""
+        deployments = []
+        
+        for item in data.get('items', []):
+            metadata = item.get('metadata', {})
+            spec = item.get('spec', {})
+            status = item.get('status', {})
+            
+            deployments.append(DeploymentInfo(
+                name=metadata.get('name', ''),
+                namespace=intern_str(metadata.get('namespace', 'default')),
+                replicas=spec.get('replicas', 0),
+                ready_replicas=status.get('readyReplicas', 0),
+                available_replicas=status.get('availableReplicas', 0),
+            ))
+        
+        return deployments
+    
     def apply_deployment(self, yaml_path: str) -> bool:
         """Aplica um deployment via kubectl apply."""
         cmd = f"kubectl apply -f {yaml_path}"
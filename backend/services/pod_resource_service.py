@@ -1,8 +1,9 @@
 import logging
-import re
-import json
 from typing import Dict, List
 
+from services import json_codec
+from services.cluster_snapshot import get_fresh_cluster_snapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,200 +24,225 @@ def fetch_pod_resources(ssh_service) -> List[Dict]:
     start_time = time.time()
     
     pods_metrics = []
-    pods_info = {}  # Dicionário para armazenar info detalhada dos pods
     
     try:
-        # 1. Primeiro, obter informações detalhadas dos pods (recursos alocados, imagem, etc.)
-        cmd_pods = """kubectl get pods -o json 2>/dev/null"""
-        logger.debug(f"[{fetch_id}] Executando kubectl get pods -o json")
-        return_code_pods, stdout_pods, stderr_pods = ssh_service.execute_command(cmd_pods, timeout=20)
+        cmd_top = "kubectl top pods -n default --no-headers 2>&1"
         
-        if return_code_pods == 0 and stdout_pods:
-            try:
-                pods_data = json.loads(stdout_pods)
-                for item in pods_data.get('items', []):
-                    metadata = item.get('metadata', {})
-                    spec = item.get('spec', {})
-                    status = item.get('status', {})
-                    
-                    pod_name = metadata.get('name', '')
-                    if not pod_name:
-                        continue
-                    
-                    # Usar o nome do pod como nome do RPA (mais confiável)
-                    labels = metadata.get('labels', {})
-                    # Preferir nome do pod completo para exibição
-                    rpa_name = pod_name
-                    
-                    # Informações dos containers (pode haver múltiplos)
-                    containers = spec.get('containers', [])
-                    container_statuses = status.get('containerStatuses', [])
-                    
-                    total_cpu_limit = 0
-                    total_memory_limit = 0
-                    total_cpu_request = 0
-                    total_memory_request = 0
-                    image_full = ''
-                    image_tag = ''
-                    
-                    for container in containers:
-                        # Imagem docker
-                        image = container.get('image', '')
-                        if image and not image_full:
-                            image_full = image
-                            # Extrair apenas a tag da imagem (parte após :)
-                            if ':' in image:
-                                image_tag = image.split(':')[-1]
-                            else:
-                                image_tag = 'latest'
-                        
-                        # Recursos alocados (limits e requests)
-                        resources = container.get('resources', {})
-                        limits = resources.get('limits', {})
-                        requests = resources.get('requests', {})
-                        
-                        # CPU limits/requests
-                        if limits.get('cpu'):
-                            total_cpu_limit += parse_cpu(limits['cpu'])
-                        if requests.get('cpu'):
-                            total_cpu_request += parse_cpu(requests['cpu'])
-                        
-                        # Memory limits/requests
-                        if limits.get('memory'):
-                            total_memory_limit += parse_memory(limits['memory'])
-                        if requests.get('memory'):
-                            total_memory_request += parse_memory(requests['memory'])
-                    
-                    pods_info[pod_name] = {
-                        'rpa_name': rpa_name,
-                        'image_full': image_full,
-                        'image_tag': image_tag,
-                        'cpu_limit_millicores': int(total_cpu_limit * 1000),
-                        'memory_limit_mb': round(total_memory_limit / (1024 * 1024), 2),
-                        'cpu_request_millicores': int(total_cpu_request * 1000),
-                        'memory_request_mb': round(total_memory_request / (1024 * 1024), 2),
-                        'phase': status.get('phase', 'Unknown'),
-                        'start_time': status.get('startTime', ''),
-                        'node': spec.get('nodeName', ''),
-                    }
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"[{fetch_id}] Erro ao parsear JSON dos pods: {e}")
+        # Pods do snapshot consolidado do ciclo de polling, se recente: só falta o kubectl top
+        snapshot = get_fresh_cluster_snapshot()
+        if snapshot is not None:
+            logger.debug(f"[{fetch_id}] Usando pods do snapshot do cluster; executando '{cmd_top}'")
+            return_code, stdout, _ = ssh_service.execute_command(cmd_top, timeout=15)
+            pods_metrics = build_pod_resources(snapshot.get_pods_document(), return_code, stdout, fetch_id)
+        else:
+            # Pods (JSON) e métricas (kubectl top) em uma única ida e volta SSH.
+            # Saída em bytes: o JSON é decodificado direto, sem a cópia intermediária em str
+            cmd_pods = """kubectl get pods -o json 2>/dev/null"""
+            logger.debug(f"[{fetch_id}] Executando '{cmd_pods}' e '{cmd_top}' em lote")
+            (pods_code, stdout_pods, _), (return_code, stdout_top, _) = ssh_service.execute_many(
+                [cmd_pods, cmd_top], timeout=20, binary=True, compress=ssh_service.compress_output
+            )
+            
+            pods_data = None
+            if pods_code == 0 and stdout_pods:
+                try:
+                    pods_data = json_codec.loads(stdout_pods)
+                except json_codec.JSONDecodeError as e:
+                    logger.error(f"[{fetch_id}] Erro ao parsear JSON dos pods: {e}")
+            
+            pods_metrics = build_pod_resources(
+                pods_data, return_code, stdout_top.decode('utf-8', errors='replace'), fetch_id
+            )
+    except Exception as e:
+        logger.error(f"[{fetch_id}] Erro ao coletar métricas de pods: {e}", exc_info=True)
+    
+    total_elapsed = time.time() - start_time
+    logger.info(f"[{fetch_id}] Coleta de recursos dos pods concluída em {total_elapsed:.3f}s")
+    
+    return pods_metrics
+
+
+def build_pod_resources(pods_data, top_return_code: int, top_stdout: str, fetch_id: str = 'POD-BUILD') -> List[Dict]:
+    """
+    Monta as métricas dos pods a partir do JSON de `kubectl get pods -o json` e da saída
+    de `kubectl top pods --no-headers`, venham elas de comandos SSH ou do coletor remoto.
+    """
+    pods_metrics = []
+    pods_info = {}  # Dicionário para armazenar info detalhada dos pods
+    
+    # 1. Primeiro, obter informações detalhadas dos pods (recursos alocados, imagem, etc.)
+    for item in (pods_data or {}).get('items', []):
+        metadata = item.get('metadata', {})
+        spec = item.get('spec', {})
+        status = item.get('status', {})
         
-        # 2. Obter métricas de CPU e memória dos pods com kubectl top (namespace default)
-        cmd_top = "kubectl top pods -n default --no-headers 2>&1"
-        logger.info(f"[{fetch_id}] Executando '{cmd_top}'")
-        return_code, stdout, stderr = ssh_service.execute_command(cmd_top, timeout=15)
+        pod_name = metadata.get('name', '')
+        if not pod_name:
+            continue
+        
+        # Usar o nome do pod como nome do RPA (mais confiável)
+        labels = metadata.get('labels', {})
+        # Preferir nome do pod completo para exibição
+        rpa_name = pod_name
         
-        logger.info(f"[{fetch_id}] kubectl top - return_code={return_code}, stdout_len={len(stdout) if stdout else 0}")
-        if stdout:
-            logger.info(f"[{fetch_id}] kubectl top stdout: {stdout[:500]}")
+        # Informações dos containers (pode haver múltiplos)
+        containers = spec.get('containers', [])
+        container_statuses = status.get('containerStatuses', [])
         
-        metrics_by_pod = {}
-        if return_code == 0 and stdout:
-            lines = stdout.strip().split("\n")
-            logger.info(f"[{fetch_id}] Obtidos {len(lines)} linhas de métricas de pods")
+        total_cpu_limit = 0
+        total_memory_limit = 0
+        total_cpu_request = 0
+        total_memory_request = 0
+        image_full = ''
+        image_tag = ''
+        
+        for container in containers:
+            # Imagem docker
+            image = container.get('image', '')
+            if image and not image_full:
+                image_full = image
+                # Extrair apenas a tag da imagem (parte após :)
+                if ':' in image:
+                    image_tag = image.split(':')[-1]
+                else:
+                    image_tag = 'latest'
+            
+            # Recursos alocados (limits e requests)
+            resources = container.get('resources', {})
+            limits = resources.get('limits', {})
+            requests = resources.get('requests', {})
             
-            for line in lines:
-                line = line.strip()
-                if not line or 'error' in line.lower():
-                    continue
-                    
-                # Formato: NAME CPU(cores) MEMORY(bytes)
-                # Exemplo: rpa-job-honorarios-clientes-bitrix-9pltw-rz6lg   380m   183Mi
-                parts = line.split()
-                if len(parts) >= 3:
-                    pod_name = parts[0]
-                    cpu_raw = parts[1]  # Ex: "380m"
-                    memory_raw = parts[2]  # Ex: "183Mi"
-                    
-                    # Parse CPU (ex: "380m" -> 380 millicores)
-                    cpu_millicores = parse_cpu(cpu_raw)
-                    cpu_used = int(cpu_millicores * 1000)  # Converter para millicores
-                    
-                    # Parse Memory (ex: "183Mi" -> MB)
-                    memory_bytes = parse_memory(memory_raw)
-                    memory_used_mb = round(memory_bytes / (1024 * 1024), 2)
-                    
-                    logger.info(f"[{fetch_id}] Pod {pod_name}: CPU={cpu_raw} ({cpu_used}m), MEM={memory_raw} ({memory_used_mb:.1f}MB)")
-                    
-                    metrics_by_pod[pod_name] = {
-                        'cpu_used_millicores': cpu_used,
-                        'cpu_raw': cpu_raw,
-                        'memory_used_mb': memory_used_mb,
-                        'memory_raw': memory_raw,
-                    }
+            # CPU limits/requests
+            if limits.get('cpu'):
+                total_cpu_limit += parse_cpu(limits['cpu'])
+            if requests.get('cpu'):
+                total_cpu_request += parse_cpu(requests['cpu'])
+            
+            # Memory limits/requests
+            if limits.get('memory'):
+                total_memory_limit += parse_memory(limits['memory'])
+            if requests.get('memory'):
+                total_memory_request += parse_memory(requests['memory'])
+        
+        pods_info[pod_name] = {
+            'rpa_name': rpa_name,
+            'image_full': image_full,
+            'image_tag': image_tag,
+            'cpu_limit_millicores': int(total_cpu_limit * 1000),
+            'memory_limit_mb': round(total_memory_limit / (1024 * 1024), 2),
+            'cpu_request_millicores': int(total_cpu_request * 1000),
+            'memory_request_mb': round(total_memory_request / (1024 * 1024), 2),
+            'phase': status.get('phase', 'Unknown'),
+            'start_time': status.get('startTime', ''),
+            'node': spec.get('nodeName', ''),
+        }
+    
+    # 2. Obter métricas de CPU e memória dos pods com kubectl top (namespace default)
+    return_code, stdout = top_return_code, top_stdout
+    
+    logger.info(f"[{fetch_id}] kubectl top - return_code={return_code}, stdout_len={len(stdout) if stdout else 0}")
+    if stdout:
+        logger.info(f"[{fetch_id}] kubectl top stdout: {stdout[:500]}")
+    
+    metrics_by_pod = {}
+    if return_code == 0 and stdout:
+        lines = stdout.strip().split("\n")
+        logger.info(f"[{fetch_id}] Obtidos {len(lines)} linhas de métricas de pods")
+        
+        for line in lines:
+            line = line.strip()
+            if not line or 'error' in line.lower():
+                continue
+                
+            # Formato: NAME CPU(cores) MEMORY(bytes)
+            # Exemplo: rpa-job-honorarios-clientes-bitrix-9pltw-rz6lg   380m   183Mi
+            parts = line.split()
+            if len(parts) >= 3:
+                pod_name = parts[0]
+                cpu_raw = parts[1]  # Ex: "380m"
+                memory_raw = parts[2]  # Ex: "183Mi"
+                
+                # Parse CPU (ex: "380m" -> 380 millicores)
+                cpu_millicores = parse_cpu(cpu_raw)
+                cpu_used = int(cpu_millicores * 1000)  # Converter para millicores
+                
+                # Parse Memory (ex: "183Mi" -> MB)
+                memory_bytes = parse_memory(memory_raw)
+                memory_used_mb = round(memory_bytes / (1024 * 1024), 2)
+                
+                logger.info(f"[{fetch_id}] Pod {pod_name}: CPU={cpu_raw} ({cpu_used}m), MEM={memory_raw} ({memory_used_mb:.1f}MB)")
+                
+                metrics_by_pod[pod_name] = {
+                    'cpu_used_millicores': cpu_used,
+                    'cpu_raw': cpu_raw,
+                    'memory_used_mb': memory_used_mb,
+                    'memory_raw': memory_raw,
+                }
+    else:
+        logger.warning(f"[{fetch_id}] kubectl top pods falhou ou retornou vazio. return_code={return_code}, stdout={stdout[:200] if stdout else 'None'}")
+    
+    logger.info(f"[{fetch_id}] Total de {len(metrics_by_pod)} pods com métricas coletadas: {list(metrics_by_pod.keys())}")
+    
+    # 3. Combinar informações de pods com métricas do kubectl top
+    logger.info(f"[{fetch_id}] Pods k8s disponíveis: {list(pods_info.keys())}")
+    logger.info(f"[{fetch_id}] Pods com métricas: {list(metrics_by_pod.keys())}")
+    
+    for pod_name, info in pods_info.items():
+        # Apenas incluir pods que estão Running
+        if info.get('phase') != 'Running':
+            continue
+        
+        # Buscar métricas diretamente pelo nome do pod (kubectl top retorna o mesmo nome)
+        metrics = metrics_by_pod.get(pod_name, {})
+        
+        if metrics:
+            logger.info(f"[{fetch_id}] ✓ Métricas encontradas para pod '{pod_name}'")
         else:
-            logger.warning(f"[{fetch_id}] kubectl top pods falhou ou retornou vazio. return_code={return_code}, stdout={stdout[:200] if stdout else 'None'}")
+            logger.warning(f"[{fetch_id}] ✗ Sem métricas para pod '{pod_name}'")
         
-        logger.info(f"[{fetch_id}] Total de {len(metrics_by_pod)} pods com métricas coletadas: {list(metrics_by_pod.keys())}")
+        # Recursos alocados (limits do k8s)
+        cpu_limit = info.get('cpu_limit_millicores', 0) or info.get('cpu_request_millicores', 0) or 1000
+        memory_limit = info.get('memory_limit_mb', 0) or info.get('memory_request_mb', 0) or 512
         
-        # 3. Combinar informações de pods com métricas do kubectl top
-        logger.info(f"[{fetch_id}] Pods k8s disponíveis: {list(pods_info.keys())}")
-        logger.info(f"[{fetch_id}] Pods com métricas: {list(metrics_by_pod.keys())}")
+        # Recursos consumidos (do kubectl top)
+        cpu_used = metrics.get('cpu_used_millicores', 0)
+        memory_used = metrics.get('memory_used_mb', 0)
         
-        for pod_name, info in pods_info.items():
-            # Apenas incluir pods que estão Running
-            if info.get('phase') != 'Running':
-                continue
-            
-            # Buscar métricas diretamente pelo nome do pod (kubectl top retorna o mesmo nome)
-            metrics = metrics_by_pod.get(pod_name, {})
-            
-            if metrics:
-                logger.info(f"[{fetch_id}] ✓ Métricas encontradas para pod '{pod_name}'")
-            else:
-                logger.warning(f"[{fetch_id}] ✗ Sem métricas para pod '{pod_name}'")
+        # Calcular percentuais
+        cpu_percent = round((cpu_used / cpu_limit) * 100, 2) if cpu_limit > 0 else 0
+        memory_percent = round((memory_used / memory_limit) * 100, 2) if memory_limit > 0 else 0
+        
+        # Imagem
+        image_full = info.get('image_full', '')
+        
+        pods_metrics.append({
+            'pod_name': pod_name,
+            'rpa_name': info.get('rpa_name', pod_name),
+            'image_full': image_full,
+            'image_tag': info.get('image_tag', 'latest'),
             
             # Recursos alocados (limits do k8s)
-            cpu_limit = info.get('cpu_limit_millicores', 0) or info.get('cpu_request_millicores', 0) or 1000
-            memory_limit = info.get('memory_limit_mb', 0) or info.get('memory_request_mb', 0) or 512
+            'cpu_allocated_millicores': cpu_limit,
+            'memory_allocated_mb': memory_limit,
             
             # Recursos consumidos (do kubectl top)
-            cpu_used = metrics.get('cpu_used_millicores', 0)
-            memory_used = metrics.get('memory_used_mb', 0)
+            'cpu_used_millicores': cpu_used,
+            'memory_used_mb': memory_used,
             
-            # Calcular percentuais
-            cpu_percent = round((cpu_used / cpu_limit) * 100, 2) if cpu_limit > 0 else 0
-            memory_percent = round((memory_used / memory_limit) * 100, 2) if memory_limit > 0 else 0
+            # Percentuais calculados
+            'cpu_percent': min(cpu_percent, 100),
+            'memory_percent': min(memory_percent, 100),
             
-            # Imagem
-            image_full = info.get('image_full', '')
+            # Dados brutos (do kubectl top)
+            'cpu_raw': metrics.get('cpu_raw', 'N/A'),
+            'memory_raw': metrics.get('memory_raw', 'N/A'),
             
-            pods_metrics.append({
-                'pod_name': pod_name,
-                'rpa_name': info.get('rpa_name', pod_name),
-                'image_full': image_full,
-                'image_tag': info.get('image_tag', 'latest'),
+            # Metadados
+            'start_time': info.get('start_time', ''),
+            'node': info.get('node', ''),
+        })
                 
-                # Recursos alocados (limits do k8s)
-                'cpu_allocated_millicores': cpu_limit,
-                'memory_allocated_mb': memory_limit,
-                
-                # Recursos consumidos (do kubectl top)
-                'cpu_used_millicores': cpu_used,
-                'memory_used_mb': memory_used,
-                
-                # Percentuais calculados
-                'cpu_percent': min(cpu_percent, 100),
-                'memory_percent': min(memory_percent, 100),
-                
-                # Dados brutos (do kubectl top)
-                'cpu_raw': metrics.get('cpu_raw', 'N/A'),
-                'memory_raw': metrics.get('memory_raw', 'N/A'),
-                
-                # Metadados
-                'start_time': info.get('start_time', ''),
-                'node': info.get('node', ''),
-            })
-                    
-        logger.info(f"[{fetch_id}] Métricas completas coletadas para {len(pods_metrics)} pods")
-                    
-    except Exception as e:
-        logger.error(f"[{fetch_id}] Erro ao coletar métricas de pods: {e}", exc_info=True)
-    
-    total_elapsed = time.time() - start_time
-    logger.info(f"[{fetch_id}] Coleta de recursos dos pods concluída em {total_elapsed:.3f}s")
+    logger.info(f"[{fetch_id}] Métricas completas coletadas para {len(pods_metrics)} pods")
     
     return pods_metrics
 
@@ -267,28 +293,6 @@ def parse_docker_memory(mem_str: str) -> float:
         return 0
 
 
-def extract_rpa_name(pod_name: str) -> str:
-    """
-    Extrai o nome do RPA do nome do pod.
-    Ex: 'rpa-att-infos-bitrix-abc123-xyz' -> 'att-infos-bitrix'
-    """
-    # Remover prefixos comuns
-    name = pod_name
-    for prefix in ['rpa-cronjob-', 'cronjob-rpa-', 'rpa-', 'job-', 'deployment-']:
-        if name.lower().startswith(prefix):
-            name = name[len(prefix):]
-            break
-    
-    # Remover sufixos de hash (geralmente últimos 2 segmentos separados por -)
-    parts = name.split('-')
-    if len(parts) > 2:
-        # Verificar se os últimos segmentos parecem hashes (alfanuméricos de 5+ chars)
-        while len(parts) > 1 and len(parts[-1]) >= 5 and parts[-1].isalnum():
-            parts.pop()
-    
-    return '-'.join(parts) if parts else pod_name
-
-
 def parse_cpu(cpu_str: str) -> float:
     """
     Converte string de CPU para número de cores.
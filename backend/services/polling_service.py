@@ -1,14 +1,25 @@
 import logging
 import threading
 import time
-from typing import Optional, Set, Dict, List
+from collections.abc import Mapping
+from typing import Callable, Optional, Set, Dict, List
 
-from services.cache_service import CacheKeys, CacheService
+from services.adaptive_interval import AdaptiveInterval
+from services.cache_service import CacheKeys, CacheService, content_hash
+from services.client_activity import ClientActivity
 from services.service_manager import (
     get_database_service,
     get_kubernetes_service,
     get_ssh_service,
 )
+from services.cluster_snapshot import ClusterSnapshot, publish_cluster_snapshot
+from services.cluster_watch import ClusterWatchStore
+from services.k8s_records import CronjobInfo, DeploymentInfo
+from services.remote_collector import CollectorSnapshot, RemoteCollector
+from services.robot_identity import (
+    cronjob_robot_name, deployment_robot_name, get_robot_resolver, job_robot_name,
+)
+from services.scheduler import get_scheduler
 from services.vm_resource_service import fetch_vm_resources
 
 logger = logging.getLogger(__name__)
@@ -17,32 +28,84 @@ logger = logging.getLogger(__name__)
 class PollingService:
     """
     Serviço em background responsável por coletar dados do Kubernetes e MySQL
-    em intervalos fixos e armazená-los em cache.
+    e armazená-los em cache.
+
+    Cada coletor é uma tarefa do scheduler (services.scheduler) com cadência e
+    prazo próprios: cluster (jobs/pods), recursos da VM, execuções e os
+    cronjobs/deployments processados, que só são refeitos quando as definições
+    ou as execuções mudam (e por segurança a cada polling_interval_definitions).
     """
 
+    # Prazo (s) de cada tarefa no scheduler: execuções mais longas contam como estouro
+    TASK_DEADLINES = {
+        'cluster': 45.0,
+        'vm_resources': 20.0,
+        'cronjobs': 20.0,
+        'deployments': 20.0,
+        'executions': 30.0,
+    }
+
+    # Chaves cujas mudanças aceleram a coleta do cluster
+    CLUSTER_KEYS = (CacheKeys.JOBS, CacheKeys.PODS, CacheKeys.CRONJOBS, CacheKeys.DEPLOYMENTS)
+
     def __init__(self, vm_interval: int = None, db_interval: int = None):
         # Usar configurações do config.ini se não fornecidas
-        if vm_interval is None or db_interval is None:
-            try:
-                from config.ssh_config import get_backend_config
-                backend_config = get_backend_config()
-                if vm_interval is None:
-                    vm_interval = backend_config.get('polling_interval_vm', 10)
-                if db_interval is None:
-                    db_interval = backend_config.get('polling_interval_db', 10)
-            except Exception as e:
-                logger.warning(f"Erro ao ler configurações do backend, usando valores padrão: {e}")
-                vm_interval = vm_interval or 10
-                db_interval = db_interval or 10
+        try:
+            from config.ssh_config import get_backend_config
+            backend_config = get_backend_config()
+        except Exception as e:
+            logger.warning(f"Erro ao ler configurações do backend, usando valores padrão: {e}")
+            backend_config = {}
+        if vm_interval is None:
+            vm_interval = backend_config.get('polling_interval_vm', 10)
+        if db_interval is None:
+            db_interval = backend_config.get('polling_interval_db', 10)
         
         self.vm_interval = vm_interval
         self.db_interval = db_interval
+        # Sem clientes na API, coletores usados só pela UI rodam apenas no heartbeat
+        ClientActivity.configure(backend_config.get('client_idle_after', ClientActivity.IDLE_AFTER))
+        self.idle_heartbeat_interval = backend_config.get('idle_heartbeat_interval', 300)
+        # Cronjobs/deployments processados: refeitos quando mudam, e no máximo a cada definitions_interval
+        self.definitions_interval = backend_config.get('polling_interval_definitions', 60)
+        # Intervalos efetivos: partem dos configurados e se ajustam à taxa de mudança
+        self._intervals = {
+            'vm': AdaptiveInterval(
+                vm_interval,
+                backend_config.get('polling_interval_vm_min', 2),
+                backend_config.get('polling_interval_vm_max', 60),
+            ),
+            'db': AdaptiveInterval(
+                db_interval,
+                backend_config.get('polling_interval_db_min', 2),
+                backend_config.get('polling_interval_db_max', 60),
+            ),
+        }
+        # Entradas da última execução bem-sucedida de cada etapa de processamento
+        self._stage_inputs: Dict[str, tuple] = {}
         self._running = False
-        self._vm_thread: Optional[threading.Thread] = None
-        self._db_thread: Optional[threading.Thread] = None
+        self.scheduler = get_scheduler()
+        self._unsubscribe: List[Callable[[], None]] = []
+        # Erros SSH por coletor (o status de conexão agrega todos); coletores rodam em paralelo
+        self._ssh_errors: Dict[str, str] = {}
+        self._status_lock = threading.Lock()
+        self._remote_vm_collected_at = 0.0
         self.k8s_service = get_kubernetes_service()
         self.db_service = get_database_service()
         self.ssh_service = get_ssh_service()
+        # Coletor remoto: um único comando SSH por ciclo (com fallback para comandos individuais)
+        self.remote_collector: Optional[RemoteCollector] = None
+        if backend_config.get('remote_collector', False):
+            self.remote_collector = RemoteCollector(
+                self.ssh_service,
+                remote_path=backend_config.get('remote_collector_path', '.dockerwatcher/collector.py'),
+                use_gzip=backend_config.get('remote_collector_gzip', True),
+            )
+        # Watch do cluster: mudanças chegam ao cache sem esperar o próximo ciclo
+        self.watch_store: Optional[ClusterWatchStore] = None
+        if backend_config.get('kubernetes_watch', False):
+            self.watch_store = ClusterWatchStore(self.k8s_service, on_change=self._on_cluster_change)
+        self._cluster_lock = threading.Lock()
         self._connection_status = {
             'ssh_connected': False,
             'mysql_connected': False,
@@ -50,147 +113,331 @@ class PollingService:
             'mysql_error': 'Status ainda não verificado',
         }
         CacheService.update(CacheKeys.CONNECTION_STATUS, dict(self._connection_status))
+        self._publish_polling_status()
 
     def start(self):
         if self._running:
             logger.warning("PollingService já está em execução")
             return
         self._running = True
-        self._vm_thread = threading.Thread(target=self._vm_loop, daemon=True)
-        self._db_thread = threading.Thread(target=self._db_loop, daemon=True)
-        self._vm_thread.start()
-        self._db_thread.start()
+        scheduler = self.scheduler
+        deadlines = self.TASK_DEADLINES
+        scheduler.register('cluster', self._collect_cluster, lambda: self._intervals['vm'].current,
+                           deadline=deadlines['cluster'])
+        scheduler.register('vm_resources', self._collect_vm_resources, lambda: self._ui_interval(self.vm_interval),
+                           deadline=deadlines['vm_resources'])
+        scheduler.register('executions', self._collect_executions, lambda: self._intervals['db'].current,
+                           deadline=deadlines['executions'])
+        # Processados dependem do cluster e das execuções: primeira rodada depois delas
+        scheduler.register('cronjobs', self._refresh_cronjobs, self.definitions_interval,
+                           deadline=deadlines['cronjobs'], min_interval=1.0, initial_delay=5.0)
+        scheduler.register('deployments', self._refresh_deployments,
+                           lambda: self._ui_interval(self.definitions_interval),
+                           deadline=deadlines['deployments'], min_interval=1.0, initial_delay=5.0)
+
+        self._unsubscribe = [
+            CacheService.subscribe(CacheKeys.CRONJOBS, lambda key, entry: scheduler.wake('cronjobs')),
+            CacheService.subscribe(CacheKeys.DEPLOYMENTS, lambda key, entry: self._wake_ui('deployments')),
+            CacheService.subscribe(CacheKeys.EXECUTIONS, self._on_executions_change),
+            # Views invalidam os processados (None) ao editar cronjobs/deployments
+            CacheService.subscribe(CacheKeys.CRONJOBS_PROCESSED, self._on_processed_invalidated),
+            CacheService.subscribe(CacheKeys.DEPLOYMENTS_PROCESSED, self._on_processed_invalidated),
+            ClientActivity.on_resume(lambda: scheduler.wake('vm_resources', 'deployments')),
+        ]
+        scheduler.start()
+        if self.watch_store:
+            self.watch_store.start()
         logger.info("PollingService iniciado (VM: %ss | DB: %ss)", self.vm_interval, self.db_interval)
 
     def stop(self):
         self._running = False
-        for thread in [self._vm_thread, self._db_thread]:
-            if thread:
-                thread.join(timeout=5)
+        if self.watch_store:
+            self.watch_store.stop()
+        self.scheduler.unregister(*self.TASK_DEADLINES)
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
         logger.info("PollingService parado")
 
-    def _sleep_interval(self, target_seconds: float):
-        slept = 0.0
-        step = 0.5
-        while self._running and slept < target_seconds:
-            remaining = target_seconds - slept
-            time.sleep(step if remaining > step else remaining)
-            slept += step
-
-    def _vm_loop(self):
-        while self._running:
-            start = time.time()
-            ssh_errors = []
-            ssh_success = True
-            try:
-                jobs = self.k8s_service.get_jobs()
-                CacheService.update(CacheKeys.JOBS, jobs)
-            except Exception as e:
-                ssh_success = False
-                ssh_errors.append(f"jobs: {e}")
-                logger.warning(f"Erro ao atualizar cache de jobs: {e}")
-                CacheService.update(CacheKeys.JOBS, CacheService.get_data(CacheKeys.JOBS, []), error=str(e))
+    def _ui_interval(self, interval: float) -> float:
+        """Intervalo dos coletores usados só pela UI: heartbeat quando não há clientes."""
+        return self.idle_heartbeat_interval if ClientActivity.is_idle() else interval
+
+    def _wake_ui(self, *names: str):
+        if not ClientActivity.is_idle():
+            self.scheduler.wake(*names)
+
+    def _on_executions_change(self, key: str, entry):
+        # Contagem de execuções pendentes nos processados
+        self.scheduler.wake('cronjobs')
+        self._wake_ui('deployments')
+
+    def _on_processed_invalidated(self, key: str, entry):
+        if entry['data'] is None:
+            self.scheduler.wake('cronjobs' if key == CacheKeys.CRONJOBS_PROCESSED else 'deployments')
+
+    def _next_interval(self, loop: str, changed: bool) -> float:
+        """Ajusta o intervalo do coletor: acelera com mudanças ou execuções pendentes, recua se estável."""
+        adaptive = self._intervals[loop]
+        previous = adaptive.current
+        interval = adaptive.observe(changed or self._has_pending_executions())
+        if interval != previous:
+            logger.debug(f"Intervalo de polling '{loop}': {previous:.1f}s -> {interval:.1f}s")
+            self._publish_polling_status()
+        return interval
+
+    @staticmethod
+    def _has_pending_executions() -> bool:
+        execucoes = CacheService.get_data(CacheKeys.EXECUTIONS) or {}
+        return any(execucoes.values())
+
+    def _publish_polling_status(self):
+        CacheService.update(CacheKeys.POLLING_STATUS, self.get_polling_status())
+
+    def get_polling_status(self) -> Dict[str, Dict[str, float]]:
+        """Intervalos efetivos (e limites) de cada laço."""
+        return {loop: adaptive.to_dict() for loop, adaptive in self._intervals.items()}
+
+    def _set_ssh_error(self, collector: str, error: Optional[str]):
+        """Registra o resultado SSH de um coletor e atualiza o status de conexão agregado."""
+        with self._status_lock:
+            if error:
+                self._ssh_errors[collector] = error
+            else:
+                self._ssh_errors.pop(collector, None)
+            errors = "; ".join(self._ssh_errors.values()) or None
+            self._update_connection_status(ssh=errors is None, ssh_error=errors)
 
-            try:
-                all_pods = self.k8s_service.get_pods()
-                # Filtrar apenas pods que estão rodando (phase == 'Running')
-                running_pods = [
-                    pod for pod in all_pods 
-                    if pod.get('phase') == 'Running'
-                ]
-                CacheService.update(CacheKeys.PODS, running_pods)
-                logger.debug(f"Cache de pods atualizado: {len(running_pods)} pods rodando de {len(all_pods)} total")
-            except Exception as e:
-                ssh_success = False
-                ssh_errors.append(f"pods: {e}")
-                logger.warning(f"Erro ao atualizar cache de pods: {e}")
-                CacheService.update(CacheKeys.PODS, CacheService.get_data(CacheKeys.PODS, []), error=str(e))
+    def _collect_cluster(self):
+        """Coletor do cluster: pods, jobs, cronjobs e deployments em uma única chamada."""
+        versions = {key: CacheService.version(key) for key in self.CLUSTER_KEYS}
+        # Com o watch sincronizado o estado do cluster já está em memória
+        watch_synced = self.watch_store is not None and self.watch_store.synced
+        snapshot = None if watch_synced else self._collect_remote_snapshot(include_cluster=True)
 
-            try:
-                cronjobs = self.k8s_service.get_cronjobs()
-                CacheService.update(CacheKeys.CRONJOBS, cronjobs)
-                # Processar e cachear cronjobs processados
-                self._processar_e_cachear_cronjobs(cronjobs)
-            except Exception as e:
-                ssh_success = False
-                ssh_errors.append(f"cronjobs: {e}")
-                logger.warning(f"Erro ao atualizar cache de cronjobs: {e}")
-                CacheService.update(CacheKeys.CRONJOBS, CacheService.get_data(CacheKeys.CRONJOBS, []), error=str(e))
+        try:
+            # Uma única chamada kubectl por ciclo, publicada no cache como uma unidade
+            with self._cluster_lock:
+                try:
+                    if watch_synced:
+                        cluster = self.watch_store.get_snapshot()
+                    elif snapshot:
+                        cluster = snapshot.get_cluster_snapshot()
+                    else:
+                        cluster = self.k8s_service.get_cluster_snapshot()
+                except Exception as e:
+                    logger.warning(f"Erro ao obter snapshot do cluster: {e}")
+                    for key in self.CLUSTER_KEYS:
+                        CacheService.update(key, CacheService.get_data(key), error=str(e))
+                    self._set_ssh_error('cluster', f"cluster: {e}")
+                    raise
+                errors = self._apply_cluster_snapshot(cluster)
+            self._set_ssh_error('cluster', "; ".join(errors) or None)
+
+            # O coletor remoto trouxe também VM e kubectl top do mesmo instante
+            if snapshot:
+                self._publish_remote_resources(snapshot, cluster)
+        finally:
+            changed = any(CacheService.version(key) != version for key, version in versions.items())
+            self._next_interval('vm', changed)
+
+    def _collect_vm_resources(self):
+        """Coletor de memória, disco e CPU da VM (e métricas dos pods, pelo coletor remoto)."""
+        if time.time() - self._remote_vm_collected_at < self.vm_interval / 2:
+            return  # publicados pelo coletor do cluster neste ciclo
+        try:
+            snapshot = self._collect_remote_snapshot(include_cluster=False)
+            if snapshot:
+                self._publish_remote_resources(snapshot, CacheService.get_data(CacheKeys.CLUSTER_SNAPSHOT))
+                return
+            CacheService.update(CacheKeys.VM_RESOURCES, fetch_vm_resources(self.ssh_service))
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar cache de recursos da VM: {e}")
+            CacheService.update(CacheKeys.VM_RESOURCES, CacheService.get_data(CacheKeys.VM_RESOURCES), error=str(e))
+            self._set_ssh_error('vm_resources', f"vm_resources: {e}")
+            raise
+        self._set_ssh_error('vm_resources', None)
+
+    def _publish_remote_resources(self, snapshot: CollectorSnapshot, cluster: Optional[ClusterSnapshot]):
+        """Recursos da VM e métricas dos pods vindos do coletor remoto."""
+        try:
+            CacheService.update(CacheKeys.VM_RESOURCES, snapshot.get_vm_resources())
+            self._remote_vm_collected_at = time.time()
+            self._set_ssh_error('vm_resources', None)
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar cache de recursos da VM: {e}")
+            CacheService.update(CacheKeys.VM_RESOURCES, CacheService.get_data(CacheKeys.VM_RESOURCES), error=str(e))
+            self._set_ssh_error('vm_resources', f"vm_resources: {e}")
+        try:
+            CacheService.update(CacheKeys.POD_RESOURCES, snapshot.get_pod_resources(cluster))
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar cache de recursos dos pods: {e}")
 
-            try:
-                deployments = self.k8s_service.get_deployments()
-                CacheService.update(CacheKeys.DEPLOYMENTS, deployments)
-                # Processar e cachear deployments processados
-                self._processar_e_cachear_deployments(deployments)
-            except Exception as e:
-                ssh_success = False
-                ssh_errors.append(f"deployments: {e}")
-                logger.warning(f"Erro ao atualizar cache de deployments: {e}")
-                CacheService.update(CacheKeys.DEPLOYMENTS, CacheService.get_data(CacheKeys.DEPLOYMENTS, []), error=str(e))
+    def _robots_fingerprint(self, tipo: str) -> Optional[tuple]:
+        """Quantidade e última alteração dos robôs de um tipo no banco local (None se indisponível)."""
+        try:
+            from django.db.models import Count, Max
+            from api.models import RoboDockerizado
+            stats = RoboDockerizado.objects.filter(tipo=tipo).aggregate(total=Count('id'), updated=Max('updated_at'))
+            return stats['total'], stats['updated']
+        except Exception as e:
+            logger.debug(f"Não foi possível obter a versão dos robôs '{tipo}': {e}")
+            return None
 
-            try:
-                vm_resources = fetch_vm_resources(self.ssh_service)
-                CacheService.update(CacheKeys.VM_RESOURCES, vm_resources)
-            except Exception as e:
-                ssh_success = False
-                ssh_errors.append(f"vm_resources: {e}")
-                logger.warning(f"Erro ao atualizar cache de recursos da VM: {e}")
-                CacheService.update(CacheKeys.VM_RESOURCES, CacheService.get_data(CacheKeys.VM_RESOURCES, {}), error=str(e))
+    def _stage_unchanged(self, stage: str, inputs: tuple, output_key: str) -> bool:
+        """
+        True se a etapa já foi processada com exatamente estas entradas e a saída
+        continua no cache (chaves invalidadas pelas views voltam a None).
+        """
+        if any(value is None for value in inputs):
+            return False
+        return self._stage_inputs.get(stage) == inputs and CacheService.get_data(output_key) is not None
+
+    def _refresh_cronjobs(self):
+        """Cronjobs processados (banco local + execuções pendentes) a partir dos cronjobs do cluster."""
+        snapshot = CacheService.snapshot(CacheKeys.CRONJOBS, CacheKeys.EXECUTIONS)
+        cronjobs = snapshot.data(CacheKeys.CRONJOBS)
+        if cronjobs is None:
+            return
+        inputs = (snapshot.version(CacheKeys.CRONJOBS), snapshot.version(CacheKeys.EXECUTIONS),
+                  self._robots_fingerprint('cronjob'))
+        if self._stage_unchanged('cronjobs', inputs, CacheKeys.CRONJOBS_PROCESSED):
+            return
+        execucoes_por_robo = snapshot.data(CacheKeys.EXECUTIONS, {}) or {}
+        processed = self._processar_cronjobs(cronjobs, execucoes_por_robo)
+        if processed:
+            CacheService.publish(processed)
+            self._stage_inputs['cronjobs'] = inputs
+
+    def _refresh_deployments(self):
+        """Deployments processados (banco local + execuções pendentes) a partir dos deployments do cluster."""
+        snapshot = CacheService.snapshot(CacheKeys.DEPLOYMENTS, CacheKeys.EXECUTIONS)
+        deployments = snapshot.data(CacheKeys.DEPLOYMENTS)
+        if deployments is None:
+            return
+        inputs = (snapshot.version(CacheKeys.DEPLOYMENTS), snapshot.version(CacheKeys.EXECUTIONS),
+                  self._robots_fingerprint('deployment'))
+        if self._stage_unchanged('deployments', inputs, CacheKeys.DEPLOYMENTS_PROCESSED):
+            return
+        execucoes_por_robo = snapshot.data(CacheKeys.EXECUTIONS, {}) or {}
+        processed = self._processar_deployments(deployments, execucoes_por_robo)
+        if processed:
+            CacheService.publish(processed)
+            self._stage_inputs['deployments'] = inputs
+
+    def _apply_cluster_snapshot(self, cluster: ClusterSnapshot) -> List[str]:
+        """Publica o snapshot do cluster e as listas derivadas como uma geração. Retorna os erros por seção."""
+        errors = []
+        related = {}
+        failed = {}
 
-            ssh_error_msg = None if ssh_success else "; ".join(ssh_errors)
-            self._update_connection_status(ssh=ssh_success, ssh_error=ssh_error_msg)
+        try:
+            # RecordLists do snapshot: publicadas sem cópia, com os índices já montados
+            related[CacheKeys.JOBS] = cluster.jobs
+        except Exception as e:
+            errors.append(f"jobs: {e}")
+            logger.warning(f"Erro ao atualizar cache de jobs: {e}")
+            failed[CacheKeys.JOBS] = str(e)
 
-            elapsed = time.time() - start
-            wait_time = max(0.0, self.vm_interval - elapsed)
-            self._sleep_interval(wait_time)
+        try:
+            # Apenas pods que estão rodando (phase == 'Running')
+            running_pods = cluster.running_pods
+            related[CacheKeys.PODS] = running_pods
+            logger.debug(f"Cache de pods atualizado: {len(running_pods)} pods rodando de {len(cluster.pods)} total")
+        except Exception as e:
+            errors.append(f"pods: {e}")
+            logger.warning(f"Erro ao atualizar cache de pods: {e}")
+            failed[CacheKeys.PODS] = str(e)
 
-    def _db_loop(self):
-        while self._running:
-            start = time.time()
-            try:
-                nomes = self._collect_rpa_names()
-                if nomes:
-                    execucoes = self.db_service.obter_execucoes(list(nomes))
-                    CacheService.update(CacheKeys.EXECUTIONS, execucoes)
-                else:
-                    CacheService.update(CacheKeys.EXECUTIONS, {})
-                
-                # Processar e cachear lista de RPAs (do banco local - rápido)
-                self._processar_e_cachear_rpas()
-            except Exception as e:
-                logger.warning(f"Erro ao atualizar cache de execuções: {e}")
-                CacheService.update(CacheKeys.EXECUTIONS, CacheService.get_data(CacheKeys.EXECUTIONS, {}), error=str(e))
-                self._update_connection_status(mysql=False, mysql_error=str(e))
+        try:
+            # Processados pela tarefa 'cronjobs' quando a lista muda
+            related[CacheKeys.CRONJOBS] = cluster.cronjobs
+        except Exception as e:
+            errors.append(f"cronjobs: {e}")
+            logger.warning(f"Erro ao atualizar cache de cronjobs: {e}")
+            failed[CacheKeys.CRONJOBS] = str(e)
 
-            else:
-                self._update_connection_status(mysql=True, mysql_error=None)
+        try:
+            # Processados pela tarefa 'deployments' quando a lista muda
+            related[CacheKeys.DEPLOYMENTS] = cluster.deployments
+        except Exception as e:
+            errors.append(f"deployments: {e}")
+            logger.warning(f"Erro ao atualizar cache de deployments: {e}")
+            failed[CacheKeys.DEPLOYMENTS] = str(e)
+
+        publish_cluster_snapshot(cluster, interval=self._intervals['vm'].current, related=related)
+        # Seções com erro mantêm o último dado válido, marcado com o erro
+        for key, error in failed.items():
+            CacheService.update(key, CacheService.get_data(key), error=error)
 
-            elapsed = time.time() - start
-            wait_time = max(0.0, self.db_interval - elapsed)
-            self._sleep_interval(wait_time)
+        return errors
+
+    def _on_cluster_change(self):
+        """Chamado pelo watch quando o cluster muda: atualiza o cache na hora."""
+        try:
+            with self._cluster_lock:
+                self._apply_cluster_snapshot(self.watch_store.get_snapshot())
+        except Exception as e:
+            logger.warning(f"Erro ao aplicar mudança do cluster no cache: {e}")
+
+    def _collect_remote_snapshot(self, include_cluster: bool = True) -> Optional[CollectorSnapshot]:
+        """Executa o coletor remoto; None quando desativado ou indisponível."""
+        if self.remote_collector is None:
+            return None
+        data = self.remote_collector.collect(include_cluster=include_cluster)
+        if data is None:
+            return None
+        logger.debug(f"Snapshot do coletor remoto obtido (coleta na VM: {data.get('elapsed')}s)")
+        return CollectorSnapshot(data, self.k8s_service)
+
+    def _collect_executions(self):
+        """Coletor das execuções pendentes (MySQL) e da lista de RPAs."""
+        version = CacheService.version(CacheKeys.EXECUTIONS)
+        try:
+            nomes = self._collect_rpa_names()
+            execucoes = self.db_service.obter_execucoes(list(nomes)) if nomes else {}
+            
+            # Execuções e lista de RPAs (do banco local - rápido) publicadas como uma geração
+            items = {CacheKeys.EXECUTIONS: execucoes}
+            # RPAs processados só são refeitos se execuções, jobs ou robôs mudaram
+            inputs = (content_hash(execucoes), CacheService.version(CacheKeys.JOBS), self._robots_fingerprint('rpa'))
+            rpas = None
+            if not self._stage_unchanged('rpas', inputs, CacheKeys.RPAS_PROCESSED):
+                rpas = self._processar_rpas(execucoes)
+            if rpas is not None:
+                items[CacheKeys.RPAS_PROCESSED] = rpas
+            CacheService.publish(items)
+            if rpas is not None:
+                self._stage_inputs['rpas'] = inputs
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar cache de execuções: {e}")
+            CacheService.update(CacheKeys.EXECUTIONS, CacheService.get_data(CacheKeys.EXECUTIONS), error=str(e))
+            with self._status_lock:
+                self._update_connection_status(mysql=False, mysql_error=str(e))
+            raise
+        else:
+            with self._status_lock:
+                self._update_connection_status(mysql=True, mysql_error=None)
+        finally:
+            self._next_interval('db', CacheService.version(CacheKeys.EXECUTIONS) != version)
 
     def _collect_rpa_names(self) -> Set[str]:
         """Coleta nomes de RPAs que estão ativos ou rodando (jobs/pods)."""
-        nomes: Set[str] = set()
+        resolver = get_robot_resolver()
         
-        # 1. Coletar RPAs ativos do banco local
-        rpas_ativos: Set[str] = set()
-        try:
-            from api.models import RoboDockerizado
-            rpas_ativos = set(RoboDockerizado.objects.filter(tipo='rpa', status="active", ativo=True).values_list("nome", flat=True))
-            nomes.update(rpas_ativos)
-        except Exception as e:
-            logger.debug(f"Não foi possível coletar RPAs do banco local: {e}")
+        # 1. RPAs ativos do banco local (índice do resolver)
+        rpas_ativos = resolver.robot_names(tipo='rpa', active=True)
+        nomes: Set[str] = set(rpas_ativos)
 
-        # Map lower -> original for active RPAs
+        # Comparação sem diferenciar maiúsculas (só a caixa; 'robo-a' e 'roboa'
+        # continuam nomes distintos, como antes)
         rpas_ativos_lower = {rpa.lower(): rpa for rpa in rpas_ativos}
 
         # 2. Coletar nomes dos jobs rodando
         jobs_cache = CacheService.get_data(CacheKeys.JOBS, []) or []
-        import re
         
         for job in jobs_cache:
-            labels = job.get("labels", {}) if isinstance(job, dict) else {}
+            labels = job.get("labels", {}) if isinstance(job, Mapping) else {}
             # Tentar pegar nome limpo dos labels primeiro
             nome_robo = (
                 labels.get("nome_robo")
@@ -203,44 +450,28 @@ class PollingService:
                 candidates = set()
                 candidates.add(nome_robo)
                 
-                # Tentar limpar o nome (remover prefixos/sufixos comuns)
-                clean_name = nome_robo
-                
-                # Remover prefixos
-                for prefix in ['rpa-cronjob-', 'rpa-job-', 'cronjob-', 'job-', 'rpa-']:
-                    if clean_name.startswith(prefix):
-                        clean_name = clean_name[len(prefix):]
-                        break
-                
-                # Remover sufixos (hashes, timestamps)
-                # Hash duplo K8s (ex: -w5mwl-tt5tw)
-                clean_name = re.sub(r'-[a-z0-9]{4,10}-[a-z0-9]{4,10}$', '', clean_name) 
-                # Hash simples ou timestamp (ex: -12345678, -abcde)
-                clean_name = re.sub(r'-[a-z0-9]+$', '', clean_name)
-                
+                # Nome sem prefixos/sufixos comuns (hashes, timestamps)
+                clean_name = job_robot_name(nome_robo)
                 if clean_name and clean_name != nome_robo:
                     candidates.add(clean_name)
 
                 # Processar candidatos
                 for candidate in candidates:
-                    # Verificar se bate com algum RPA ativo (para usar o caso correto)
-                    if candidate.lower() in rpas_ativos_lower:
-                        nomes.add(rpas_ativos_lower[candidate.lower()])
-                    else:
-                        nomes.add(candidate)
+                    # Se bate com algum RPA ativo, usar o nome cadastrado (caso correto)
+                    nomes.add(rpas_ativos_lower.get(candidate.lower(), candidate))
 
         return {nome for nome in nomes if nome}
 
-    def _processar_e_cachear_rpas(self):
-        """Processa lista de RPAs do banco local e armazena no cache."""
+    def _processar_rpas(self, execucoes_por_robo: Dict[str, List[Dict]]) -> Optional[List[Dict]]:
+        """Processa lista de RPAs do banco local para o cache (None em caso de erro)."""
         try:
             from api.models import RoboDockerizado
             
             # Buscar RPAs do banco local
             rpas_queryset = RoboDockerizado.objects.filter(tipo='rpa')
+            resolver = get_robot_resolver()
             
-            # Buscar dados do cache
-            execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
+            # Buscar jobs do cache
             jobs_por_rpa = self._contar_jobs_por_rpa_cache()
             
             # Processar RPAs
@@ -249,10 +480,10 @@ class PollingService:
                 rpa_data = rpa_obj.to_dict()
                 
                 # Obter execuções pendentes (do cache)
-                execucoes_pendentes = self._buscar_execucoes_cache(rpa_obj.nome_rpa, execucoes_por_robo)
+                execucoes_pendentes = resolver.count_executions(rpa_obj.nome, execucoes_por_robo)
                 
                 # Obter jobs ativos (do cache)
-                jobs_ativos = jobs_por_rpa.get(rpa_obj.nome_rpa.lower(), 0)
+                jobs_ativos = jobs_por_rpa.get(rpa_obj.nome.lower(), 0)
                 
                 # Garantir que tags tenha "Exec"
                 tags = rpa_data.get('tags', [])
@@ -266,17 +497,17 @@ class PollingService:
                 rpa_data['tags'] = tags
                 rpas_processados.append(rpa_data)
             
-            # Armazenar no cache
-            CacheService.update(CacheKeys.RPAS_PROCESSED, rpas_processados)
+            return rpas_processados
         except Exception as e:
             logger.debug(f"Erro ao processar RPAs para cache: {e}")
+            return None
     
     def _contar_jobs_por_rpa_cache(self) -> Dict[str, int]:
         """Conta jobs por RPA usando cache."""
         jobs_cache = CacheService.get_data(CacheKeys.JOBS, []) or []
         jobs_por_rpa = {}
         for job in jobs_cache:
-            labels = job.get("labels", {}) if isinstance(job, dict) else {}
+            labels = job.get("labels", {}) if isinstance(job, Mapping) else {}
             nome_robo = (labels.get("nome_robo") or labels.get("nome-robo") or labels.get("app") or "").lower()
             if not nome_robo:
                 continue
@@ -285,22 +516,12 @@ class PollingService:
                 jobs_por_rpa[nome_robo] = jobs_por_rpa.get(nome_robo, 0) + active
         return jobs_por_rpa
     
-    def _buscar_execucoes_cache(self, nome_rpa: str, exec_cache: Dict[str, List[Dict]]) -> int:
-        """Busca execuções no cache."""
-        execucoes = exec_cache.get(nome_rpa, [])
-        if execucoes:
-            return len(execucoes)
-        nome_normalizado = nome_rpa.replace("-", "").replace("_", "").lower()
-        for nome_db, execs in exec_cache.items():
-            if nome_normalizado == nome_db.replace("-", "").replace("_", "").lower():
-                return len(execs)
-        return 0
-
-    def _processar_e_cachear_cronjobs(self, k8s_cronjobs: List[Dict]):
-        """Processa lista de cronjobs do Kubernetes e banco local, armazena no cache."""
+    def _processar_cronjobs(self, k8s_cronjobs: List[CronjobInfo],
+                            execucoes_por_robo: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """Processa cronjobs do Kubernetes e banco local; retorna as chaves processadas do cache."""
         try:
             from api.models import RoboDockerizado
-            import re
+            resolver = get_robot_resolver()
             
             # Buscar cronjobs do banco de dados
             try:
@@ -309,10 +530,9 @@ class PollingService:
                 logger.debug(f"Erro ao buscar cronjobs do banco: {e}")
                 db_cronjobs = {}
             
-            # Buscar execuções do cache
-            execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
-            
             cronjobs_processados = []
+            # Lista do Dashboard (/api/cronjobs/kubernetes/): execuções de todos os cronjobs do cluster
+            cronjobs_kubernetes = []
             for cj in k8s_cronjobs:
                 try:
                     nome = cj.get('name', '')
@@ -337,30 +557,37 @@ class PollingService:
                     if 'Agendado' not in tags:
                         tags.append('Agendado')
                     
-                    # Buscar execuções se for dependente
-                    execucoes_pendentes = 0
-                    if dependente_de_execucoes:
-                        nome_rpa = nome.replace('rpa-cronjob-', '').replace('-cronjob', '')
-                        nome_rpa = re.sub(r'-\d+$', '', nome_rpa)
-                        execucoes_pendentes = self._buscar_execucoes_cache(nome_rpa, execucoes_por_robo)
+                    execucoes_do_robo = resolver.count_executions(cronjob_robot_name(nome), execucoes_por_robo)
                     
-                    cj['apelido'] = apelido
-                    cj['tags'] = tags
-                    cj['dependente_de_execucoes'] = dependente_de_execucoes
-                    cj['execucoes_pendentes'] = execucoes_pendentes
-                    cronjobs_processados.append(cj)
+                    # Registro do cluster é imutável: as versões processadas são dicts novos
+                    cj_data = cj.to_dict()
+                    cronjobs_kubernetes.append({**cj_data, 'execucoes_pendentes': execucoes_do_robo})
+                    
+                    # Execuções contam apenas se for dependente
+                    execucoes_pendentes = execucoes_do_robo if dependente_de_execucoes else 0
+                    cj_data['apelido'] = apelido
+                    cj_data['tags'] = tags
+                    cj_data['dependente_de_execucoes'] = dependente_de_execucoes
+                    cj_data['execucoes_pendentes'] = execucoes_pendentes
+                    cronjobs_processados.append(cj_data)
                 except Exception as e:
                     logger.debug(f"Erro ao processar cronjob {cj.get('name', 'unknown')}: {e}")
                     continue
             
-            CacheService.update(CacheKeys.CRONJOBS_PROCESSED, cronjobs_processados)
+            return {
+                CacheKeys.CRONJOBS_PROCESSED: cronjobs_processados,
+                CacheKeys.CRONJOBS_KUBERNETES: cronjobs_kubernetes,
+            }
         except Exception as e:
             logger.debug(f"Erro ao processar cronjobs para cache: {e}")
+            return {}
 
-    def _processar_e_cachear_deployments(self, k8s_deployments: List[Dict]):
-        """Processa lista de deployments do Kubernetes e banco local, armazena no cache."""
+    def _processar_deployments(self, k8s_deployments: List[DeploymentInfo],
+                               execucoes_por_robo: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """Processa deployments do Kubernetes e banco local; retorna as chaves processadas do cache."""
         try:
             from api.models import RoboDockerizado
+            resolver = get_robot_resolver()
             
             # Buscar deployments do banco de dados
             try:
@@ -369,9 +596,6 @@ class PollingService:
                 logger.debug(f"Erro ao buscar deployments do banco: {e}")
                 db_deployments = {}
             
-            # Buscar execuções do cache
-            execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
-            
             deployments_processados = []
             for dep in k8s_deployments:
                 try:
@@ -400,21 +624,22 @@ class PollingService:
                     # Buscar execuções se for dependente
                     execucoes_pendentes = 0
                     if dependente_de_execucoes:
-                        nome_rpa = nome.replace('deployment-', '').replace('-deployment', '')
-                        execucoes_pendentes = self._buscar_execucoes_cache(nome_rpa, execucoes_por_robo)
+                        execucoes_pendentes = resolver.count_executions(deployment_robot_name(nome), execucoes_por_robo)
                     
-                    dep['apelido'] = apelido
-                    dep['tags'] = tags
-                    dep['dependente_de_execucoes'] = dependente_de_execucoes
-                    dep['execucoes_pendentes'] = execucoes_pendentes
-                    deployments_processados.append(dep)
+                    dep_data = dep.to_dict()
+                    dep_data['apelido'] = apelido
+                    dep_data['tags'] = tags
+                    dep_data['dependente_de_execucoes'] = dependente_de_execucoes
+                    dep_data['execucoes_pendentes'] = execucoes_pendentes
+                    deployments_processados.append(dep_data)
                 except Exception as e:
                     logger.debug(f"Erro ao processar deployment {dep.get('name', 'unknown')}: {e}")
                     continue
             
-            CacheService.update(CacheKeys.DEPLOYMENTS_PROCESSED, deployments_processados)
+            return {CacheKeys.DEPLOYMENTS_PROCESSED: deployments_processados}
         except Exception as e:
             logger.debug(f"Erro ao processar deployments para cache: {e}")
+            return {}
 
     def _update_connection_status(
         self,
@@ -0,0 +1,278 @@
+"""
+Coletor remoto instalado na VM.
+
+Em vez de disparar um comando SSH por recurso a cada ciclo de polling (jobs, pods,
+cronjobs, deployments, kubectl top, free, df, top), o backend envia via SFTP um
+script Python (apenas biblioteca padrão) que coleta tudo localmente na VM, em
+paralelo, e devolve um único documento JSON compacto (opcionalmente gzip).
+"""
+import gzip
+import hashlib
+import logging
+import posixpath
+import time
+from typing import Dict, List, Optional
+
+from services import json_codec
+from services.cluster_snapshot import SNAPSHOT_RESOURCES, ClusterSnapshot
+from services.pod_resource_service import build_pod_resources
+from services.vm_resource_service import vm_resources_from_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+COLLECTOR_SCRIPT = r'''#!/usr/bin/env python3
+# Coletor do DockerWatcher. Gerado e instalado automaticamente pelo backend; nao editar.
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+VERSION = "__COLLECTOR_VERSION__"
+CLUSTER_RESOURCES = "__CLUSTER_RESOURCES__"
+COMMAND_TIMEOUT = 25
+
+
+def run(args):
+    try:
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        return 127, b"", str(e).encode("utf-8")
+    try:
+        out, err = proc.communicate(timeout=COMMAND_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        out, err = proc.communicate()
+        return -1, out, b"timeout"
+    return proc.returncode, out, err
+
+
+def kubectl_cluster(result):
+    rc, out, err = run(["kubectl", "get", CLUSTER_RESOURCES, "-o", "json"])
+    data = None
+    if rc == 0:
+        try:
+            data = json.loads(out.decode("utf-8"))
+        except ValueError as e:
+            rc, err = -1, str(e).encode("utf-8")
+    result["cluster"] = {"rc": rc, "data": data, "stderr": err.decode("utf-8", "replace")}
+
+
+def kubectl_top(result):
+    rc, out, err = run(["kubectl", "top", "pods", "-n", "default", "--no-headers"])
+    result["top_pods"] = {"rc": rc, "stdout": (out + err).decode("utf-8", "replace")}
+
+
+def cpu_times():
+    with open("/proc/stat") as f:
+        values = [int(v) for v in f.readline().split()[1:9]]
+    return values[3], sum(values)
+
+
+def collect_vm(vm):
+    # CPU: duas amostras de /proc/stat (enquanto o kubectl roda em paralelo)
+    try:
+        idle_before, total_before = cpu_times()
+        time.sleep(0.5)
+        idle_after, total_after = cpu_times()
+        delta = total_after - total_before
+        if delta > 0:
+            vm["cpu_idle"] = round(100.0 * (idle_after - idle_before) / delta, 2)
+    except Exception as e:
+        vm["errors"].append("cpu: %s" % e)
+
+    # Memoria: mesmo calculo do `free -b` (procps recente: used = total - available)
+    try:
+        meminfo = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2:
+                    meminfo[parts[0].rstrip(":")] = int(parts[1]) * 1024
+        total = meminfo.get("MemTotal", 0)
+        free = meminfo.get("MemFree", 0)
+        if "MemAvailable" in meminfo:
+            used = total - meminfo["MemAvailable"]
+        else:
+            used = total - free - meminfo.get("Buffers", 0) - meminfo.get("Cached", 0) - meminfo.get("SReclaimable", 0)
+        vm["mem_total"] = total
+        vm["mem_free"] = free
+        vm["mem_used"] = max(used, 0)
+    except Exception as e:
+        vm["errors"].append("memoria: %s" % e)
+
+    # Armazenamento: mesmo calculo do `df -B1 /`
+    try:
+        st = os.statvfs("/")
+        vm["disk_total"] = st.f_blocks * st.f_frsize
+        vm["disk_used"] = (st.f_blocks - st.f_bfree) * st.f_frsize
+        vm["disk_free"] = st.f_bavail * st.f_frsize
+    except Exception as e:
+        vm["errors"].append("armazenamento: %s" % e)
+
+
+def main():
+    if "--version" in sys.argv[1:]:
+        sys.stdout.write(VERSION + "\n")
+        return
+
+    started = time.time()
+    kube = {}
+    threads = [threading.Thread(target=kubectl_top, args=(kube,))]
+    # --skip-cluster: estado do cluster já acompanhado por watch no backend
+    if "--skip-cluster" not in sys.argv[1:]:
+        threads.append(threading.Thread(target=kubectl_cluster, args=(kube,)))
+    for thread in threads:
+        thread.start()
+
+    vm = {"errors": []}
+    collect_vm(vm)
+
+    for thread in threads:
+        thread.join()
+
+    snapshot = {
+        "version": VERSION,
+        "collected_at": time.time(),
+        "elapsed": round(time.time() - started, 3),
+        "top_pods": kube.pop("top_pods", {"rc": -1, "stdout": ""}),
+        "kubectl": kube,
+        "vm": vm,
+    }
+    payload = json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+    if "--gzip" in sys.argv[1:]:
+        payload = gzip.compress(payload, 1)
+    out = sys.stdout.buffer
+    out.write(payload)
+    out.flush()
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+COLLECTOR_SCRIPT = COLLECTOR_SCRIPT.replace('__CLUSTER_RESOURCES__', SNAPSHOT_RESOURCES)
+
+# A versão é derivada do próprio conteúdo do script: qualquer alteração aqui
+# força a reinstalação na VM no próximo ciclo.
+COLLECTOR_VERSION = hashlib.sha1(COLLECTOR_SCRIPT.encode('utf-8')).hexdigest()[:12]
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class RemoteCollectorError(Exception):
+    """Falha ao instalar ou executar o coletor remoto."""
+
+
+class RemoteCollector:
+    """Instala (via SFTP) e executa o coletor remoto, devolvendo o snapshot já decodificado."""
+
+    # Tempo que o coletor fica desativado após falhar (volta ao modo por comando)
+    RETRY_AFTER = 300
+
+    def __init__(self, ssh_service, remote_path: str = '.dockerwatcher/collector.py', use_gzip: bool = True):
+        self.ssh_service = ssh_service
+        self.remote_path = remote_path
+        self.use_gzip = use_gzip
+        self._disabled_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.time() >= self._disabled_until
+
+    def install(self):
+        """Envia o script para a VM (escrita atômica via arquivo temporário + rename)."""
+        script = COLLECTOR_SCRIPT.replace('__COLLECTOR_VERSION__', COLLECTOR_VERSION)
+        remote_dir = posixpath.dirname(self.remote_path)
+        tmp_path = f"{self.remote_path}.{COLLECTOR_VERSION}.tmp"
+        with self.ssh_service.get_sftp() as sftp:
+            if remote_dir:
+                try:
+                    sftp.stat(remote_dir)
+                except IOError:
+                    sftp.mkdir(remote_dir)
+            with sftp.open(tmp_path, 'wb') as f:
+                f.write(script.encode('utf-8'))
+            sftp.chmod(tmp_path, 0o755)
+            sftp.posix_rename(tmp_path, self.remote_path)
+        logger.info(f"Coletor remoto {COLLECTOR_VERSION} instalado em {self.remote_path}")
+
+    def _run(self, include_cluster: bool = True) -> Dict:
+        cmd = f"python3 {self.remote_path}"
+        if self.use_gzip:
+            cmd += " --gzip"
+        if not include_cluster:
+            cmd += " --skip-cluster"
+        stream = self.ssh_service.execute_command_stream(cmd, timeout=45)
+        payload = stream.read_all()
+        if stream.return_code != 0:
+            raise RemoteCollectorError(f"rc={stream.return_code}: {stream.stderr_text.strip()}")
+        if payload[:2] == GZIP_MAGIC:
+            payload = gzip.decompress(payload)
+        try:
+            return json_codec.loads(payload)
+        except ValueError as e:
+            raise RemoteCollectorError(f"snapshot inválido: {e}")
+
+    def collect(self, include_cluster: bool = True) -> Optional[Dict]:
+        """
+        Executa o coletor e retorna o snapshot, ou None se o coletor estiver
+        indisponível (o chamador deve usar a coleta por comandos).
+        include_cluster=False pula o kubectl get do cluster (só VM e kubectl top).
+        """
+        if not self.available:
+            return None
+
+        try:
+            snapshot = None
+            try:
+                snapshot = self._run(include_cluster)
+            except RemoteCollectorError as e:
+                logger.info(f"Coletor remoto não executou ({e}), instalando versão {COLLECTOR_VERSION}")
+
+            # Script ausente, com erro ou de outra versão: (re)instalar e executar de novo
+            if snapshot is None or snapshot.get('version') != COLLECTOR_VERSION:
+                self.install()
+                snapshot = self._run(include_cluster)
+                if snapshot.get('version') != COLLECTOR_VERSION:
+                    raise RemoteCollectorError(
+                        f"versão remota {snapshot.get('version')} diferente da esperada {COLLECTOR_VERSION}"
+                    )
+            return snapshot
+        except Exception as e:
+            self._disabled_until = time.time() + self.RETRY_AFTER
+            logger.warning(f"Coletor remoto indisponível, usando comandos SSH por {self.RETRY_AFTER}s: {e}")
+            return None
+
+
+class CollectorSnapshot:
+    """
+    Snapshot do coletor remoto: estado do cluster (como ClusterSnapshot),
+    recursos da VM e métricas dos pods, todos do mesmo instante.
+    """
+
+    def __init__(self, data: Dict, k8s_service):
+        self.data = data
+        self.k8s_service = k8s_service
+        self.collected_at = data.get('collected_at', time.time())
+
+    def get_cluster_snapshot(self) -> ClusterSnapshot:
+        entry = self.data.get('kubectl', {}).get('cluster') or {}
+        if entry.get('rc') != 0 or entry.get('data') is None:
+            raise RemoteCollectorError(
+                f"Erro ao obter snapshot do cluster: {entry.get('stderr', 'ausente no snapshot')}"
+            )
+        # collected_at local (não o relógio da VM) para avaliar o frescor do snapshot;
+        # itens com os mesmos resourceVersions reaproveitam o snapshot anterior
+        return self.k8s_service.snapshot_from_list(entry['data'])
+
+    def get_vm_resources(self) -> Dict:
+        return vm_resources_from_snapshot(self.data.get('vm', {}))
+
+    def get_pod_resources(self, cluster: Optional[ClusterSnapshot]) -> List[Dict]:
+        top = self.data.get('top_pods', {})
+        pods_data = cluster.get_pods_document() if cluster is not None else None
+        return build_pod_resources(pods_data, top.get('rc', -1), top.get('stdout', ''), 'POD-SNAPSHOT')
@@ -0,0 +1,287 @@
+"""
+Identidade dos robôs: do nome de um job/pod/cronjob/deployment ou de uma chave
+das execuções ao robô cadastrado (RoboDockerizado).
+
+Concentra a limpeza de nomes que estava repetida no polling e nas views:
+prefixos ('rpa-cronjob-', 'deployment-', ...) e sufixos gerados pelo Kubernetes
+(hashes, timestamps) com padrões compilados uma vez e resultados em cache LRU,
+e a comparação por nome normalizado (sem espaços, '-' e '_', minúsculo).
+
+O RobotIdentityResolver mantém dois índices por nome normalizado:
+
+- robôs do banco local (uma lista por nome normalizado, já que robôs de tipos
+  diferentes podem colidir), refeito quando um RoboDockerizado é salvo ou
+  removido (signals conectados em connect_model_signals) ou quando a
+  quantidade/último updated_at do banco muda (conferida no máximo a cada
+  ROBOTS_CHECK_INTERVAL segundos, cobrindo alterações sem signals como
+  QuerySet.delete() ou outro processo);
+- chaves das execuções (dict {nome_robo: [execuções]} publicado pelo polling),
+  refeito só quando o dict de execuções é outro objeto (nova publicação).
+
+Assim as buscas por robô e por execuções são consultas diretas a dicts, em vez
+de percorrer todas as chaves normalizando cada uma.
+"""
+import logging
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Ordem importa: prefixos mais longos primeiro
+JOB_PREFIXES = ('rpa-cronjob-', 'rpa-job-', 'cronjob-', 'job-', 'rpa-')
+POD_PREFIXES = ('rpa-deployment-', 'deployment-', 'rpa-')
+RESOURCE_PREFIXES = ('rpa-cronjob-', 'cronjob-rpa-', 'rpa-', 'job-', 'deployment-')
+
+# Hash duplo do Kubernetes (ex: -w5mwl-tt5tw)
+_DOUBLE_HASH = re.compile(r'-[a-z0-9]{4,10}-[a-z0-9]{4,10}$')
+# Hash simples ou timestamp (ex: -1734567890, -abcde)
+_JOB_SUFFIX = re.compile(r'-[a-z0-9]+$')
+# Hash do pod (ex: -abc12)
+_POD_SUFFIX = re.compile(r'-[a-z0-9]{5,}$')
+# Índice numérico no fim do nome do cronjob (ex: -2)
+_CRONJOB_INDEX = re.compile(r'-\d+$')
+
+_NORMALIZE = str.maketrans('', '', ' -_')
+
+CACHE_SIZE = 4096
+
+# Intervalo mínimo (s) entre conferências da impressão digital dos robôs no banco
+ROBOTS_CHECK_INTERVAL = 5.0
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_name(nome: str) -> str:
+    """Nome do robô normalizado para comparação (sem espaços, '-' e '_', minúsculo)."""
+    return (nome or '').translate(_NORMALIZE).lower()
+
+
+def _strip_prefix(nome: str, prefixes: Tuple[str, ...]) -> str:
+    for prefix in prefixes:
+        if nome.startswith(prefix):
+            return nome[len(prefix):]
+    return nome
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def job_robot_name(job_name: str) -> str:
+    """Nome do robô a partir do nome do job (ex: 'rpa-job-meu-robo-w5mwl-tt5tw' -> 'meu-robo')."""
+    nome = _strip_prefix(job_name, JOB_PREFIXES)
+    nome = _DOUBLE_HASH.sub('', nome)
+    return _JOB_SUFFIX.sub('', nome)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def pod_robot_name(pod_name: str) -> str:
+    """Nome do robô a partir do nome do pod de um deployment (ex: 'deployment-meu-robo-abc12-xyz45')."""
+    nome = _strip_prefix(pod_name, POD_PREFIXES)
+    nome = _DOUBLE_HASH.sub('', nome)
+    return _POD_SUFFIX.sub('', nome)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def cronjob_robot_name(cronjob_name: str) -> str:
+    """Nome do robô a partir do nome do cronjob (ex: 'rpa-cronjob-meu-robo-2' -> 'meu-robo')."""
+    nome = cronjob_name.replace('rpa-cronjob-', '').replace('-cronjob', '')
+    return _CRONJOB_INDEX.sub('', nome)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def deployment_robot_name(deployment_name: str) -> str:
+    """Nome do robô a partir do nome do deployment (ex: 'deployment-meu-robo' -> 'meu-robo')."""
+    return deployment_name.replace('deployment-', '').replace('-deployment', '')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def extract_rpa_name(pod_name: str) -> str:
+    """
+    Extrai o nome do RPA do nome do pod.
+    Ex: 'rpa-att-infos-bitrix-abc123-xyz' -> 'att-infos-bitrix'
+    """
+    name = pod_name
+    lower = pod_name.lower()
+    for prefix in RESOURCE_PREFIXES:
+        if lower.startswith(prefix):
+            name = name[len(prefix):]
+            break
+
+    # Remover sufixos de hash (geralmente últimos 2 segmentos separados por -)
+    parts = name.split('-')
+    if len(parts) > 2:
+        # Verificar se os últimos segmentos parecem hashes (alfanuméricos de 5+ chars)
+        while len(parts) > 1 and len(parts[-1]) >= 5 and parts[-1].isalnum():
+            parts.pop()
+
+    return '-'.join(parts) if parts else pod_name
+
+
+class RobotIdentityResolver:
+    """Índices por nome normalizado dos robôs cadastrados e das chaves de execuções."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Robôs: {nome_normalizado: [registros]}, refeito quando _robots_dirty
+        # ou quando a impressão digital (quantidade, último updated_at) muda
+        self._robots: Optional[Dict[str, List[Dict]]] = None
+        self._robots_dirty = True
+        self._robots_fingerprint: Optional[tuple] = None
+        self._robots_checked_at = 0.0
+        self.robots_version = 0
+        # Execuções: o dict indexado e {nome_normalizado: (chaves...)}
+        self._exec_source: Optional[Mapping] = None
+        self._exec_index: Dict[str, Tuple[str, ...]] = {}
+
+    # Robôs cadastrados
+
+    def invalidate_robots(self):
+        """Marca o índice de robôs para ser refeito na próxima consulta."""
+        with self._lock:
+            self._robots_dirty = True
+            self.robots_version += 1
+
+    @staticmethod
+    def _load_fingerprint() -> tuple:
+        from django.db.models import Count, Max
+        from api.models import RoboDockerizado
+        stats = RoboDockerizado.objects.aggregate(total=Count('id'), updated=Max('updated_at'))
+        return stats['total'], stats['updated']
+
+    def _robot_index(self) -> Dict[str, List[Dict]]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._robots if not self._robots_dirty else None
+            if cached is not None and now - self._robots_checked_at < ROBOTS_CHECK_INTERVAL:
+                return cached
+            self._robots_checked_at = now
+            self._robots_dirty = False
+        try:
+            fingerprint = self._load_fingerprint()
+            if cached is not None and fingerprint == self._robots_fingerprint:
+                return cached
+            from api.models import RoboDockerizado
+            rows = list(RoboDockerizado.objects.values('nome', 'apelido', 'tipo', 'status', 'ativo'))
+        except Exception as e:
+            logger.debug(f"Não foi possível carregar os robôs do banco local: {e}")
+            with self._lock:
+                self._robots_dirty = True
+                return self._robots or {}
+        index = self._build_index(rows)
+        with self._lock:
+            if cached is not None:
+                self.robots_version += 1
+            self._robots = index
+            self._robots_fingerprint = fingerprint
+            return index
+
+    @staticmethod
+    def _build_index(rows: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """{nome_normalizado: [registros]}, com os robôs ativos primeiro em cada lista."""
+        index: Dict[str, List[Dict]] = {}
+        for row in rows:
+            index.setdefault(normalize_name(row['nome']), []).append(row)
+        for robots in index.values():
+            robots.sort(key=lambda row: not row['ativo'])
+        return index
+
+    @staticmethod
+    def _matches(robot: Dict, tipo: Optional[str], active: bool, enabled: bool = False) -> bool:
+        if tipo is not None and robot['tipo'] != tipo:
+            return False
+        if enabled and not robot['ativo']:
+            return False
+        return not active or (robot['ativo'] and robot['status'] == 'active')
+
+    def robot(self, nome: str, tipo: Optional[str] = None, active: bool = False,
+              enabled: bool = False) -> Optional[Dict]:
+        """
+        Robô cadastrado (nome, apelido, tipo, status, ativo) com o mesmo nome
+        normalizado. Com vários candidatos: o de nome exato, senão o primeiro
+        ativo, senão o primeiro cadastrado.
+
+        active: só robôs com ativo=True e status 'active'.
+        enabled: só robôs com ativo=True (qualquer status); um inativo com o
+            nome exato não esconde um ativo com o mesmo nome normalizado.
+        """
+        if not nome:
+            return None
+        candidates = [
+            robot for robot in self._robot_index().get(normalize_name(nome), ())
+            if self._matches(robot, tipo, active, enabled)
+        ]
+        for robot in candidates:
+            if robot['nome'] == nome:
+                return robot
+        return candidates[0] if candidates else None
+
+    def canonical_name(self, nome: str, tipo: Optional[str] = None, active: bool = False) -> Optional[str]:
+        """Nome cadastrado do robô (caixa e separadores do banco), ou None."""
+        robot = self.robot(nome, tipo=tipo, active=active)
+        return robot['nome'] if robot else None
+
+    def robot_names(self, tipo: Optional[str] = None, active: bool = False) -> Set[str]:
+        """Nomes cadastrados (opcionalmente de um tipo / apenas ativos)."""
+        return {
+            robot['nome'] for robots in self._robot_index().values() for robot in robots
+            if self._matches(robot, tipo, active)
+        }
+
+    # Chaves das execuções
+
+    def _execution_index(self, exec_cache: Mapping) -> Dict[str, Tuple[str, ...]]:
+        with self._lock:
+            if exec_cache is self._exec_source:
+                return self._exec_index
+        index: Dict[str, List[str]] = {}
+        for nome_db in exec_cache.keys():
+            index.setdefault(normalize_name(nome_db), []).append(nome_db)
+        frozen = {key: tuple(names) for key, names in index.items()}
+        with self._lock:
+            self._exec_source = exec_cache
+            self._exec_index = frozen
+        return frozen
+
+    def execution_keys(self, nome: str, exec_cache: Mapping) -> Tuple[str, ...]:
+        """Chaves de exec_cache com o mesmo nome normalizado (na ordem do dict)."""
+        if not nome or not isinstance(exec_cache, Mapping):
+            return ()
+        return self._execution_index(exec_cache).get(normalize_name(nome), ())
+
+    def executions_for(self, nome: str, exec_cache: Mapping) -> List[Dict]:
+        """Execuções do robô: chave exata ou, senão, a primeira com o mesmo nome normalizado."""
+        if not nome or not isinstance(exec_cache, Mapping):
+            return []
+        execucoes = exec_cache.get(nome)
+        if execucoes:
+            return execucoes
+        keys = self.execution_keys(nome, exec_cache)
+        return (exec_cache[keys[0]] or []) if keys else []
+
+    def count_executions(self, nome: str, exec_cache: Mapping) -> int:
+        return len(self.executions_for(nome, exec_cache))
+
+
+_resolver: Optional[RobotIdentityResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_robot_resolver() -> RobotIdentityResolver:
+    """Resolver compartilhado pelo polling e pelas views."""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = RobotIdentityResolver()
+    return _resolver
+
+
+def _on_robot_changed(sender, **kwargs):
+    get_robot_resolver().invalidate_robots()
+
+
+def connect_model_signals():
+    """Refaz o índice de robôs quando um RoboDockerizado é salvo ou removido."""
+    from django.db.models.signals import post_delete, post_save
+    post_save.connect(_on_robot_changed, sender='api.RoboDockerizado', dispatch_uid='robot_identity_save')
+    post_delete.connect(_on_robot_changed, sender='api.RoboDockerizado', dispatch_uid='robot_identity_delete')
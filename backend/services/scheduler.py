@@ -0,0 +1,242 @@
+"""
+Agendador dos coletores e tarefas em background.
+
+Substitui os laços `while self._running` do PollingService e do WatcherService:
+cada tarefa (jobs/pods do cluster, cronjobs, deployments, VM, execuções, watcher,
+pods com falha, limpeza) é registrada com o próprio intervalo, jitter e prazo.
+Uma thread despachante dispara as tarefas vencidas num pool limitado:
+
+- intervalo fixo ou função (intervalos adaptativos / heartbeat sem clientes),
+  contado a partir do início da execução anterior;
+- jitter: fração aleatória do intervalo, para que tarefas com o mesmo período
+  não disparem comandos SSH sempre juntas;
+- prazo (deadline): execução mais longa conta como estouro e é registrada no log
+  (a thread não é interrompida);
+- uma tarefa ainda em execução quando vence de novo não é empilhada: a rodada é
+  pulada e contada;
+- wake() antecipa a próxima execução (mudança no cache, cliente voltando),
+  respeitando o intervalo mínimo da tarefa.
+
+stats() expõe, por tarefa, execuções, falhas, pulos, estouros e tempos.
+"""
+import heapq
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Interval = Union[float, Callable[[], float]]
+
+
+class ScheduledTask:
+    """Tarefa registrada no Scheduler e suas estatísticas."""
+
+    def __init__(self, name: str, func: Callable[[], None], interval: Interval, jitter: float = 0.1,
+                 deadline: Optional[float] = None, min_interval: float = 0.0):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.deadline = deadline
+        self.min_interval = min_interval
+        self.running = False
+        self.rerun = False
+        self.next_run = 0.0
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_delay = 0.0
+        self.last_error: Optional[str] = None
+
+    def current_interval(self) -> float:
+        interval = self.interval() if callable(self.interval) else self.interval
+        return max(0.0, float(interval))
+
+    def delay(self) -> float:
+        """Próximo intervalo, com jitter."""
+        interval = self.current_interval()
+        if self.jitter:
+            interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(self.min_interval, interval)
+
+    def to_dict(self) -> Dict:
+        now = time.time()
+        return {
+            'interval': round(self.current_interval(), 3),
+            'deadline': self.deadline,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'overruns': self.overruns,
+            'last_started': self.last_started,
+            'last_duration': round(self.last_duration, 3) if self.last_duration is not None else None,
+            'avg_duration': round(self.total_duration / self.runs, 3) if self.runs else None,
+            'max_duration': round(self.max_duration, 3),
+            # Atraso entre o horário previsto e o início efetivo (pool ocupado)
+            'last_delay': round(self.last_delay, 3),
+            'next_run_in': round(max(0.0, self.next_run - now), 3),
+            'last_error': self.last_error,
+        }
+
+
+class Scheduler:
+    """Despacha as tarefas registradas em um pool de threads limitado."""
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._tasks: Dict[str, ScheduledTask] = {}
+        self._heap: List = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def register(self, name: str, func: Callable[[], None], interval: Interval, *, jitter: float = 0.1,
+                 deadline: Optional[float] = None, min_interval: float = 0.0,
+                 initial_delay: float = 0.0) -> ScheduledTask:
+        """Registra (ou substitui) uma tarefa; a primeira execução ocorre após initial_delay."""
+        task = ScheduledTask(name, func, interval, jitter=jitter, deadline=deadline, min_interval=min_interval)
+        with self._lock:
+            self._tasks[name] = task
+            self._push(task, time.time() + initial_delay)
+            self._changed.notify()
+        return task
+
+    def unregister(self, *names: str):
+        with self._lock:
+            for name in names:
+                self._tasks.pop(name, None)
+
+    def _push(self, task: ScheduledTask, when: float):
+        # Entradas antigas da mesma tarefa ficam no heap e são descartadas ao sair (next_run diferente)
+        task.next_run = when
+        self._sequence += 1
+        heapq.heappush(self._heap, (when, self._sequence, task))
+
+    def wake(self, *names: str):
+        """Antecipa a próxima execução das tarefas (respeitando min_interval)."""
+        now = time.time()
+        with self._lock:
+            for name in names:
+                task = self._tasks.get(name)
+                if task is None:
+                    continue
+                if task.running:
+                    # Mudança chegou durante a execução: roda de novo ao terminar
+                    task.rerun = True
+                    continue
+                when = max(now, (task.last_started or 0.0) + task.min_interval)
+                if when < task.next_run:
+                    self._push(task, when)
+            self._changed.notify()
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scheduler')
+            self._thread = threading.Thread(target=self._dispatch_loop, name='scheduler', daemon=True)
+            self._thread.start()
+        logger.info(f"Scheduler iniciado ({self.max_workers} workers)")
+
+    def stop(self):
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            self._changed.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._executor:
+            # Tarefas presas em SSH não seguram o desligamento
+            self._executor.shutdown(wait=False)
+        logger.info("Scheduler parado")
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def _dispatch_loop(self):
+        with self._lock:
+            while self._running:
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    when, _, task = heapq.heappop(self._heap)
+                    if self._tasks.get(task.name) is not task or when != task.next_run:
+                        continue  # tarefa removida/substituída ou entrada antiga
+                    self._dispatch(task, when, now)
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._changed.wait(timeout)
+
+    def _dispatch(self, task: ScheduledTask, when: float, now: float):
+        """Com o lock: dispara a tarefa no pool (ou pula a rodada se ainda estiver rodando)."""
+        if task.running:
+            task.skipped += 1
+            logger.debug(f"Tarefa '{task.name}' ainda em execução, rodada pulada")
+        else:
+            task.running = True
+            task.last_delay = now - when
+            self._executor.submit(self._run, task)
+        self._push(task, now + task.delay())
+
+    def _run(self, task: ScheduledTask):
+        started = time.time()
+        with self._lock:
+            task.last_started = started
+        error = None
+        try:
+            task.func()
+        except Exception as e:
+            error = str(e)
+            logger.warning(f"Erro na tarefa '{task.name}': {e}")
+        duration = time.time() - started
+        with self._lock:
+            task.running = False
+            task.runs += 1
+            task.last_duration = duration
+            task.total_duration += duration
+            task.max_duration = max(task.max_duration, duration)
+            task.last_error = error
+            if error:
+                task.failures += 1
+            overrun = task.deadline is not None and duration > task.deadline
+            if overrun:
+                task.overruns += 1
+            # Intervalo contado do início: tarefa longa que já venceu roda de novo assim que possível
+            delay = task.min_interval if task.rerun else task.delay()
+            task.rerun = False
+            self._push(task, max(time.time(), started + delay))
+            self._changed.notify()
+        if overrun:
+            logger.warning(f"Tarefa '{task.name}' levou {duration:.1f}s (prazo {task.deadline:.0f}s)")
+
+    def stats(self) -> Dict[str, Dict]:
+        """Tempos e contadores de cada tarefa."""
+        with self._lock:
+            return {name: task.to_dict() for name, task in sorted(self._tasks.items())}
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """Scheduler compartilhado pelos serviços em background."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = Scheduler()
+    return _scheduler
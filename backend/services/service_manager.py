@@ -9,6 +9,7 @@ from typing import Optional
 from services.ssh_service import SSHService
 from services.database_service import DatabaseService
 from services.kubernetes_service import KubernetesService
+from services.kubernetes_api_service import create_kubernetes_service
 from services.file_service import FileService
 
 logger = logging.getLogger(__name__)
@@ -108,7 +109,7 @@ def initialize_services():
             # Criar serviços dependentes (já usam as conexões estabelecidas)
             try:
                 if _ssh_service is not None:
-                    _k8s_service = KubernetesService(ssh_service=_ssh_service)
+                    _k8s_service = create_kubernetes_service(_ssh_service)
                     _file_service = FileService(ssh_service=_ssh_service)
                 else:
                     logger.warning("⚠ SSHService não disponível, serviços dependentes não serão criados")
@@ -164,7 +165,7 @@ def get_kubernetes_service() -> KubernetesService:
         with _lock:
             if _k8s_service is None:
                 # Reutilizar ssh_service singleton
-                _k8s_service = KubernetesService(ssh_service=get_ssh_service())
+                _k8s_service = create_kubernetes_service(get_ssh_service())
     return _k8s_service
 
 
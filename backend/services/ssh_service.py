@@ -1,31 +1,165 @@
 import paramiko
 import logging
+import socket
 import threading
-from typing import Optional, Tuple
+import time
+import uuid
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from contextlib import contextmanager
 from config.ssh_config import get_ssh_config
 
 logger = logging.getLogger(__name__)
 
+
+class _PooledConnection:
+    """Conexão SSH do pool com estatísticas de uso por Transport."""
+    
+    # Conexões ociosas há mais que isso recebem um probe antes do checkout
+    PROBE_AFTER_IDLE = 30.0
+    
+    def __init__(self, client: paramiko.SSHClient, index: int):
+        self.client = client
+        self.index = index
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.in_flight = 0
+        self.checkouts = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+    
+    def is_healthy(self) -> bool:
+        """Verifica se o Transport está ativo (com probe se estiver ocioso)."""
+        try:
+            transport = self.client.get_transport()
+            if not transport or not transport.is_active():
+                return False
+            if self.in_flight == 0 and time.time() - self.last_used > self.PROBE_AFTER_IDLE:
+                # send_ignore falha rapidamente se o socket já estiver quebrado
+                transport.send_ignore()
+            return True
+        except Exception:
+            return False
+    
+    def close(self):
+        try:
+            self.client.close()
+        except:
+            pass
+    
+    def stats(self) -> Dict:
+        return {
+            'index': self.index,
+            'in_flight': self.in_flight,
+            'checkouts': self.checkouts,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'age_seconds': round(time.time() - self.created_at, 1),
+            'idle_seconds': round(time.time() - self.last_used, 1),
+        }
+
+
+class CommandStream:
+    """
+    Iterador sobre os chunks de stdout (bytes) de um comando remoto em execução.
+    
+    O stderr é lido em paralelo e, junto com o return_code, fica disponível
+    depois que o stdout for consumido até o fim.
+    """
+    
+    def __init__(self, chunks: Iterator[bytes]):
+        self.return_code: Optional[int] = None
+        self.stderr: bytes = b''
+        self.bytes_received = 0
+        self._chunks = chunks
+        # Fecha o canal subjacente; definido quando o canal é aberto
+        self._cancel: Optional[Callable[[], None]] = None
+        self.cancelled = False
+    
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            self.bytes_received += len(chunk)
+            yield chunk
+    
+    def read_all(self) -> bytes:
+        """Consome o stdout inteiro e o retorna como bytes."""
+        return b''.join(self)
+    
+    @property
+    def stderr_text(self) -> str:
+        return self.stderr.decode('utf-8', errors='replace')
+    
+    def close(self):
+        """Interrompe o comando (fecha o canal) se o stdout não for consumido até o fim."""
+        self._chunks.close()
+    
+    def cancel(self):
+        """
+        Interrompe o comando a partir de outra thread (close() só pode ser chamado
+        pela thread que consome o stream): fecha o canal, e a leitura bloqueada
+        termina como fim de saída.
+        """
+        self.cancelled = True
+        cancel = self._cancel
+        if cancel is not None:
+            try:
+                cancel()
+            except Exception:
+                pass
+
+
 class SSHService:
-    """Serviço para gerenciar conexões SSH e executar comandos remotos."""
+    """
+    Serviço para gerenciar conexões SSH e executar comandos remotos.
+    
+    Mantém um pool de pool_size Transports autenticados (config.ini). Cada
+    comando faz checkout da conexão saudável menos ocupada e abre um canal
+    próprio nela; conexões mortas são descartadas e substituídas em background.
+    """
     
     def __init__(self, auto_connect: bool = False):
         self.config = get_ssh_config()
-        self._client: Optional[paramiko.SSHClient] = None
         self._sftp: Optional[paramiko.SFTPClient] = None
+        self._sftp_owner: Optional[_PooledConnection] = None
+        # O lock protege apenas a lista de conexões e conexão/reconexão; os comandos
+        # abrem canais próprios nos Transports e rodam em paralelo
         self._lock = threading.RLock()  # RLock para permitir reentrância
+        self._connections: List[_PooledConnection] = []
+        self._next_index = 0
+        self._warming = 0
+        self._compression_stats = {'commands': 0, 'wire_bytes': 0, 'raw_bytes': 0}
+        # gzip ausente ou com falha na VM: saídas voltam a trafegar sem compressão
+        self._gzip_failed = False
+        self._apply_limits()
         # Conectar automaticamente se solicitado (usado na inicialização)
         if auto_connect:
             try:
                 self._ensure_client()
+                self._warm_pool()
             except Exception as e:
                 logger.warning(f"Não foi possível conectar SSH na inicialização: {e}")
     
+    def _apply_limits(self):
+        """Aplica pool_size e max_channels (por Transport) a partir da configuração."""
+        self._pool_size = max(1, int(self.config.get('pool_size', 2)))
+        self._max_channels = max(1, int(self.config.get('max_channels', 8)))
+        # Canais em andamento liberam o semáforo antigo (referência local em execute_command)
+        self._channel_semaphore = threading.BoundedSemaphore(self._pool_size * self._max_channels)
+        self.compression = self.config.get('compression', 'none')
+        if self.compression not in ('none', 'ssh', 'gzip'):
+            logger.warning(f"Modo de compressão SSH desconhecido '{self.compression}', usando 'none'")
+            self.compression = 'none'
+    
+    @property
+    def compress_output(self) -> bool:
+        """Se saídas grandes (ex: kubectl -o json) devem trafegar comprimidas com gzip."""
+        return self.compression == 'gzip' and not self._gzip_failed
+    
     def reload_config(self):
         """Recarrega as configurações SSH do arquivo e fecha conexões antigas."""
         with self._lock:
             self.config = get_ssh_config()
+            self._apply_limits()
             # Fechar conexões existentes
             if self._sftp:
                 try:
@@ -33,83 +167,179 @@ class SSHService:
                 except:
                     pass
                 self._sftp = None
-            if self._client:
-                try:
-                    self._client.close()
-                except:
-                    pass
-                self._client = None
+                self._sftp_owner = None
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
             logger.info("Configurações SSH recarregadas, conexões antigas fechadas")
     
-    def _ensure_client(self) -> paramiko.SSHClient:
-        """Garante que existe uma conexão SSH ativa, cria ou reconecta se necessário."""
-        # Verificação rápida sem lock primeiro
-        if self._client is not None:
+    def _connect(self) -> paramiko.SSHClient:
+        """Abre e autentica um novo cliente SSH."""
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        
+        try:
+            if self.config['use_key'] and self.config.get('key_path'):
+                # Conectar usando chave SSH
+                key_path = self.config['key_path']
+                client.connect(
+                    hostname=self.config['host'],
+                    port=self.config['port'],
+                    username=self.config['username'],
+                    key_filename=key_path,
+                    look_for_keys=False,  # Não procurar chaves padrão
+                    allow_agent=False,  # Não usar agente SSH
+                    timeout=10,
+                    compress=self.compression == 'ssh'
+                )
+            elif self.config.get('password'):
+                # Conectar usando senha
+                client.connect(
+                    hostname=self.config['host'],
+                    port=self.config['port'],
+                    username=self.config['username'],
+                    password=self.config['password'],
+                    look_for_keys=False,  # Não procurar chaves padrão
+                    allow_agent=False,  # Não usar agente SSH
+                    timeout=10,
+                    compress=self.compression == 'ssh'
+                )
+            else:
+                raise ValueError("É necessário fornecer chave SSH ou senha")
+        except Exception:
             try:
-                # Verificar se o transporte ainda está ativo (sem lock para ser rápido)
-                transport = self._client.get_transport()
-                if transport and transport.is_active():
-                    return self._client
+                client.close()
             except:
                 pass
+            raise
         
-        # Se chegou aqui, precisa verificar/criar com lock
+        transport = client.get_transport()
+        if transport:
+            transport.set_keepalive(30)
+        return client
+    
+    def _add_connection(self, client: paramiko.SSHClient) -> _PooledConnection:
         with self._lock:
-            # Verificar novamente dentro do lock (double-check pattern)
-            if self._client is not None:
-                try:
-                    transport = self._client.get_transport()
-                    if transport and transport.is_active():
-                        return self._client
-                    else:
-                        # Conexão morreu, fechar e recriar
-                        try:
-                            self._client.close()
-                        except:
-                            pass
-                        self._client = None
-                except:
-                    # Erro ao verificar, assumir que está morta
-                    self._client = None
+            conn = _PooledConnection(client, self._next_index)
+            self._next_index += 1
+            self._connections.append(conn)
+            return conn
+    
+    def _prune_unhealthy(self) -> int:
+        """Remove conexões mortas do pool (chamar com lock). Retorna quantas saíram."""
+        alive = []
+        removed = 0
+        for conn in self._connections:
+            if conn.is_healthy():
+                alive.append(conn)
+            else:
+                logger.warning(f"Conexão SSH #{conn.index} do pool não está saudável, descartando")
+                conn.close()
+                removed += 1
+        self._connections = alive
+        return removed
+    
+    def _warm_pool(self):
+        """Completa o pool em background até pool_size conexões."""
+        with self._lock:
+            missing = self._pool_size - len(self._connections) - self._warming
+            if missing <= 0:
+                return
+            self._warming += missing
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, daemon=True).start()
+    
+    def _warm_one(self):
+        try:
+            client = self._connect()
+            conn = self._add_connection(client)
+            logger.info(f"Conexão SSH #{conn.index} aquecida e adicionada ao pool")
+        except Exception as e:
+            logger.warning(f"Erro ao aquecer conexão SSH do pool: {e}")
+        finally:
+            with self._lock:
+                self._warming -= 1
+    
+    def _select_connection(self) -> _PooledConnection:
+        """Escolhe a conexão saudável menos ocupada, conectando se o pool estiver vazio."""
+        with self._lock:
+            self._prune_unhealthy()
+            if self._connections:
+                if len(self._connections) + self._warming < self._pool_size:
+                    self._warm_pool()
+                return min(self._connections, key=lambda c: (c.in_flight, c.last_used))
             
-            # Criar nova conexão
+            # Pool vazio: conectar de forma síncrona (demais threads aguardam este connect)
             logger.info("Criando nova conexão SSH persistente...")
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
             try:
-                if self.config['use_key'] and self.config.get('key_path'):
-                    # Conectar usando chave SSH
-                    key_path = self.config['key_path']
-                    client.connect(
-                        hostname=self.config['host'],
-                        port=self.config['port'],
-                        username=self.config['username'],
-                        key_filename=key_path,
-                        look_for_keys=False,  # Não procurar chaves padrão
-                        allow_agent=False,  # Não usar agente SSH
-                        timeout=10
-                    )
-                elif self.config.get('password'):
-                    # Conectar usando senha
-                    client.connect(
-                        hostname=self.config['host'],
-                        port=self.config['port'],
-                        username=self.config['username'],
-                        password=self.config['password'],
-                        look_for_keys=False,  # Não procurar chaves padrão
-                        allow_agent=False,  # Não usar agente SSH
-                        timeout=10
-                    )
-                else:
-                    raise ValueError("É necessário fornecer chave SSH ou senha")
-                
-                self._client = client
-                logger.info("Conexão SSH persistente estabelecida")
-                return self._client
+                client = self._connect()
             except Exception as e:
                 logger.error(f"Erro ao conectar SSH: {e}")
                 raise
+            conn = self._add_connection(client)
+            logger.info("Conexão SSH persistente estabelecida")
+            self._warm_pool()
+            return conn
+    
+    def _acquire(self) -> Tuple[_PooledConnection, float]:
+        """Faz checkout de uma conexão do pool; devolver com _release."""
+        conn = self._select_connection()
+        with self._lock:
+            conn.in_flight += 1
+            conn.checkouts += 1
+        return conn, time.time()
+    
+    def _release(self, conn: _PooledConnection, started: float, failed: bool = False):
+        with self._lock:
+            conn.in_flight -= 1
+            conn.last_used = time.time()
+            conn.busy_seconds += conn.last_used - started
+            if failed:
+                conn.errors += 1
+    
+    @contextmanager
+    def _checkout(self):
+        """Reserva uma conexão do pool durante a execução de um comando."""
+        conn, started = self._acquire()
+        failed = False
+        try:
+            yield conn
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(conn, started, failed)
+    
+    def _discard_connection(self, conn: _PooledConnection):
+        """Descarta uma conexão morta e aquece uma substituta em background."""
+        with self._lock:
+            if conn not in self._connections:
+                return
+            self._connections.remove(conn)
+            conn.close()
+            if self._sftp_owner is conn:
+                self._sftp = None
+                self._sftp_owner = None
+        self._warm_pool()
+    
+    def _ensure_client(self) -> paramiko.SSHClient:
+        """Garante que existe uma conexão SSH ativa no pool e a retorna."""
+        return self._select_connection().client
+    
+    def get_pool_stats(self) -> List[Dict]:
+        """Retorna estatísticas de uso de cada Transport do pool."""
+        with self._lock:
+            return [conn.stats() for conn in self._connections]
+    
+    def get_compression_stats(self) -> Dict:
+        """Retorna o modo de compressão e os bytes economizados nas saídas comprimidas com gzip."""
+        with self._lock:
+            stats = dict(self._compression_stats)
+        stats['mode'] = self.compression
+        stats['gzip_failed'] = self._gzip_failed
+        stats['bytes_saved'] = stats['raw_bytes'] - stats['wire_bytes']
+        stats['ratio'] = round(stats['wire_bytes'] / stats['raw_bytes'], 3) if stats['raw_bytes'] else None
+        return stats
     
     def _ensure_sftp(self) -> paramiko.SFTPClient:
         """Garante que existe uma conexão SFTP ativa."""
@@ -136,12 +366,13 @@ class SSHService:
                     except:
                         pass
                     self._sftp = None
+                    self._sftp_owner = None
             
-            # Criar novo SFTP a partir da conexão SSH persistente
-            # _ensure_client já gerencia o lock internamente
-            client = self._ensure_client()
+            # Criar novo SFTP a partir de uma conexão saudável do pool
+            conn = self._select_connection()
             try:
-                self._sftp = client.open_sftp()
+                self._sftp = conn.client.open_sftp()
+                self._sftp_owner = conn
                 logger.debug("Conexão SFTP persistente estabelecida")
                 return self._sftp
             except Exception as e:
@@ -154,10 +385,10 @@ class SSHService:
     
     @contextmanager
     def get_connection(self):
-        """Context manager para obter conexão SSH (reutiliza conexão persistente)."""
+        """Context manager para obter conexão SSH (reutiliza conexão do pool)."""
         # Usar conexão persistente, não fechar ao sair
-        client = self._ensure_client()
-        yield client
+        with self._checkout() as conn:
+            yield conn.client
         # Não fechar - manter conexão persistente
     
     @contextmanager
@@ -168,50 +399,324 @@ class SSHService:
         yield sftp
         # Não fechar - manter conexão persistente
     
+    # Intervalo máximo entre verificações de stderr/deadline enquanto o stdout está parado
+    _STREAM_POLL_INTERVAL = 0.5
+    
+    def _open_channel(self, conn: _PooledConnection, command: str, timeout: Optional[float]) -> paramiko.Channel:
+        """Abre um canal exec no Transport da conexão."""
+        transport = conn.client.get_transport()
+        if transport is None or not transport.is_active():
+            raise paramiko.SSHException("SSH session not active (transport)")
+        channel = transport.open_session(timeout=timeout)
+        channel.settimeout(self._STREAM_POLL_INTERVAL)
+        channel.exec_command(command)
+        return channel
+    
+    def _start_command(self, command: str, timeout: Optional[float]) -> Tuple[_PooledConnection, float, paramiko.Channel]:
+        """Faz checkout e abre o canal do comando, tentando outra conexão se a primeira estiver morta."""
+        conn, started = self._acquire()
+        try:
+            return conn, started, self._open_channel(conn, command, timeout)
+        except Exception as e:
+            self._release(conn, started, failed=True)
+            logger.error(f"Erro ao executar comando SSH: {e}")
+            if "not connected" not in str(e).lower() and "transport" not in str(e).lower():
+                raise
+            # Se a conexão morreu, descartar e tentar novamente uma vez em outra conexão do pool
+            self._discard_connection(conn)
+        
+        conn, started = self._acquire()
+        try:
+            return conn, started, self._open_channel(conn, command, timeout)
+        except Exception as retry_error:
+            self._release(conn, started, failed=True)
+            logger.error(f"Erro ao tentar novamente: {retry_error}")
+            raise
+    
+    def _stream_chunks(self, command: str, timeout: Optional[float], chunk_size: int,
+                       stream: CommandStream) -> Iterator[bytes]:
+        """Gera os chunks de stdout mantendo o checkout e o semáforo até o fim do comando."""
+        semaphore = self._channel_semaphore
+        if not semaphore.acquire(timeout=timeout):
+            raise TimeoutError(
+                f"Limite de canais SSH simultâneos atingido; "
+                f"comando não iniciado após {timeout}s"
+            )
+        try:
+            deadline = time.time() + timeout if timeout else None
+            conn, started, channel = self._start_command(command, timeout)
+            stream._cancel = channel.close
+            if stream.cancelled:
+                channel.close()
+            failed = True
+            stderr_chunks = []
+            
+            def check_deadline():
+                if deadline and time.time() > deadline:
+                    raise socket.timeout(f"Comando SSH excedeu o timeout de {timeout}s")
+            
+            try:
+                while True:
+                    while channel.recv_stderr_ready():
+                        stderr_chunks.append(channel.recv_stderr(chunk_size))
+                    try:
+                        data = channel.recv(chunk_size)
+                    except socket.timeout:
+                        check_deadline()
+                        continue
+                    if not data:
+                        break  # EOF do stdout
+                    yield data
+                
+                # Drenar o restante do stderr e obter o código de saída
+                while True:
+                    try:
+                        data = channel.recv_stderr(chunk_size)
+                    except socket.timeout:
+                        check_deadline()
+                        continue
+                    if not data:
+                        break
+                    stderr_chunks.append(data)
+                stream.return_code = channel.recv_exit_status()
+                stream.stderr = b''.join(stderr_chunks)
+                failed = False
+            except GeneratorExit:
+                # Consumidor interrompeu a leitura (close()); não é erro da conexão
+                failed = False
+                raise
+            finally:
+                try:
+                    channel.close()
+                except:
+                    pass
+                self._release(conn, started, failed)
+        finally:
+            semaphore.release()
+    
+    # Linha final do stderr com o código de saída do comando quando o stdout passa pelo gzip
+    _GZIP_RC_MARKER = b'\n__DW_RC__='
+    
+    def _wrap_gzip(self, command: str) -> str:
+        """Envolve o comando para que o stdout saia comprimido (gzip -1) preservando o código de saída."""
+        return f"{{ (\n{command}\n); printf '\\n__DW_RC__=%s\\n' \"$?\" >&2; }} | gzip -1"
+    
+    def _gunzip_chunks(self, command: str, timeout: Optional[float], chunk_size: int,
+                       stream: CommandStream) -> Iterator[bytes]:
+        """
+        Executa o comando com o stdout comprimido, descomprime em streaming e
+        restaura o código de saída do comando original.
+        
+        Se o gzip falhar na VM (código do canal diferente de 0, nenhum byte
+        comprimido ou stream truncado), a compressão é desligada: sem dados
+        entregues o comando é repetido sem compressão; com dados parciais o
+        comando falha (o consumidor já recebeu parte da saída).
+        """
+        chunks = self._stream_chunks(self._wrap_gzip(command), timeout, chunk_size, stream)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        wire_bytes = 0
+        raw_bytes = 0
+        problem = None
+        try:
+            for chunk in chunks:
+                wire_bytes += len(chunk)
+                try:
+                    data = decompressor.decompress(chunk)
+                except zlib.error as e:
+                    problem = f"saída gzip inválida ({e})"
+                    break
+                if data:
+                    raw_bytes += len(data)
+                    yield data
+            else:
+                data = decompressor.flush()
+                if data:
+                    raw_bytes += len(data)
+                    yield data
+        finally:
+            chunks.close()
+        
+        # O código do canal é o do gzip; o do comando vem no fim do stderr
+        gzip_rc = stream.return_code
+        marker_pos = stream.stderr.rfind(self._GZIP_RC_MARKER)
+        if marker_pos >= 0:
+            try:
+                stream.return_code = int(stream.stderr[marker_pos + len(self._GZIP_RC_MARKER):].strip())
+            except ValueError:
+                pass
+            stream.stderr = stream.stderr[:marker_pos]
+        
+        if problem is None:
+            if gzip_rc != 0:
+                problem = f"gzip terminou com código {gzip_rc}"
+            elif not wire_bytes:
+                problem = "nenhum byte comprimido recebido"
+            elif not decompressor.eof:
+                problem = "stream gzip truncado"
+        if problem is not None:
+            self._gzip_failed = True
+            logger.warning(f"Compressão gzip falhou na VM ({problem}): saídas seguirão sem compressão")
+            if raw_bytes == 0:
+                stream.return_code = None
+                stream.stderr = b''
+                yield from self._stream_chunks(command, timeout, chunk_size, stream)
+            else:
+                stream.return_code = gzip_rc or -1
+                stream.stderr += f"\n{problem}".encode('utf-8')
+            return
+        
+        with self._lock:
+            self._compression_stats['commands'] += 1
+            self._compression_stats['wire_bytes'] += wire_bytes
+            self._compression_stats['raw_bytes'] += raw_bytes
+        logger.debug(f"Saída comprimida: {wire_bytes} bytes trafegados para {raw_bytes} bytes descomprimidos")
+    
+    def execute_command_stream(self, command: str, timeout: Optional[float] = 30,
+                               chunk_size: int = 65536, compress: bool = False) -> CommandStream:
+        """
+        Executa um comando remoto entregando o stdout em chunks de bytes à medida que chega.
+        
+        O stdout é lido continuamente (sem esperar o fim do comando), então saídas
+        maiores que a janela do canal SSH não travam o comando. O stderr é lido em
+        paralelo. timeout é o tempo total do comando (None = sem limite).
+        
+        Com compress=True o stdout trafega comprimido (gzip -1 no remoto) e é
+        descomprimido localmente à medida que chega; se o gzip falhar na VM, a
+        saída volta a trafegar sem compressão (ver _gunzip_chunks).
+        
+        Returns:
+            CommandStream: iterável de bytes; return_code/stderr ficam disponíveis ao final
+        """
+        stream = CommandStream(iter(()))
+        if compress and not self._gzip_failed:
+            stream._chunks = self._gunzip_chunks(command, timeout, chunk_size, stream)
+        else:
+            stream._chunks = self._stream_chunks(command, timeout, chunk_size, stream)
+        return stream
+    
     def execute_command(self, command: str, timeout: int = 30) -> Tuple[int, str, str]:
         """
         Executa um comando no servidor remoto via SSH.
-        Usa conexão persistente com lock para serializar comandos (paramiko não é thread-safe).
+        Cada comando faz checkout da conexão menos ocupada do pool e abre um canal
+        próprio nela, permitindo vários comandos simultâneos. O número de canais
+        em andamento é limitado por max_channels por Transport (config.ini).
+        Construído sobre execute_command_stream.
         
         Returns:
             Tuple[int, str, str]: (return_code, stdout, stderr)
         """
-        # Usar lock durante toda a execução para serializar comandos SSH
-        # (paramiko não é thread-safe para múltiplos comandos simultâneos)
-        with self._lock:
+        stream = self.execute_command_stream(command, timeout=timeout)
+        stdout = stream.read_all()
+        return stream.return_code, stdout.decode('utf-8'), stream.stderr_text
+    
+    def _build_batch_script(self, commands: List[str], token: str) -> str:
+        """Monta um script remoto que executa os comandos em sequência com delimitadores."""
+        lines = ['__dw_err=$(mktemp) || exit 1']
+        for i, command in enumerate(commands):
+            marker = f'__DW_{token}_{i}'
+            lines.extend([
+                f"printf '%s\\n' '{marker}_OUT__'",
+                # Subshell isola exit/cd de cada comando; stderr vai para arquivo temporário
+                f'(\n{command}\n) 2>"$__dw_err" </dev/null',
+                '__dw_rc=$?',
+                f'printf \'\\n%s\\n\' "{marker}_RC_${{__dw_rc}}__"',
+                'cat "$__dw_err"',
+                f"printf '\\n%s\\n' '{marker}_END__'",
+            ])
+        lines.append('rm -f "$__dw_err"')
+        return '\n'.join(lines)
+    
+    def _parse_batch_output(self, output: bytes, count: int, token: str) -> List[Tuple[int, bytes, bytes]]:
+        """Separa a saída do script em lote em (return_code, stdout, stderr) por comando."""
+        results = []
+        pos = 0
+        for i in range(count):
+            marker = f'__DW_{token}_{i}'.encode()
+            out_marker = marker + b'_OUT__\n'
+            rc_marker = b'\n' + marker + b'_RC_'
+            end_marker = b'\n' + marker + b'_END__\n'
+            
+            start = output.find(out_marker, pos)
+            rc_start = output.find(rc_marker, start) if start >= 0 else -1
+            rc_end = output.find(b'__\n', rc_start + len(rc_marker)) if rc_start >= 0 else -1
+            end = output.find(end_marker, rc_end) if rc_end >= 0 else -1
+            if end < 0:
+                # Script interrompido (timeout/queda de conexão) antes deste comando terminar
+                results.append((-1, b'', b'Saida do comando nao encontrada no lote'))
+                continue
+            
             try:
-                # Obter conexão
-                client = self._ensure_client()
-                stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
-                
-                return_code = stdout.channel.recv_exit_status()
-                stdout_text = stdout.read().decode('utf-8')
-                stderr_text = stderr.read().decode('utf-8')
-                
-                return return_code, stdout_text, stderr_text
-            except Exception as e:
-                logger.error(f"Erro ao executar comando SSH: {e}")
-                # Se a conexão morreu, limpar e tentar novamente uma vez
-                if "not connected" in str(e).lower() or "transport" in str(e).lower():
-                    try:
-                        if self._client:
-                            try:
-                                self._client.close()
-                            except:
-                                pass
-                            self._client = None
-                        # Tentar novamente
-                        client = self._ensure_client()
-                        stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
-                        return_code = stdout.channel.recv_exit_status()
-                        stdout_text = stdout.read().decode('utf-8')
-                        stderr_text = stderr.read().decode('utf-8')
-                        return return_code, stdout_text, stderr_text
-                    except Exception as retry_error:
-                        logger.error(f"Erro ao tentar novamente: {retry_error}")
-                        raise
-                raise
+                return_code = int(output[rc_start + len(rc_marker):rc_end])
+            except ValueError:
+                return_code = -1
+            stdout = output[start + len(out_marker):rc_start]
+            stderr = output[rc_end + 3:end]
+            results.append((return_code, stdout, stderr))
+            pos = end + len(end_marker)
+        return results
     
+    def execute_many(self, commands: List[str], timeout: int = 30,
+                     binary: bool = False, compress: bool = False) -> List[Tuple[int, str, str]]:
+        """
+        Executa vários comandos em um único canal SSH (uma ida e volta).
+        
+        Os comandos rodam em sequência num script remoto com delimitadores e o
+        resultado de cada um é separado localmente.
+        
+        Args:
+            commands: Lista de comandos shell
+            timeout: Timeout total do lote em segundos
+            binary: Se True, stdout é retornado como bytes (útil para JSON grande)
+            compress: Se True, a saída do lote trafega comprimida com gzip
+        
+        Returns:
+            Lista de (return_code, stdout, stderr) na mesma ordem dos comandos
+        """
+        if not commands:
+            return []
+        token = uuid.uuid4().hex[:12]
+        stream = self.execute_command_stream(
+            self._build_batch_script(commands, token), timeout=timeout, compress=compress
+        )
+        output = stream.read_all()
+        if stream.return_code != 0 and stream.stderr:
+            logger.warning(f"Script em lote terminou com código {stream.return_code}: {stream.stderr_text}")
+        
+        results = []
+        for return_code, stdout, stderr in self._parse_batch_output(output, len(commands), token):
+            results.append((
+                return_code,
+                stdout if binary else stdout.decode('utf-8'),
+                stderr.decode('utf-8', errors='replace'),
+            ))
+        return results
+    
+    def open_tunnel(self, host: str, port: int, timeout: Optional[float] = 10) -> paramiko.Channel:
+        """
+        Abre um canal direct-tcpip até host:port (visto a partir da VM) em um Transport do pool.
+
+        O canal se comporta como um socket TCP e fica aberto até ser fechado pelo
+        chamador; não conta no limite de canais de comandos (max_channels).
+        """
+        for attempt in range(2):
+            conn, started = self._acquire()
+            try:
+                transport = conn.client.get_transport()
+                if transport is None or not transport.is_active():
+                    raise paramiko.SSHException("SSH session not active (transport)")
+                channel = transport.open_channel('direct-tcpip', (host, port), ('127.0.0.1', 0), timeout=timeout)
+                self._release(conn, started)
+                return channel
+            except paramiko.ChannelException:
+                # Recusado pela VM (nada escutando em host:port); a conexão SSH está boa
+                self._release(conn, started)
+                raise
+            except Exception as e:
+                self._release(conn, started, failed=True)
+                if attempt or ("not connected" not in str(e).lower() and "transport" not in str(e).lower()):
+                    raise
+                self._discard_connection(conn)
+
     def test_connection(self) -> bool:
         """Testa a conexão SSH."""
         try:
@@ -4,23 +4,18 @@ from typing import Dict
 
 logger = logging.getLogger(__name__)
 
+# Comandos executados em lote (uma ida e volta SSH) a cada coleta
+VM_RESOURCE_COMMANDS = [
+    "free -b",
+    "df -B1 /",
+    "df / | tail -1",
+    "top -bn1 | grep 'Cpu(s)'",
+]
 
-def fetch_vm_resources(ssh_service) -> Dict:
-    """
-    Coleta métricas de recursos da VM via SSH (memória, storage, CPU).
-
-    Args:
-        ssh_service: instância de SSHService pronta para executar comandos.
 
-    Returns:
-        Dicionário com métricas agregadas.
-    """
-    import time
-    fetch_id = f"FETCH-{int(time.time() * 1000)}-{id(ssh_service) % 10000}"
-    logger.info(f"[{fetch_id}] Iniciando coleta de recursos da VM")
-    start_time = time.time()
-    
-    resources = {
+def _empty_resources() -> Dict:
+    """Estrutura de recursos da VM com valores zerados."""
+    return {
         "memoria": {
             "total": 0,
             "livre": 0,
@@ -44,13 +39,40 @@ def fetch_vm_resources(ssh_service) -> Dict:
         },
     }
 
+
+def fetch_vm_resources(ssh_service) -> Dict:
+    """
+    Coleta métricas de recursos da VM via SSH (memória, storage, CPU).
+
+    Args:
+        ssh_service: instância de SSHService pronta para executar comandos.
+
+    Returns:
+        Dicionário com métricas agregadas.
+    """
+    import time
+    fetch_id = f"FETCH-{int(time.time() * 1000)}-{id(ssh_service) % 10000}"
+    logger.info(f"[{fetch_id}] Iniciando coleta de recursos da VM")
+    start_time = time.time()
+    
+    resources = _empty_resources()
+
+    # Todos os comandos em uma única ida e volta SSH (o df alternativo é barato
+    # e já vem junto, evitando uma segunda ida caso o df -B1 não seja parseável)
+    batch_start = time.time()
+    logger.debug(f"[{fetch_id}] Executando lote: {VM_RESOURCE_COMMANDS}")
+    try:
+        results = ssh_service.execute_many(VM_RESOURCE_COMMANDS, timeout=15)
+    except Exception as e:
+        logger.warning(f"[{fetch_id}] Erro ao executar lote de comandos da VM: {e}")
+        results = [(-1, '', str(e))] * len(VM_RESOURCE_COMMANDS)
+    mem_result, disk_result, disk_fallback_result, cpu_result = results
+    logger.debug(f"[{fetch_id}] Lote concluído em {time.time() - batch_start:.3f}s")
+
     # Memória
     try:
-        mem_start = time.time()
-        logger.debug(f"[{fetch_id}] Executando 'free -b' para obter memória")
-        return_code, stdout, stderr = ssh_service.execute_command("free -b", timeout=10)
-        mem_elapsed = time.time() - mem_start
-        logger.debug(f"[{fetch_id}] 'free -b' concluído em {mem_elapsed:.3f}s (return_code={return_code})")
+        return_code, stdout, stderr = mem_result
+        logger.debug(f"[{fetch_id}] 'free -b' return_code={return_code}")
         if return_code == 0:
             lines = stdout.strip().split("\n")
             if len(lines) >= 2:
@@ -72,12 +94,9 @@ def fetch_vm_resources(ssh_service) -> Dict:
 
     # Armazenamento
     try:
-        disk_start = time.time()
         # Tentar primeiro com df -B1 (mais preciso)
-        logger.debug(f"[{fetch_id}] Executando 'df -B1 /' para obter armazenamento")
-        return_code, stdout, stderr = ssh_service.execute_command("df -B1 /", timeout=10)
-        disk_elapsed = time.time() - disk_start
-        logger.debug(f"[{fetch_id}] 'df -B1 /' concluído em {disk_elapsed:.3f}s (return_code={return_code})")
+        return_code, stdout, stderr = disk_result
+        logger.debug(f"[{fetch_id}] 'df -B1 /' return_code={return_code}")
         
         disk_parsed = False
         
@@ -128,7 +147,7 @@ def fetch_vm_resources(ssh_service) -> Dict:
         if not disk_parsed:
             logger.debug(f"[{fetch_id}] Tentando comando alternativo 'df /' (sem -B1)")
             try:
-                return_code2, stdout2, stderr2 = ssh_service.execute_command("df / | tail -1", timeout=10)
+                return_code2, stdout2, stderr2 = disk_fallback_result
                 if return_code2 == 0 and stdout2:
                     logger.debug(f"[{fetch_id}] Saída alternativa: {repr(stdout2)}")
                     fs_parts = stdout2.strip().split()
@@ -167,11 +186,8 @@ def fetch_vm_resources(ssh_service) -> Dict:
 
     # CPU
     try:
-        cpu_start = time.time()
-        logger.debug(f"[{fetch_id}] Executando 'top -bn1 | grep Cpu(s)' para obter CPU")
-        return_code, stdout, stderr = ssh_service.execute_command("top -bn1 | grep 'Cpu(s)'", timeout=10)
-        cpu_elapsed = time.time() - cpu_start
-        logger.debug(f"[{fetch_id}] 'top -bn1 | grep Cpu(s)' concluído em {cpu_elapsed:.3f}s (return_code={return_code})")
+        return_code, stdout, stderr = cpu_result
+        logger.debug(f"[{fetch_id}] 'top -bn1 | grep Cpu(s)' return_code={return_code}")
         if return_code == 0:
             cpu_match = re.search(r"(\d+\.?\d*)%?\s+id", stdout)
             if cpu_match:
@@ -201,3 +217,38 @@ def fetch_vm_resources(ssh_service) -> Dict:
     return resources
 
 
+def vm_resources_from_snapshot(vm: Dict) -> Dict:
+    """
+    Converte a seção `vm` do snapshot do coletor remoto (valores brutos em bytes
+    e percentual de CPU ociosa) na mesma estrutura retornada por fetch_vm_resources.
+    """
+    resources = _empty_resources()
+    gb = 1024 ** 3
+
+    if vm.get("mem_total"):
+        memoria = resources["memoria"]
+        memoria["total"] = vm["mem_total"]
+        memoria["usada"] = vm.get("mem_used", 0)
+        memoria["livre"] = vm.get("mem_free", 0)
+        memoria["total_gb"] = round(memoria["total"] / gb, 2)
+        memoria["usada_gb"] = round(memoria["usada"] / gb, 2)
+        memoria["livre_gb"] = round(memoria["livre"] / gb, 2)
+
+    if vm.get("disk_total"):
+        armazenamento = resources["armazenamento"]
+        armazenamento["total"] = vm["disk_total"]
+        armazenamento["usado"] = vm.get("disk_used", 0)
+        armazenamento["livre"] = vm.get("disk_free", 0)
+        armazenamento["total_gb"] = round(armazenamento["total"] / gb, 2)
+        armazenamento["usado_gb"] = round(armazenamento["usado"] / gb, 2)
+        armazenamento["livre_gb"] = round(armazenamento["livre"] / gb, 2)
+
+    if vm.get("cpu_idle") is not None:
+        cpu_idle = float(vm["cpu_idle"])
+        resources["cpu"]["usado"] = round(100 - cpu_idle, 2)
+        resources["cpu"]["livre"] = round(cpu_idle, 2)
+
+    for error in vm.get("errors", []):
+        logger.warning(f"Coletor remoto: {error}")
+
+    return resources
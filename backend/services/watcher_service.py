@@ -1,12 +1,23 @@
 import logging
-import threading
-import time
-from typing import Dict, List
+from collections.abc import Mapping
 from services.cache_service import CacheKeys, CacheService
+from services.scheduler import get_scheduler
 from services.service_manager import get_kubernetes_service
 
 logger = logging.getLogger(__name__)
 
+# Intervalo máximo entre iterações sem mudança no cache, e mínimo entre iterações seguidas
+WAIT_TIMEOUT = 10.0
+MIN_INTERVAL = 1.0
+# Verificação de pods com falha (kubectl get pods) mantém a cadência fixa
+FAILED_PODS_INTERVAL = 10.0
+FAILED_PODS_DEADLINE = 30.0
+# Limpeza dos pods com falha antigos (mais de 7 dias)
+CLEANUP_INTERVAL = 3600.0
+
+# Tarefas do watcher no scheduler
+TASKS = ('watcher', 'failed_pods', 'failed_pods_cleanup')
+
 # Importar modelos Django
 # Não fazer django.setup() aqui - o Django já foi inicializado pelo manage.py
 # Apenas importar os modelos diretamente
@@ -22,7 +33,7 @@ except Exception as e:
     timedelta = None
 
 class WatcherService:
-    """Serviço que executa o loop do watcher em background."""
+    """Serviço que executa o watcher em background (tarefas do scheduler)."""
     
     def __init__(self):
         try:
@@ -37,137 +48,148 @@ class WatcherService:
                 self.k8s_service = None
         
         self._running = False
-        self._thread = None
+        self.scheduler = get_scheduler()
+        self._unsubscribe = []
+        # Depois de criar jobs, só a atualização dos jobs antecipa a próxima iteração
+        self._awaiting_jobs = False
     
     def start(self):
-        """Inicia o watcher em uma thread separada."""
+        """Registra as tarefas do watcher no scheduler."""
         if self._running:
             logger.warning("Watcher já está rodando")
             return
         
         self._running = True
-        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
-        self._thread.start()
+        scheduler = self.scheduler
+        # Sem mudança no cache roda a cada WAIT_TIMEOUT; mudanças antecipam (no mínimo MIN_INTERVAL)
+        scheduler.register('watcher', self._check_executions, WAIT_TIMEOUT, jitter=0.0, min_interval=MIN_INTERVAL)
+        scheduler.register('failed_pods', self._check_failed_pods, FAILED_PODS_INTERVAL,
+                           deadline=FAILED_PODS_DEADLINE)
+        scheduler.register('failed_pods_cleanup', self._cleanup_old_failed_pods, CLEANUP_INTERVAL)
+        self._unsubscribe = [
+            CacheService.subscribe(CacheKeys.EXECUTIONS, self._on_executions_change),
+            CacheService.subscribe(CacheKeys.JOBS, self._on_jobs_change),
+        ]
+        scheduler.start()
         logger.info("Watcher iniciado")
     
     def stop(self):
         """Para o watcher."""
         self._running = False
-        if self._thread:
-            self._thread.join(timeout=5)
+        self.scheduler.unregister(*TASKS)
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
         logger.info("Watcher parado")
     
-    def _watch_loop(self):
-        """Loop principal do watcher que verifica execuções e cria jobs."""
-        while self._running:
-            try:
-                # Obter lista de RPAs do banco de dados
-                lista_nomes_rpas = []
-                rpas_config = {}  # Dicionário para armazenar configurações dos RPAs
-                
-                try:
-                    if RoboDockerizado:
-                        # Buscar apenas RPAs ativos
-                        rpas_ativos = RoboDockerizado.objects.filter(tipo='rpa', status='active', ativo=True)
-                        for rpa_obj in rpas_ativos:
-                            nome_rpa = rpa_obj.nome
-                            lista_nomes_rpas.append(nome_rpa)
-                            # Armazenar configuração do RPA
-                            rpas_config[nome_rpa] = {
-                                'docker_tag': rpa_obj.docker_tag,
-                                'qtd_max_instancias': rpa_obj.qtd_max_instancias,
-                                'qtd_ram_maxima': rpa_obj.qtd_ram_maxima,
-                                'utiliza_arquivos_externos': rpa_obj.utiliza_arquivos_externos,
-                                'tempo_maximo_de_vida': rpa_obj.tempo_maximo_de_vida,
-                            }
-                    else:
-                        logger.warning("Modelo RoboDockerizado não disponível - aguardando...")
-                        time.sleep(5)
-                        continue
-                except Exception as e:
-                    logger.warning(f"Erro ao obter RPAs do banco: {e}")
-                    lista_nomes_rpas = []
-                
-                execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
-                if not execucoes_por_robo:
-                    logger.debug("Cache de execuções vazio - aguardando próximo ciclo")
-                
-                if lista_nomes_rpas and execucoes_por_robo and self.k8s_service:
-                    # Obter jobs ativos do cache
-                    jobs_cache = CacheService.get_data(CacheKeys.JOBS, []) or []
-                    
-                    # Contar jobs ativos por RPA
-                    jobs_ativos_por_rpa = {}
-                    for job in jobs_cache:
-                        labels = job.get('labels', {}) if isinstance(job, dict) else {}
-                        nome_robo = (
-                            labels.get('nome_robo') or 
-                            labels.get('nome-robo') or 
-                            labels.get('app') or 
-                            ''
-                        ).lower()
-                        if nome_robo:
-                            active = job.get('active', 0)
-                            if active > 0:
-                                jobs_ativos_por_rpa[nome_robo] = jobs_ativos_por_rpa.get(nome_robo, 0) + active
-                    
-                    for nome_do_rpa in lista_nomes_rpas:
-                        execs_do_rpa = execucoes_por_robo.get(nome_do_rpa, [])
-                        
-                        # SÓ criar container se houver execuções pendentes
-                        if execs_do_rpa and len(execs_do_rpa) > 0:
-                            rpa_config = rpas_config.get(nome_do_rpa)
-                            if rpa_config:
-                                # Verificar quantos jobs ativos já existem para este RPA
-                                nome_rpa_lower = nome_do_rpa.lower()
-                                jobs_ativos = jobs_ativos_por_rpa.get(nome_rpa_lower, 0)
-                                qtd_max_instancias = rpa_config.get('qtd_max_instancias', 1)
-                                
-                                # Só criar novo job se não atingiu o limite
-                                if jobs_ativos < qtd_max_instancias:
-                                    logger.info(
-                                        f"RPA {nome_do_rpa}: {len(execs_do_rpa)} execuções pendentes, "
-                                        f"{jobs_ativos}/{qtd_max_instancias} jobs ativos. Criando novo job..."
-                                    )
-                                    try:
-                                        self.k8s_service.create_job(
-                                            nome_rpa=nome_do_rpa,
-                                            docker_tag=rpa_config.get('docker_tag', 'latest'),
-                                            qtd_ram_maxima=rpa_config.get('qtd_ram_maxima', 256),
-                                            qtd_max_instancias=qtd_max_instancias,
-                                            utiliza_arquivos_externos=rpa_config.get('utiliza_arquivos_externos', False),
-                                            tempo_maximo_de_vida=rpa_config.get('tempo_maximo_de_vida', 600)
-                                        )
-                                    except Exception as e:
-                                        logger.error(f"Erro ao criar job para {nome_do_rpa}: {e}")
-                                else:
-                                    logger.debug(
-                                        f"RPA {nome_do_rpa}: Limite de instâncias atingido "
-                                        f"({jobs_ativos}/{qtd_max_instancias})"
-                                    )
-                
-                # Cronjobs e Deployments agora são gerenciados diretamente via API
-                # Não precisamos mais verificar arquivos YAML aqui
-                
-                # Verificar e salvar pods com falhas
-                if self.k8s_service:
-                    try:
-                        self._check_and_save_failed_pods()
-                    except Exception as e:
-                        logger.warning(f"Erro ao verificar pods com falhas: {e}")
-                
-                # Limpar pods com falhas antigos (mais de 7 dias)
-                try:
-                    self._cleanup_old_failed_pods()
-                except Exception as e:
-                    logger.warning(f"Erro ao limpar pods com falhas antigos: {e}")
-                
-                # Aguardar 10 segundos antes da próxima iteração (verificar novas execuções)
-                time.sleep(10)
+    def _on_executions_change(self, key, entry):
+        # Reagir a novas execuções antes do job criado aparecer no cache criaria jobs além do limite
+        if not self._awaiting_jobs:
+            self.scheduler.wake('watcher')
+    
+    def _on_jobs_change(self, key, entry):
+        self._awaiting_jobs = False
+        self.scheduler.wake('watcher')
+    
+    def _check_executions(self):
+        """Verifica execuções pendentes e cria jobs até o limite de instâncias de cada RPA."""
+        self._awaiting_jobs = False
+        jobs_criados = False
+        # Obter lista de RPAs do banco de dados
+        lista_nomes_rpas = []
+        rpas_config = {}  # Dicionário para armazenar configurações dos RPAs
+
+        try:
+            if RoboDockerizado:
+                # Buscar apenas RPAs ativos
+                rpas_ativos = RoboDockerizado.objects.filter(tipo='rpa', status='active', ativo=True)
+                for rpa_obj in rpas_ativos:
+                    nome_rpa = rpa_obj.nome
+                    lista_nomes_rpas.append(nome_rpa)
+                    # Armazenar configuração do RPA
+                    rpas_config[nome_rpa] = {
+                        'docker_tag': rpa_obj.docker_tag,
+                        'qtd_max_instancias': rpa_obj.qtd_max_instancias,
+                        'qtd_ram_maxima': rpa_obj.qtd_ram_maxima,
+                        'utiliza_arquivos_externos': rpa_obj.utiliza_arquivos_externos,
+                        'tempo_maximo_de_vida': rpa_obj.tempo_maximo_de_vida,
+                    }
+            else:
+                logger.warning("Modelo RoboDockerizado não disponível - aguardando...")
+                return
+        except Exception as e:
+            logger.warning(f"Erro ao obter RPAs do banco: {e}")
+            lista_nomes_rpas = []
+
+        execucoes_por_robo = CacheService.get_data(CacheKeys.EXECUTIONS, {}) or {}
+        if not execucoes_por_robo:
+            logger.debug("Cache de execuções vazio - aguardando próximo ciclo")
+
+        if lista_nomes_rpas and execucoes_por_robo and self.k8s_service:
+            # Obter jobs ativos do cache
+            jobs_cache = CacheService.get_data(CacheKeys.JOBS, []) or []
+    
+            # Contar jobs ativos por RPA
+            jobs_ativos_por_rpa = {}
+            for job in jobs_cache:
+                labels = job.get('labels', {}) if isinstance(job, Mapping) else {}
+                nome_robo = (
+                    labels.get('nome_robo') or 
+                    labels.get('nome-robo') or 
+                    labels.get('app') or 
+                    ''
+                ).lower()
+                if nome_robo:
+                    active = job.get('active', 0)
+                    if active > 0:
+                        jobs_ativos_por_rpa[nome_robo] = jobs_ativos_por_rpa.get(nome_robo, 0) + active
+    
+            for nome_do_rpa in lista_nomes_rpas:
+                execs_do_rpa = execucoes_por_robo.get(nome_do_rpa, [])
+        
+                # SÓ criar container se houver execuções pendentes
+                if execs_do_rpa and len(execs_do_rpa) > 0:
+                    rpa_config = rpas_config.get(nome_do_rpa)
+                    if rpa_config:
+                        # Verificar quantos jobs ativos já existem para este RPA
+                        nome_rpa_lower = nome_do_rpa.lower()
+                        jobs_ativos = jobs_ativos_por_rpa.get(nome_rpa_lower, 0)
+                        qtd_max_instancias = rpa_config.get('qtd_max_instancias', 1)
                 
-            except Exception as e:
-                logger.error(f"Erro no loop do watcher: {e}")
-                time.sleep(10)  # Aguardar 10 segundos antes de tentar novamente
+                        # Só criar novo job se não atingiu o limite
+                        if jobs_ativos < qtd_max_instancias:
+                            logger.info(
+                                f"RPA {nome_do_rpa}: {len(execs_do_rpa)} execuções pendentes, "
+                                f"{jobs_ativos}/{qtd_max_instancias} jobs ativos. Criando novo job..."
+                            )
+                            try:
+                                self.k8s_service.create_job(
+                                    nome_rpa=nome_do_rpa,
+                                    docker_tag=rpa_config.get('docker_tag', 'latest'),
+                                    qtd_ram_maxima=rpa_config.get('qtd_ram_maxima', 256),
+                                    qtd_max_instancias=qtd_max_instancias,
+                                    utiliza_arquivos_externos=rpa_config.get('utiliza_arquivos_externos', False),
+                                    tempo_maximo_de_vida=rpa_config.get('tempo_maximo_de_vida', 600)
+                                )
+                                jobs_criados = True
+                            except Exception as e:
+                                logger.error(f"Erro ao criar job para {nome_do_rpa}: {e}")
+                        else:
+                            logger.debug(
+                                f"RPA {nome_do_rpa}: Limite de instâncias atingido "
+                                f"({jobs_ativos}/{qtd_max_instancias})"
+                            )
+
+        # Cronjobs e Deployments agora são gerenciados diretamente via API
+        # Não precisamos mais verificar arquivos YAML aqui
+        
+        if jobs_criados:
+            self._awaiting_jobs = True
+    
+    def _check_failed_pods(self):
+        """Verifica e salva pods com falhas."""
+        if self.k8s_service:
+            self._check_and_save_failed_pods()
     
     def is_running(self) -> bool:
         """Verifica se o watcher está rodando."""
@@ -212,6 +234,8 @@ class WatcherService:
             
             # Salvar pods com falhas no banco de dados
             for pod in failed_pods:
+                # Registro imutável -> dicts/listas para o JSONField
+                pod = pod.to_dict()
                 pod_name = pod.get('name', '')
                 if not pod_name:
                     continue
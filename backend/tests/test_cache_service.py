@@ -0,0 +1,109 @@
+"""CacheService: versões por hash do conteúdo e carga única (get_or_load)."""
+import itertools
+import threading
+import time
+
+import pytest
+
+from services.cache_service import CacheService, content_hash
+
+_keys = itertools.count()
+
+
+@pytest.fixture
+def key():
+    """Chave própria do teste, removida do cache (compartilhado pela classe) ao final."""
+    name = f'teste-{next(_keys)}'
+    yield name
+    CacheService._cache.pop(name, None)
+
+
+def test_content_hash_estavel_para_o_mesmo_conteudo():
+    assert content_hash({'a': [1, 2], 'b': None}) == content_hash({'a': [1, 2], 'b': None})
+    assert content_hash({'a': [1, 2]}) != content_hash({'a': [2, 1]})
+    assert content_hash(object()) is None
+
+
+def test_versao_mantida_enquanto_o_conteudo_nao_muda(key):
+    CacheService.update(key, [{'name': 'pod-1', 'phase': 'Running'}])
+    version = CacheService.version(key)
+
+    # Objeto novo com o mesmo conteúdo: nova geração, mesma versão
+    CacheService.update(key, [{'name': 'pod-1', 'phase': 'Running'}])
+
+    entry = CacheService.get_entry(key)
+    assert entry['version'] == version
+    assert entry['generation'] > version
+
+
+def test_versao_muda_com_o_conteudo(key):
+    CacheService.update(key, [{'name': 'pod-1', 'phase': 'Running'}])
+    version = CacheService.version(key)
+
+    CacheService.update(key, [{'name': 'pod-1', 'phase': 'Succeeded'}])
+
+    assert CacheService.version(key) > version
+
+
+def test_conteudo_nao_serializavel_sempre_gera_versao_nova(key):
+    CacheService.update(key, {'data': object()})
+    version = CacheService.version(key)
+
+    CacheService.update(key, {'data': object()})
+
+    assert CacheService.version(key) > version
+
+
+
+def test_get_or_load_carga_unica_para_requisicoes_simultaneas(key):
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return ['pod-1']
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(CacheService.get_or_load(key, loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    # Todas as threads chegam à carga em andamento antes de ela terminar
+    deadline = time.time() + 5
+    while not calls and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [['pod-1']] * 8
+
+
+def test_get_or_load_propaga_o_erro_e_tenta_de_novo(key):
+    def failing():
+        raise RuntimeError('kubectl indisponível')
+
+    with pytest.raises(RuntimeError):
+        CacheService.get_or_load(key, failing)
+
+    assert CacheService.get_or_load(key, lambda: ['pod-1']) == ['pod-1']
+
+
+def test_get_or_load_serve_dado_antigo_enquanto_atualiza(key):
+    CacheService.update(key, ['antigo'])
+    version = CacheService.version(key)
+    release = threading.Event()
+
+    def loader():
+        release.wait(5)
+        return ['novo']
+
+    time.sleep(0.01)
+    assert CacheService.get_or_load(key, loader, max_stale=0) == ['antigo']
+    release.set()
+    assert CacheService.wait_for_change(key, version, timeout=5)['data'] == ['novo']
@@ -0,0 +1,79 @@
+"""Índices da RecordList (nome, labels, campos, robô e prefixo do nome)."""
+import pytest
+
+from services.cache_service import CacheKeys, CacheService
+from services.cluster_snapshot import RecordList, as_record_list, load_running_pods
+
+RECORDS = [
+    {'name': 'rpa-job-robo-a-1', 'namespace': 'default', 'phase': 'Running',
+     'labels': {'nome_robo': 'Robo_A', 'job-name': 'rpa-job-robo-a-1'}},
+    {'name': 'rpa-job-robo-a-2', 'namespace': 'default', 'phase': 'Failed',
+     'labels': {'nome-robo': 'robo-a'}},
+    {'name': 'rpa-job-robo-b-1', 'namespace': 'default', 'phase': 'Running',
+     'labels': {'app': 'robo-b'}},
+    # Mesmo nome em outro namespace
+    {'name': 'rpa-job-robo-a-1', 'namespace': 'homolog', 'phase': 'Succeeded', 'labels': None},
+]
+
+
+@pytest.fixture
+def records():
+    return RecordList(RECORDS).build_indexes()
+
+
+def test_by_name(records):
+    assert records.by_name('rpa-job-robo-b-1') is RECORDS[2]
+    assert records.by_name('inexistente') is None
+
+
+def test_by_name_com_o_mesmo_nome_em_namespaces_diferentes(records):
+    assert records.by_name('rpa-job-robo-a-1') is RECORDS[0]
+    assert records.by_name('rpa-job-robo-a-1', 'homolog') is RECORDS[3]
+    assert records.by_name('rpa-job-robo-a-1', 'producao') is None
+
+
+def test_with_label(records):
+    assert records.with_label('app', 'robo-b') == (RECORDS[2],)
+    assert records.with_label('nome_robo', 'robo-a') == ()
+    # Label fora de INDEXED_LABELS: indexado na primeira busca
+    assert records.with_label('nome-robo', 'robo-a') == (RECORDS[1],)
+
+
+def test_with_field(records):
+    assert records.with_field('phase', 'Running') == (RECORDS[0], RECORDS[2])
+    assert records.with_field('phase', 'Pending') == ()
+
+
+def test_with_robot_compara_nomes_normalizados(records):
+    assert records.with_robot('robo a') == (RECORDS[0], RECORDS[1])
+    assert records.with_robot('robo-b') == ()
+
+
+def test_with_name_prefix_sem_duplicatas(records):
+    result = records.with_name_prefix('rpa-job-robo-a-')
+
+    assert len(result) == 3
+    assert all(any(record is expected for record in result) for expected in (RECORDS[0], RECORDS[1], RECORDS[3]))
+    assert records.with_name_prefix('rpa-job-robo-c') == []
+
+
+def test_as_record_list_reaproveita_a_lista_indexada(records):
+    assert as_record_list(records) is records
+    assert as_record_list(None) == []
+    assert as_record_list(RECORDS).by_name('rpa-job-robo-b-1') is RECORDS[2]
+
+
+class PodsService:
+    """Serviço do Kubernetes que devolve pods de todas as fases (como get_pods)."""
+
+    def get_pods(self):
+        return RECORDS
+
+
+def test_load_running_pods_publica_so_os_pods_rodando_como_o_polling():
+    assert CacheService.get_entry(CacheKeys.CLUSTER_SNAPSHOT) is None
+
+    pods = load_running_pods(PodsService())
+
+    assert list(pods) == [RECORDS[0], RECORDS[2]]
+    assert pods.by_name('rpa-job-robo-b-1') is RECORDS[2]
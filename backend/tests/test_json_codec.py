@@ -0,0 +1,43 @@
+"""Leitura incremental dos itens de `kubectl get -o json` (json_codec)."""
+import gc
+import json
+
+import pytest
+
+from services import json_codec
+
+DOCUMENT = json.dumps({
+    'apiVersion': 'v1',
+    'kind': 'List',
+    'items': [{'metadata': {'name': f'pod-{i}', 'labels': {'app': 'ação'}}} for i in range(3)],
+}).encode('utf-8')
+
+
+def chunked(payload: bytes, size: int):
+    for start in range(0, len(payload), size):
+        yield payload[start:start + size]
+
+
+@pytest.mark.parametrize('size', [1, 7, len(DOCUMENT)])
+def test_load_items_com_chunks_de_qualquer_tamanho(size):
+    assert json_codec.load_items(chunked(DOCUMENT, size)) == {'items': json.loads(DOCUMENT)['items']}
+
+
+def test_load_items_incompleto_falha():
+    with pytest.raises(json_codec.JSONDecodeError):
+        json_codec.load_items(chunked(DOCUMENT[:-20], 16))
+
+
+def test_gc_ligado_enquanto_aguarda_os_chunks():
+    states = []
+
+    def chunks():
+        for chunk in chunked(DOCUMENT, 16):
+            states.append(gc.isenabled())
+            yield chunk
+
+    assert gc.isenabled()
+    json_codec.load_items(chunks())
+
+    assert all(states)
+    assert gc.isenabled()
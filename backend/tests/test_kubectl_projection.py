@@ -0,0 +1,126 @@
+"""Projeção -o jsonpath: template e remontagem da saída no formato do -o json."""
+import json
+
+import pytest
+
+from services import kubectl_projection
+
+POD = {
+    'kind': 'Pod',
+    'metadata': {'name': 'rpa-job-robo-abc12', 'namespace': 'default', 'labels': {'nome_robo': 'robo', 'app': 'rpa'}},
+    'status': {'phase': 'Running', 'startTime': '2026-01-01T00:00:00Z', 'containerStatuses': [{'ready': True}]},
+    'spec': {
+        'nodeName': 'node-1',
+        'containers': [
+            {'image': 'registry/robo:1', 'resources': {'limits': {'memory': '1Gi', 'cpu': '500m'}}},
+            {'resources': {}},
+            {'image': 'registry/sidecar:2', 'resources': {'requests': {'cpu': '100m'}}},
+        ],
+    },
+}
+
+JOB = {
+    'kind': 'Job',
+    'metadata': {'name': 'rpa-job-robo-1', 'namespace': 'default', 'labels': {}},
+    'status': {'active': 1, 'startTime': '2026-01-01T00:00:00Z'},
+    'spec': {'template': {'spec': {'containers': [{'image': 'registry/robo:1'}]}}},
+}
+
+CRONJOB = {
+    'kind': 'CronJob',
+    'metadata': {'name': 'rpa-cronjob-robo', 'namespace': 'default'},
+    'spec': {'schedule': '*/5 * * * *', 'suspend': False},
+}
+
+
+def _values(obj, path):
+    """Valores do caminho no objeto (lista de valores para caminhos com '*')."""
+    for i, part in enumerate(path):
+        if part == '*':
+            return [_values(item, path[i + 1:]) for item in obj or []]
+        if isinstance(part, int):
+            obj = obj[part] if obj and len(obj) > part else None
+        else:
+            obj = (obj or {}).get(part)
+    return obj
+
+
+def _render(value, field_type):
+    """Valor como o kubectl imprime no jsonpath (ausente: vazio; mapas/listas: JSON)."""
+    if value is None:
+        return ''
+    if field_type == 'json':
+        # Com espaços após ',' e ':' - não podem quebrar os campos com '*'
+        return json.dumps(value)
+    if field_type == 'bool':
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def kubectl_output(items, kinds):
+    """Saída equivalente à do template de build_template para os itens."""
+    lines = []
+    for item in items:
+        fields = [item['kind']]
+        for path, field_type in kubectl_projection._columns(kinds):
+            value = _values(item, path)
+            if '*' in path:
+                fields.append(''.join(
+                    _render(v, field_type) + kubectl_projection.ELEMENT_SEPARATOR for v in value or []
+                ))
+            else:
+                fields.append(_render(value, field_type))
+        lines.append('\t'.join(fields) + '\n')
+    return ''.join(lines)
+
+
+def test_template_emite_um_valor_por_elemento_dos_campos_com_asterisco():
+    template = kubectl_projection.build_template(['Pod'])
+
+    assert template.startswith('{range .items[*]}{.kind}{"\\t"}')
+    assert '{range .spec.containers[*]}{.image}{"\\x1f"}{end}' in template
+    assert '{range .spec.containers[*]}{.resources}{"\\x1f"}{end}' in template
+    assert template.endswith('{"\\n"}{end}')
+
+
+def test_round_trip_pod():
+    kinds = ['Pod']
+
+    data = kubectl_projection.parse_output(kubectl_output([POD], kinds), kinds)
+
+    assert data == {'items': [POD]}
+
+
+def test_round_trip_varios_kinds_ignora_colunas_de_outros_kinds():
+    kinds = ['Pod', 'Job', 'CronJob', 'Deployment']
+    output = kubectl_output([POD, JOB, CRONJOB], kinds)
+
+    items = kubectl_projection.parse_output(output, kinds)['items']
+
+    assert items[0] == POD
+    assert items[1] == JOB
+    assert items[2] == CRONJOB
+
+
+def test_kind_fora_da_projecao_e_ignorado():
+    output = kubectl_output([POD], ['Pod']).replace('Pod\t', 'Service\t', 1)
+
+    assert kubectl_projection.parse_output(output, ['Pod']) == {'items': []}
+
+
+def test_mapa_no_formato_do_kubectl_antigo_falha():
+    output = kubectl_output([POD], ['Pod']).replace(
+        json.dumps(POD['metadata']['labels']), 'map[app:rpa nome_robo:robo]'
+    )
+
+    with pytest.raises(ValueError):
+        kubectl_projection.parse_output(output, ['Pod'])
+
+
+def test_campo_com_asterisco_sem_separador_falha():
+    output = kubectl_output([POD], ['Pod']).replace(
+        kubectl_projection.ELEMENT_SEPARATOR, ' '
+    )
+
+    with pytest.raises(ValueError):
+        kubectl_projection.parse_output(output, ['Pod'])
@@ -0,0 +1,58 @@
+"""Busca de robôs cadastrados por nome normalizado (RobotIdentityResolver)."""
+import time
+
+import pytest
+
+from services import robot_identity
+from services.robot_identity import RobotIdentityResolver
+
+
+def row(nome, tipo='rpa', ativo=True, status='active', apelido=None):
+    return {'nome': nome, 'apelido': apelido, 'tipo': tipo, 'status': status, 'ativo': ativo}
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    """Resolver com o índice já carregado (sem consultar o banco)."""
+    monkeypatch.setattr(robot_identity, 'ROBOTS_CHECK_INTERVAL', float('inf'))
+
+    def build(*rows):
+        resolver = RobotIdentityResolver()
+        resolver._robots = RobotIdentityResolver._build_index(rows)
+        resolver._robots_dirty = False
+        resolver._robots_checked_at = time.monotonic()
+        return resolver
+
+    return build
+
+
+def test_nome_exato_prevalece_entre_nomes_normalizados_iguais(resolver):
+    r = resolver(row('robo_a'), row('robo-a'))
+
+    assert r.canonical_name('robo-a') == 'robo-a'
+    assert r.canonical_name('Robo A') == 'robo_a'
+
+
+def test_nomes_iguais_de_tipos_diferentes(resolver):
+    r = resolver(row('robo-a', tipo='rpa'), row('robo_a', tipo='cronjob'))
+
+    assert r.canonical_name('robo-a', tipo='cronjob') == 'robo_a'
+    assert r.canonical_name('robo_a', tipo='rpa') == 'robo-a'
+    assert r.robot('robo-a', tipo='deployment') is None
+
+
+def test_inativo_com_nome_exato_nao_esconde_ativo_normalizado(resolver):
+    r = resolver(row('robo-a', ativo=False, apelido='Antigo'), row('Robo_A', status='inactive', apelido='Robô A'))
+
+    # Sem filtro o nome exato vence, mesmo inativo
+    assert r.robot('robo-a')['apelido'] == 'Antigo'
+    # enabled: só ativo=True, sem exigir status 'active'
+    assert r.robot('robo-a', enabled=True)['apelido'] == 'Robô A'
+    assert r.robot('robo-a', active=True) is None
+
+
+def test_robot_names_filtra_tipo_e_ativos(resolver):
+    r = resolver(row('a'), row('b', ativo=False), row('c', status='inactive'), row('d', tipo='cronjob'))
+
+    assert r.robot_names(tipo='rpa') == {'a', 'b', 'c'}
+    assert r.robot_names(tipo='rpa', active=True) == {'a'}
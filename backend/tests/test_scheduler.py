@@ -0,0 +1,90 @@
+"""Scheduler: rodadas puladas, reexecução após wake() e contadores."""
+import threading
+import time
+
+import pytest
+
+from services.scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler(max_workers=2)
+    scheduler.start()
+    yield scheduler
+    scheduler.stop()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_tarefa_em_execucao_nao_e_empilhada(scheduler):
+    release = threading.Event()
+    state = {'active': 0, 'max_active': 0}
+    lock = threading.Lock()
+
+    def func():
+        with lock:
+            state['active'] += 1
+            state['max_active'] = max(state['max_active'], state['active'])
+        release.wait(5)
+        with lock:
+            state['active'] -= 1
+
+    task = scheduler.register('lenta', func, 0.02, jitter=0)
+    assert wait_until(lambda: task.skipped >= 3)
+    release.set()
+    assert wait_until(lambda: task.runs >= 2)
+
+    assert state['max_active'] == 1
+
+
+def test_wake_durante_a_execucao_roda_de_novo_ao_terminar(scheduler):
+    started = threading.Event()
+    release = threading.Event()
+
+    def func():
+        started.set()
+        release.wait(5)
+
+    task = scheduler.register('coleta', func, 60, jitter=0)
+    assert started.wait(5)
+    scheduler.wake('coleta')
+    release.set()
+
+    # Sem o wake a próxima rodada só viria em 60s
+    assert wait_until(lambda: task.runs >= 2, timeout=2)
+    assert task.rerun is False
+
+
+def test_wake_antecipa_tarefa_ociosa_respeitando_min_interval(scheduler):
+    task = scheduler.register('ociosa', lambda: None, 60, jitter=0, initial_delay=60)
+    scheduler.wake('ociosa')
+    assert wait_until(lambda: task.runs == 1, timeout=2)
+
+    limited = scheduler.register('limitada', lambda: None, 60, jitter=0, min_interval=60)
+    assert wait_until(lambda: limited.runs == 1, timeout=2)
+    scheduler.wake('limitada')
+    time.sleep(0.2)
+
+    assert limited.runs == 1
+
+
+def test_falhas_e_estouro_de_prazo_sao_contados(scheduler):
+    def func():
+        time.sleep(0.05)
+        raise RuntimeError('ssh caiu')
+
+    task = scheduler.register('falha', func, 60, jitter=0, deadline=0.01)
+    assert wait_until(lambda: task.runs == 1)
+
+    stats = scheduler.stats()['falha']
+    assert stats['failures'] == 1
+    assert stats['overruns'] == 1
+    assert stats['last_error'] == 'ssh caiu'
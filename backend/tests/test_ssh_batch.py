@@ -0,0 +1,73 @@
+"""Separação da saída do lote de execute_many (marcadores OUT/RC/END por comando)."""
+import subprocess
+
+import pytest
+
+from services.ssh_service import SSHService
+
+TOKEN = 'abc123'
+
+
+@pytest.fixture
+def ssh(monkeypatch):
+    # Sem shared/config.ini: só o necessário para montar e separar o lote (nada conecta)
+    monkeypatch.setattr('services.ssh_service.get_ssh_config', lambda: {'host': 'vm', 'username': 'teste'})
+    return SSHService()
+
+
+def run_batch(ssh, commands):
+    """Executa o script do lote num shell local, como a VM faria."""
+    script = ssh._build_batch_script(commands, TOKEN)
+    return subprocess.run(['sh', '-c', script], stdout=subprocess.PIPE, check=True).stdout
+
+
+def test_round_trip_separa_stdout_stderr_e_rc(ssh):
+    output = run_batch(ssh, [
+        "printf 'um\\ndois'",
+        "echo erro >&2; exit 3",
+        "printf ''",
+    ])
+
+    assert ssh._parse_batch_output(output, 3, TOKEN) == [
+        (0, b'um\ndois', b''),
+        (3, b'', b'erro\n'),
+        (0, b'', b''),
+    ]
+
+
+def test_stdout_com_texto_parecido_com_marcador(ssh):
+    output = run_batch(ssh, ["printf '__DW_outro_0_RC_9__\\n'"])
+
+    assert ssh._parse_batch_output(output, 1, TOKEN) == [(0, b'__DW_outro_0_RC_9__\n', b'')]
+
+
+def test_lote_interrompido_marca_comandos_restantes(ssh):
+    output = run_batch(ssh, ["echo a", "echo b"])
+    truncated = output[:output.index(f'__DW_{TOKEN}_1_RC_'.encode())]
+
+    results = ssh._parse_batch_output(truncated, 2, TOKEN)
+
+    assert results[0] == (0, b'a\n', b'')
+    assert results[1][0] == -1
+    assert results[1][1] == b''
+
+
+def test_rc_ausente_nao_desalinha_os_comandos_seguintes(ssh):
+    output = run_batch(ssh, ["echo a", "echo b"])
+    # Sem o marcador de RC do primeiro comando
+    broken = output.replace(f'\n__DW_{TOKEN}_0_RC_0__\n'.encode(), b'\n')
+
+    results = ssh._parse_batch_output(broken, 2, TOKEN)
+
+    assert results[0][0] == -1
+    assert results[1] == (0, b'b\n', b'')
+
+
+def test_rc_ilegivel_vira_menos_um(ssh):
+    output = run_batch(ssh, ["echo a", "echo b"])
+    garbled = output.replace(b'_0_RC_0__', b'_0_RC_x9__')
+
+    results = ssh._parse_batch_output(garbled, 2, TOKEN)
+
+    assert results[0] == (-1, b'a\n', b'')
+    assert results[1] == (0, b'b\n', b'')